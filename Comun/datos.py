@@ -0,0 +1,84 @@
+import glob
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from Comun.instrumentacion import contar, medir
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # sin pyarrow se usa pickle
+    feather = None
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARPETA_CACHE = os.path.join(RAIZ, ".cache")
+
+# Hash de cada fichero fuente por (ruta, tamaño, mtime), para no releerlo en cada rerun
+_hashes = {}
+
+
+def hash_fichero(ruta):
+    estado = os.stat(ruta)
+    clave = (os.path.abspath(ruta), estado.st_size, estado.st_mtime_ns)
+    if clave not in _hashes:
+        h = hashlib.sha1()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+        _hashes[clave] = h.hexdigest()[:16]
+    return _hashes[clave]
+
+
+def ruta_instantanea(nombre, ruta_fuente, version=1, carpeta=CARPETA_CACHE):
+    extension = "feather" if feather is not None else "pkl"
+    return os.path.join(carpeta, f"{nombre}-v{version}-{hash_fichero(ruta_fuente)}.{extension}")
+
+
+def _leer(ruta):
+    if ruta.endswith(".feather"):
+        # Lectura con memory map: los datos no se copian al leer el fichero
+        return feather.read_table(ruta, memory_map=True).to_pandas()
+    return pd.read_pickle(ruta)
+
+
+def _escribir(df, ruta):
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"  # varios hilos pueden generar a la vez
+    if ruta.endswith(".feather"):
+        feather.write_feather(df.reset_index(drop=True), temporal, compression="uncompressed")
+    else:
+        df.reset_index(drop=True).to_pickle(temporal)
+    os.replace(temporal, ruta)  # escritura atómica: otra sesión nunca ve un fichero a medias
+
+
+def cargar_instantanea(nombre, ruta_fuente, preparar, version=1, carpeta=CARPETA_CACHE):
+    """Carga la versión preprocesada de `ruta_fuente`, generándola si hace falta.
+
+    `preparar(ruta_fuente)` lee y limpia el fichero original y solo se ejecuta
+    cuando no existe una instantánea para el hash actual del fichero (o para la
+    `version` actual de la preparación). Las instantáneas antiguas del mismo
+    `nombre` se borran al generar una nueva.
+    """
+    ruta = ruta_instantanea(nombre, ruta_fuente, version, carpeta)
+    if os.path.exists(ruta):
+        try:
+            with medir(f"datos.{nombre}.leer"):
+                df = _leer(ruta)
+            contar("datos.instantaneas_leidas")
+            return df
+        except Exception:
+            pass  # instantánea corrupta: se regenera
+
+    with medir(f"datos.{nombre}.preparar"):
+        df = preparar(ruta_fuente)
+    contar("datos.instantaneas_generadas")
+    os.makedirs(carpeta, exist_ok=True)
+    for antigua in glob.glob(os.path.join(carpeta, f"{nombre}-v*")):
+        if antigua != ruta:
+            try:
+                os.remove(antigua)
+            except OSError:
+                pass
+    _escribir(df, ruta)
+    return df
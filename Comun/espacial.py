@@ -0,0 +1,147 @@
+"""Índice espacial de puntos (municipios, epicentros) sobre la rejilla de cuadrantes.
+
+Los cuadrantes son celdas de 1x1 grados identificadas por la esquina suroeste
+("36,-5"). Internamente se usan claves enteras (`clave_celda`), así que
+localizar el cuadrante de un punto es aritmética y no concatenar cadenas.
+
+`IndiceEspacial` combina dos estructuras sobre el mismo conjunto de puntos:
+- una rejilla de claves enteras con los puntos agrupados por celda, para
+  consultas por cuadrante (O(1)) y por caja (solo se miran las celdas que la
+  cortan);
+- un KD-tree de scipy sobre las coordenadas en la esfera unidad, para
+  vecinos en un radio en km y los k más cercanos (O(log n)).
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+RADIO_TIERRA_KM = 6371.0088
+
+# Clave entera de cada celda de 1x1 grados: (lat + 90) * 360 + (lon + 180)
+_ANCHO_REJILLA = 360
+
+
+def celda(lat, lon):
+    # Esquina suroeste (enteros) de la celda de cada punto
+    return np.floor(lat).astype(np.int64), np.floor(lon).astype(np.int64)
+
+
+def clave_celda(lat, lon):
+    """Clave entera del cuadrante que contiene cada punto (escalares o arrays)."""
+    lat_i, lon_i = celda(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float))
+    return (lat_i + 90) * _ANCHO_REJILLA + (lon_i + 180)
+
+
+def clave_de_cuadrante(cuadrante):
+    # "36,-5" -> clave entera
+    lat, lon = (int(x) for x in str(cuadrante).split(","))
+    return (lat + 90) * _ANCHO_REJILLA + (lon + 180)
+
+
+def cuadrante_de_clave(clave):
+    # Clave entera -> "36,-5"
+    lat, lon = divmod(int(clave), _ANCHO_REJILLA)
+    return f"{lat - 90},{lon - 180}"
+
+
+def cuadrante(lat, lon):
+    """Nombre del cuadrante ("36,-5") de un punto."""
+    return cuadrante_de_clave(clave_celda(lat, lon))
+
+
+def _cartesianas(lat, lon):
+    lat, lon = np.radians(np.asarray(lat, dtype=float)), np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _cuerda(radio_km):
+    # Distancia en línea recta (esfera unidad) equivalente a un arco de radio_km
+    return 2 * np.sin(np.asarray(radio_km, dtype=float) / (2 * RADIO_TIERRA_KM))
+
+
+def distancia_km(lat1, lon1, lat2, lon2):
+    """Distancia de haversine en km (acepta arrays)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class IndiceEspacial:
+    """Índice de un conjunto fijo de puntos (lat, lon).
+
+    Las consultas devuelven posiciones (enteros) sobre los arrays originales,
+    que se usan con `.iloc` / `.take` sobre la tabla de la que salen.
+    """
+
+    def __init__(self, lat, lon):
+        self.lat = np.ascontiguousarray(lat, dtype=float)
+        self.lon = np.ascontiguousarray(lon, dtype=float)
+        if self.lat.shape != self.lon.shape:
+            raise ValueError("lat y lon deben tener la misma longitud")
+        self.claves = clave_celda(self.lat, self.lon)
+
+        # Puntos ordenados por celda; cada celda es un tramo [inicio, fin) de `self._orden`
+        self._orden = np.argsort(self.claves, kind="stable")
+        claves_ordenadas = self.claves[self._orden]
+        unicas, inicios = np.unique(claves_ordenadas, return_index=True)
+        fines = np.append(inicios[1:], len(claves_ordenadas))
+        self._tramos = {int(c): (int(i), int(f)) for c, i, f in zip(unicas, inicios, fines)}
+        self._arbol = None
+
+    @classmethod
+    def desde_tabla(cls, df, lat="lat", lon="lng"):
+        return cls(df[lat].to_numpy(), df[lon].to_numpy())
+
+    def __len__(self):
+        return len(self.lat)
+
+    @property
+    def arbol(self):
+        # El KD-tree solo se construye si se hace alguna consulta por distancia
+        if self._arbol is None:
+            self._arbol = cKDTree(_cartesianas(self.lat, self.lon))
+        return self._arbol
+
+    def cuadrantes(self):
+        return [cuadrante_de_clave(c) for c in self._tramos]
+
+    def en_cuadrante(self, cuadrante):
+        """Posiciones de los puntos dentro del cuadrante ("36,-5" o clave entera)."""
+        clave = clave_de_cuadrante(cuadrante) if isinstance(cuadrante, str) else int(cuadrante)
+        inicio, fin = self._tramos.get(clave, (0, 0))
+        return np.sort(self._orden[inicio:fin])
+
+    def en_caja(self, lat_min, lat_max, lon_min, lon_max):
+        """Posiciones de los puntos con lat_min <= lat <= lat_max y lon_min <= lon <= lon_max."""
+        # Solo se recorren las celdas que corta la caja
+        claves = [(la + 90) * _ANCHO_REJILLA + (lo + 180)
+                  for la in range(int(np.floor(lat_min)), int(np.floor(lat_max)) + 1)
+                  for lo in range(int(np.floor(lon_min)), int(np.floor(lon_max)) + 1)]
+        candidatos = [self._orden[slice(*self._tramos[c])] for c in claves if c in self._tramos]
+        if not candidatos:
+            return np.empty(0, dtype=np.int64)
+        candidatos = np.concatenate(candidatos)
+        lat, lon = self.lat[candidatos], self.lon[candidatos]
+        dentro = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+        return np.sort(candidatos[dentro])
+
+    def en_radio(self, lat, lon, radio_km):
+        """Posiciones de los puntos a menos de `radio_km` km de (lat, lon), ordenadas por distancia."""
+        posiciones = np.asarray(self.arbol.query_ball_point(_cartesianas(lat, lon)[0], _cuerda(radio_km)),
+                                dtype=np.int64)
+        return posiciones[np.argsort(self.distancia(lat, lon, posiciones), kind="stable")]
+
+    def distancia(self, lat, lon, posiciones):
+        # Distancia en km de (lat, lon) a los puntos indicados
+        return distancia_km(lat, lon, self.lat[posiciones], self.lon[posiciones])
+
+    def vecinos(self, lat, lon, k=1):
+        """`(posiciones, distancias_km)` de los k puntos más cercanos a (lat, lon)."""
+        k = min(k, len(self))
+        _, posiciones = self.arbol.query(_cartesianas(lat, lon)[0], k=k)
+        posiciones = np.atleast_1d(posiciones).astype(np.int64)
+        return posiciones, self.distancia(lat, lon, posiciones)
+
+    def agrupar_por_cuadrante(self, valores, funcion=np.mean):
+        """Aplica `funcion` a `valores` por cuadrante; devuelve {cuadrante: resultado}."""
+        valores = np.asarray(valores)
+        return {cuadrante_de_clave(c): funcion(valores[self._orden[i:f]]) for c, (i, f) in self._tramos.items()}
@@ -0,0 +1,166 @@
+"""Exportación de tablas y gráficos.
+
+Las tablas se escriben por trozos de `FILAS_POR_TROZO` filas (CSV con la
+cabecera una sola vez, Parquet con un grupo de filas por trozo), así que
+nunca se tiene a la vez el texto de toda la tabla además del fichero. Las
+descargas de Streamlit se generan como `bytes` solo al pulsar el botón.
+
+Los gráficos de matplotlib se dibujan cuando hacen falta, se guardan como PNG
+en una caché por huella del resultado (`huella`) y la figura se cierra en el
+momento, para que un servidor que lleva días en marcha no acumule figuras.
+"""
+import collections.abc
+import functools
+import hashlib
+import os
+import threading
+import typing
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from Comun.instrumentacion import contar, medir
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sin pyarrow solo se exporta CSV
+    pa = pq = None
+
+FILAS_POR_TROZO = 100_000
+MAX_GRAFICOS = 32
+
+FORMATOS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+def formatos_disponibles():
+    return [f for f in FORMATOS if f != "parquet" or pq is not None]
+
+
+def _trozos(df, filas_por_trozo):
+    for inicio in range(0, max(len(df), 1), filas_por_trozo):
+        yield inicio, df.iloc[inicio:inicio + filas_por_trozo]
+
+
+def escribir_csv(df, destino, filas_por_trozo=FILAS_POR_TROZO):
+    """Escribe `df` como CSV UTF-8 en `destino` (fichero binario abierto) por trozos."""
+    for inicio, trozo in _trozos(df, filas_por_trozo):
+        destino.write(trozo.to_csv(index=False, header=inicio == 0).encode("utf-8"))
+
+
+def escribir_parquet(df, destino, filas_por_trozo=FILAS_POR_TROZO):
+    """Escribe `df` como Parquet en `destino` (ruta o fichero binario), un grupo de filas por trozo."""
+    if pq is None:
+        raise ImportError("Para exportar a Parquet hace falta pyarrow (pip install pyarrow)")
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        for _, trozo in _trozos(df, filas_por_trozo):
+            escritor.write_table(pa.Table.from_pandas(trozo, schema=esquema, preserve_index=False))
+
+
+def guardar_tabla(df, ruta, filas_por_trozo=FILAS_POR_TROZO):
+    # Formato según la extensión: .parquet o .csv
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    if ruta.endswith(".parquet"):
+        escribir_parquet(df, ruta, filas_por_trozo)
+    else:
+        with open(ruta, "wb") as f:
+            escribir_csv(df, f, filas_por_trozo)
+
+
+def exportar(df, formato="csv", filas_por_trozo=FILAS_POR_TROZO):
+    """Contenido del fichero (`bytes`, lo que acepta `st.download_button`) con la tabla en `formato`."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato} (disponibles: {', '.join(FORMATOS)})")
+    fichero = BytesIO()
+    with medir(f"exportacion.{formato}"):
+        if formato == "parquet":
+            escribir_parquet(df, fichero, filas_por_trozo)
+        else:
+            escribir_csv(df, fichero, filas_por_trozo)
+    contar(f"exportacion.{formato}")
+    return fichero.getvalue()
+
+
+def huella(*objetos):
+    """Hash corto de DataFrames, Series, arrays y valores simples (para claves de caché)."""
+    h = hashlib.sha1()
+    for objeto in objetos:
+        if isinstance(objeto, pd.DataFrame):
+            h.update(repr(list(objeto.columns)).encode())
+            h.update(pd.util.hash_pandas_object(objeto, index=True).to_numpy().tobytes())
+        elif isinstance(objeto, pd.Series):
+            h.update(pd.util.hash_pandas_object(objeto, index=True).to_numpy().tobytes())
+        elif isinstance(objeto, np.ndarray):
+            h.update(repr((objeto.dtype.str, objeto.shape)).encode())
+            h.update(np.ascontiguousarray(objeto).tobytes())
+        else:
+            h.update(repr(objeto).encode())
+    return h.hexdigest()[:16]
+
+
+# PNG de los gráficos ya dibujados, por clave (LRU)
+_graficos = OrderedDict()
+_lock_graficos = threading.Lock()
+
+
+def grafico_png(clave, dibujar, dpi=120):
+    """PNG del gráfico que devuelve `dibujar()` (una figura de matplotlib), dibujado una sola vez por clave.
+
+    La figura se cierra nada más guardarla.
+    """
+    with _lock_graficos:
+        if clave in _graficos:
+            _graficos.move_to_end(clave)
+            contar("exportacion.graficos_cache")
+            return _graficos[clave]
+
+    import matplotlib.pyplot as plt
+
+    fig = dibujar()
+    try:
+        buf = BytesIO()
+        with medir("exportacion.savefig"):
+            fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    png = buf.getvalue()
+    with _lock_graficos:
+        _graficos[clave] = png
+        while len(_graficos) > MAX_GRAFICOS:
+            _graficos.popitem(last=False)
+    contar("exportacion.graficos_dibujados")
+    return png
+
+
+@functools.lru_cache(maxsize=None)
+def descargas_diferidas():
+    """True si `st.download_button` de la versión instalada acepta una función como `data`."""
+    try:
+        from streamlit.elements.widgets.button import DownloadButtonDataType
+    except ImportError:
+        return False
+    return any(typing.get_origin(tipo) is collections.abc.Callable for tipo in typing.get_args(DownloadButtonDataType))
+
+
+def boton_descarga(st, etiqueta, generar, nombre, mime, **kwargs):
+    """`st.download_button` que solo genera el contenido (`generar()`) cuando se pulsa.
+
+    Las versiones de Streamlit que no aceptan una función como `data` (ver
+    `descargas_diferidas`) reciben el contenido ya generado.
+    """
+    data = generar if descargas_diferidas() else generar()
+    return st.download_button(etiqueta, data=data, file_name=nombre, mime=mime, **kwargs)
+
+
+def botones_tabla(st, df, nombre, etiqueta="📥 Descargar tabla", clave=None):
+    # Un botón por formato disponible; la tabla se escribe al pulsar
+    columnas = st.columns(len(formatos_disponibles()))
+    for columna, formato in zip(columnas, formatos_disponibles()):
+        with columna:
+            boton_descarga(st, f"{etiqueta} ({formato.upper()})", lambda formato=formato: exportar(df, formato),
+                           f"{nombre}.{formato}", FORMATOS[formato], key=f"{clave or nombre}_{formato}")
@@ -0,0 +1,257 @@
+"""Tiempos, memoria residente y contadores por etapa.
+
+Se activa con la variable de entorno `DESASTRES_INSTRUMENTACION=1`, con
+`?debug=1` en la URL de la aplicación o con `activar()`. Desactivada,
+`medir` devuelve un contexto vacío compartido, `medido` llama directamente a
+la función y `contar` no hace nada: el coste es comprobar un booleano.
+
+Uso:
+    with medir("incendios.clima"):
+        ...
+
+    @medido("seismos.prediccion")
+    def predecir(...):
+        ...
+
+Las estadísticas acumuladas son del proceso (todas las sesiones). Además,
+cada hilo guarda la traza de su última ejecución (`iniciar_traza()` al
+principio de cada rerun), que es lo que muestra el panel de depuración.
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+from Comun.memoria import memoria_residente
+
+_activa = os.environ.get("DESASTRES_INSTRUMENTACION", "").lower() not in ("", "0", "false", "no")
+
+_lock = threading.Lock()
+_etapas = {}
+_contadores = {}
+_local = threading.local()
+
+COLUMNAS_ETAPAS = ["etapa", "llamadas", "total_s", "media_s", "max_s", "ultimo_s", "memoria_mb", "errores"]
+COLUMNAS_TRAZA = ["etapa", "nivel", "segundos", "memoria_mb"]
+
+
+def activar(valor=True):
+    global _activa
+    _activa = bool(valor)
+
+
+def activa():
+    return _activa
+
+
+class _Estadistica:
+    __slots__ = ("llamadas", "total", "maximo", "ultimo", "memoria", "errores")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.ultimo = 0.0
+        self.memoria = 0
+        self.errores = 0
+
+
+class _Nulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _Nulo()
+
+
+class _Medicion:
+    __slots__ = ("nombre", "inicio", "memoria", "nivel", "orden")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.nivel = getattr(_local, "nivel", 0)
+        _local.nivel = self.nivel + 1
+        self.orden = getattr(_local, "orden", 0)
+        _local.orden = self.orden + 1
+        self.memoria = memoria_residente()
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        segundos = time.perf_counter() - self.inicio
+        memoria = memoria_residente()
+        delta = memoria - self.memoria if memoria is not None and self.memoria is not None else 0
+        _local.nivel = self.nivel
+        with _lock:
+            estadistica = _etapas.get(self.nombre)
+            if estadistica is None:
+                estadistica = _etapas[self.nombre] = _Estadistica()
+            estadistica.llamadas += 1
+            estadistica.total += segundos
+            estadistica.maximo = max(estadistica.maximo, segundos)
+            estadistica.ultimo = segundos
+            estadistica.memoria += delta
+            estadistica.errores += tipo is not None
+        traza_hilo = getattr(_local, "traza", None)
+        if traza_hilo is not None:
+            traza_hilo.append((self.orden, self.nombre, self.nivel, segundos, delta))
+        return False
+
+
+def medir(nombre):
+    """Contexto que mide el tiempo y la variación de memoria residente de una etapa."""
+    return _Medicion(nombre) if _activa else _NULO
+
+
+def medido(nombre=None):
+    """Decorador equivalente a `medir`; por defecto usa `modulo.funcion` como nombre."""
+    def decorador(funcion):
+        etapa = nombre or f"{funcion.__module__}.{funcion.__qualname__}"
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _activa:
+                return funcion(*args, **kwargs)
+            with _Medicion(etapa):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def contar(nombre, n=1):
+    if _activa:
+        with _lock:
+            _contadores[nombre] = _contadores.get(nombre, 0) + n
+
+
+def iniciar_traza():
+    # Empieza la traza de una ejecución en este hilo (en Streamlit, un rerun de una sesión)
+    _local.traza = [] if _activa else None
+    _local.nivel = 0
+    _local.orden = 0
+
+
+def traza():
+    import pandas as pd
+
+    # Las etapas se registran al terminar; se muestran en orden de inicio
+    filas = [(nombre, nivel, round(segundos, 4), round(delta / 2**20, 2))
+             for _, nombre, nivel, segundos, delta in sorted(getattr(_local, "traza", None) or [])]
+    return pd.DataFrame(filas, columns=COLUMNAS_TRAZA)
+
+
+def traza_cruda():
+    # Entradas de la traza de este hilo tal cual, para incorporarlas en otro (ver `incorporar_traza`)
+    return list(getattr(_local, "traza", None) or [])
+
+
+def incorporar_traza(entradas):
+    """Añade a la traza de este hilo las etapas medidas en otro (p. ej. un trabajo en segundo plano)."""
+    traza_hilo = getattr(_local, "traza", None)
+    if traza_hilo is None or not entradas:
+        return
+    base, nivel = getattr(_local, "orden", 0), getattr(_local, "nivel", 0)
+    for orden, nombre, nivel_entrada, segundos, delta in entradas:
+        traza_hilo.append((base + orden, nombre, nivel + nivel_entrada, segundos, delta))
+    _local.orden = base + max(e[0] for e in entradas) + 1
+
+
+def vaciar():
+    with _lock:
+        _etapas.clear()
+        _contadores.clear()
+
+
+def estadisticas():
+    """Estadísticas acumuladas: `{"etapas": {...}, "contadores": {...}}`."""
+    with _lock:
+        etapas = {
+            nombre: {
+                "llamadas": e.llamadas,
+                "total_s": e.total,
+                "media_s": e.total / e.llamadas if e.llamadas else 0.0,
+                "max_s": e.maximo,
+                "ultimo_s": e.ultimo,
+                "memoria_bytes": e.memoria,
+                "errores": e.errores,
+            }
+            for nombre, e in _etapas.items()
+        }
+        contadores = dict(_contadores)
+    return {"etapas": etapas, "contadores": contadores}
+
+
+def tabla_etapas():
+    import pandas as pd
+
+    filas = [[nombre, e["llamadas"], round(e["total_s"], 4), round(e["media_s"], 4), round(e["max_s"], 4),
+              round(e["ultimo_s"], 4), round(e["memoria_bytes"] / 2**20, 2), e["errores"]]
+             for nombre, e in sorted(estadisticas()["etapas"].items())]
+    return pd.DataFrame(filas, columns=COLUMNAS_ETAPAS)
+
+
+def exportar_json():
+    return json.dumps(estadisticas(), ensure_ascii=False, indent=2)
+
+
+def _etiqueta(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def exportar_prometheus(prefijo="desastres"):
+    """Estadísticas en el formato de texto de Prometheus."""
+    datos = estadisticas()
+    metricas = [
+        ("etapa_llamadas_total", "counter", "Ejecuciones de cada etapa", "llamadas"),
+        ("etapa_segundos_total", "counter", "Tiempo acumulado de cada etapa", "total_s"),
+        ("etapa_segundos_max", "gauge", "Tiempo máximo de una ejecución de cada etapa", "max_s"),
+        ("etapa_segundos_ultimo", "gauge", "Tiempo de la última ejecución de cada etapa", "ultimo_s"),
+        ("etapa_memoria_delta_bytes", "gauge", "Variación acumulada de memoria residente de cada etapa", "memoria_bytes"),
+        ("etapa_errores_total", "counter", "Ejecuciones de cada etapa terminadas con excepción", "errores"),
+    ]
+    lineas = []
+    for nombre, tipo, ayuda, clave in metricas:
+        lineas += [f"# HELP {prefijo}_{nombre} {ayuda}", f"# TYPE {prefijo}_{nombre} {tipo}"]
+        lineas += [f'{prefijo}_{nombre}{{etapa="{_etiqueta(etapa)}"}} {valores[clave]}'
+                   for etapa, valores in sorted(datos["etapas"].items())]
+    lineas += [f"# HELP {prefijo}_contador_total Contadores de eventos",
+               f"# TYPE {prefijo}_contador_total counter"]
+    lineas += [f'{prefijo}_contador_total{{nombre="{_etiqueta(nombre)}"}} {valor}'
+               for nombre, valor in sorted(datos["contadores"].items())]
+    memoria = memoria_residente()
+    if memoria is not None:
+        lineas += [f"# HELP {prefijo}_memoria_residente_bytes Memoria residente del proceso",
+                   f"# TYPE {prefijo}_memoria_residente_bytes gauge",
+                   f"{prefijo}_memoria_residente_bytes {memoria}"]
+    return "\n".join(lineas) + "\n"
+
+
+def activar_desde_url(st):
+    # ?debug=1 en la URL activa la instrumentación (para todo el proceso)
+    if st.query_params.get("debug", "") not in ("", "0"):
+        activar()
+
+
+def mostrar_panel(st):
+    """Panel de depuración en la barra lateral; solo aparece con la instrumentación activa."""
+    if not _activa:
+        return
+    with st.sidebar.expander("⏱️ Instrumentación"):
+        st.caption("Última ejecución")
+        st.dataframe(traza(), hide_index=True)
+        st.caption("Acumulado del proceso")
+        st.dataframe(tabla_etapas(), hide_index=True)
+        contadores = estadisticas()["contadores"]
+        if contadores:
+            st.json(contadores)
+        st.download_button("📥 JSON", exportar_json(), file_name="instrumentacion.json", mime="application/json")
+        st.download_button("📥 Prometheus", exportar_prometheus(), file_name="instrumentacion.prom",
+                           mime="text/plain")
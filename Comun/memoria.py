@@ -0,0 +1,25 @@
+import os
+import sys
+
+try:
+    import psutil
+except ImportError:  # psutil es opcional
+    psutil = None
+
+
+def memoria_residente():
+    """Memoria residente (RSS) del proceso actual en bytes, o None si no se puede medir."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows sin psutil
+        return None
+    # ru_maxrss es el pico de memoria (KB en Linux, bytes en macOS)
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+import pandas as pd
+
+from Comun.instrumentacion import contar, medir
+from Comun.memoria import memoria_residente
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rutas de los modelos conocidos, relativas a la raíz del proyecto
+MODELOS = {
+    "ocurrencia": os.path.join("Incendios", "modelo_ocurrencia_incendios.pkl"),
+    "extension": os.path.join("Incendios", "modelo_prediccion_extension_incendio.pkl"),
+    "magnitud": os.path.join("Seismos", "modelo_magnitud.pkl"),
+    "tsunami": os.path.join("Seismos", "modelo_tsunami.pkl"),
+}
+PLANTILLA_FRECUENCIA = os.path.join("Seismos", "modelos_frecuencia", "modelo_frecuencia_{lat}_{lon}.pkl")
+# Todos los modelos de frecuencia en formato compacto (ver Seismos/modelos_compactos.py)
+RUTA_FRECUENCIA_COMPACTA = os.path.join("Seismos", "modelos_frecuencia.npz")
+
+# Cuántos modelos de frecuencia por cuadrante se mantienen en memoria a la vez
+MAX_MODELOS_FRECUENCIA = 32
+
+
+class _Entrada:
+    __slots__ = ("modelo", "mtime", "tiempo_carga", "memoria", "cargas", "usos")
+
+    def __init__(self):
+        self.modelo = None
+        self.mtime = None
+        self.tiempo_carga = 0.0
+        self.memoria = None
+        self.cargas = 0
+        self.usos = 0
+
+
+class RegistroModelos:
+    """Caché de modelos `.pkl` compartida por todas las sesiones del proceso.
+
+    Cada modelo se carga la primera vez que se pide y se vuelve a cargar si
+    cambia la fecha de modificación del fichero. Los modelos de un grupo con
+    límite (los de frecuencia por cuadrante) se guardan en un LRU acotado.
+    """
+
+    def __init__(self, raiz=RAIZ, limites=None, cargador=joblib.load):
+        self.raiz = raiz
+        self.limites = {"frecuencia": MAX_MODELOS_FRECUENCIA} if limites is None else dict(limites)
+        self.cargador = cargador
+        self._entradas = {}
+        self._grupos = {}
+        self._lock = threading.RLock()
+
+    def _ruta_absoluta(self, ruta):
+        return ruta if os.path.isabs(ruta) else os.path.join(self.raiz, ruta)
+
+    def cargar(self, ruta, grupo=None, cargador=None):
+        ruta = self._ruta_absoluta(ruta)
+        mtime = os.stat(ruta).st_mtime  # FileNotFoundError si no existe
+        with self._lock:
+            entrada = self._entradas.get(ruta)
+            if entrada is None:
+                entrada = self._entradas[ruta] = _Entrada()
+            if entrada.modelo is None or entrada.mtime != mtime:
+                entrada.modelo = None  # liberar la versión anterior antes de medir
+                memoria_antes = memoria_residente()
+                inicio = time.perf_counter()
+                with medir("modelos.cargar"):
+                    entrada.modelo = (cargador or self.cargador)(ruta)
+                entrada.tiempo_carga = time.perf_counter() - inicio
+                memoria_despues = memoria_residente()
+                if memoria_antes is not None and memoria_despues is not None:
+                    entrada.memoria = max(memoria_despues - memoria_antes, 0)
+                entrada.mtime = mtime
+                entrada.cargas += 1
+                contar("modelos.cargas")
+            else:
+                contar("modelos.aciertos_cache")
+            entrada.usos += 1
+            if grupo is not None:
+                self._usar_en_grupo(grupo, ruta)
+            return entrada.modelo
+
+    def _usar_en_grupo(self, grupo, ruta):
+        lru = self._grupos.setdefault(grupo, OrderedDict())
+        lru[ruta] = True
+        lru.move_to_end(ruta)
+        limite = self.limites.get(grupo)
+        while limite is not None and len(lru) > limite:
+            expulsada, _ = lru.popitem(last=False)
+            self._entradas[expulsada].modelo = None
+
+    def modelo(self, nombre):
+        return self.cargar(MODELOS[nombre])
+
+    def modelo_frecuencia(self, cuadrante):
+        lat, lon = (x.strip() for x in str(cuadrante).split(","))
+        # Se usa el formato compacto si existe y tiene el cuadrante sin cambios en su .pkl; si no, el .pkl
+        if os.path.exists(self._ruta_absoluta(RUTA_FRECUENCIA_COMPACTA)):
+            from Seismos.modelos_compactos import cargar_compactos
+            carpeta_origen = self._ruta_absoluta(os.path.dirname(PLANTILLA_FRECUENCIA))
+            compactos = self.cargar(RUTA_FRECUENCIA_COMPACTA,
+                                    cargador=lambda ruta: cargar_compactos(ruta, carpeta_origen))
+            if compactos.vigente(f"{lat},{lon}"):
+                return compactos.modelo(f"{lat},{lon}")
+        return self.cargar(PLANTILLA_FRECUENCIA.format(lat=lat, lon=lon), grupo="frecuencia")
+
+    def vaciar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._grupos.clear()
+
+    def estadisticas(self):
+        # Tiempo de carga y memoria residente añadida por cada modelo
+        filas = []
+        with self._lock:
+            for ruta, entrada in self._entradas.items():
+                filas.append({
+                    "modelo": os.path.relpath(ruta, self.raiz),
+                    "en_memoria": entrada.modelo is not None,
+                    "tiempo_carga_s": round(entrada.tiempo_carga, 4),
+                    "memoria_mb": None if entrada.memoria is None else round(entrada.memoria / 2**20, 2),
+                    "fichero_mb": round(os.path.getsize(ruta) / 2**20, 2) if os.path.exists(ruta) else None,
+                    "cargas": entrada.cargas,
+                    "usos": entrada.usos,
+                })
+        return pd.DataFrame(filas, columns=["modelo", "en_memoria", "tiempo_carga_s", "memoria_mb",
+                                            "fichero_mb", "cargas", "usos"])
+
+
+# Registro único del proceso: Streamlit importa los módulos una vez y lo comparten todas las sesiones
+registro = RegistroModelos()
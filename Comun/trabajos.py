@@ -0,0 +1,225 @@
+"""Ejecución de predicciones en segundo plano, compartida entre sesiones.
+
+Un `Trabajo` ejecuta una función en un pool de hilos del proceso. La función
+recibe un argumento `progreso(fraccion, mensaje)` con el que informa de su
+avance; esa misma llamada lanza `TrabajoCancelado` si se ha pedido cancelar,
+así que la cancelación se hace efectiva en el siguiente punto de avance.
+
+Los trabajos se identifican por una clave (los parámetros de la predicción).
+Si otra sesión pide la misma clave mientras el trabajo está en marcha o
+después de terminar, recibe el mismo `Trabajo`: el cálculo se hace una sola
+vez y su resultado queda en la caché del gestor (LRU con caducidad).
+
+En Streamlit: `enviar` al pulsar el botón, guardar el trabajo en
+`st.session_state` y llamar a `esperar(st, trabajo)` antes de usar el
+resultado; mientras no termina muestra el progreso y un botón de cancelar y
+vuelve a ejecutar el script cada poco (`st.rerun`).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from Comun import instrumentacion
+from Comun.instrumentacion import contar
+
+# Resultados que se conservan y durante cuánto tiempo (como la caché anterior de la app de incendios)
+MAX_RESULTADOS = 24
+CADUCIDAD_S = 6 * 3600
+
+INTERVALO_SONDEO_S = 0.5
+
+
+class TrabajoCancelado(Exception):
+    """Se ha cancelado el trabajo; la lanza la función `progreso` dentro del trabajo."""
+
+
+class Trabajo:
+    def __init__(self, clave, funcion, args, kwargs):
+        self.clave = clave
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.progreso = 0.0
+        self.mensaje = "En cola"
+        self.inicio = None
+        self.fin = None
+        self.suscriptores = 1
+        self.traza = []
+        self._cancelar = threading.Event()
+        self._future = None
+
+    def _informar(self, fraccion, mensaje=None):
+        if self._cancelar.is_set():
+            raise TrabajoCancelado(f"Trabajo cancelado: {self.clave}")
+        self.progreso = min(max(float(fraccion), 0.0), 1.0)
+        if mensaje is not None:
+            self.mensaje = mensaje
+
+    def _ejecutar(self):
+        self.inicio = time.time()
+        self._informar(0.0, "En marcha")
+        instrumentacion.iniciar_traza()  # las etapas medidas en el hilo del trabajo (ver `esperar`)
+        try:
+            resultado = self.funcion(*self.args, progreso=self._informar, **self.kwargs)
+        finally:
+            self.fin = time.time()
+            self.traza = instrumentacion.traza_cruda()
+        self.progreso, self.mensaje = 1.0, "Terminado"
+        return resultado
+
+    @property
+    def terminado(self):
+        return self._future is not None and self._future.done()
+
+    @property
+    def cancelado(self):
+        return self._cancelar.is_set()
+
+    @property
+    def fallido(self):
+        return self.terminado and (self._future.cancelled() or self._future.exception() is not None)
+
+    def resultado(self, timeout=None):
+        """Resultado del trabajo (espera si hace falta); relanza su excepción si falló."""
+        return self._future.result(timeout)
+
+    def duracion(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.time()) - self.inicio
+
+
+class GestorTrabajos:
+    """Pool de hilos con los trabajos en marcha y los resultados recientes, por clave."""
+
+    def __init__(self, max_trabajadores=None, max_resultados=MAX_RESULTADOS, caducidad_s=CADUCIDAD_S):
+        self.max_trabajadores = (max_trabajadores or int(os.environ.get("DESASTRES_TRABAJADORES", 0))
+                                 or min(4, os.cpu_count() or 1))
+        self.max_resultados = max_resultados
+        self.caducidad_s = caducidad_s
+        self._pool = None
+        self._trabajos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _ejecutor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_trabajadores, thread_name_prefix="prediccion")
+        return self._pool
+
+    def _vigente(self, trabajo):
+        # Un trabajo se reutiliza si sigue en marcha o terminó bien hace menos de `caducidad_s`
+        if trabajo.cancelado or trabajo.fallido:
+            return False
+        return not trabajo.terminado or time.time() - trabajo.fin < self.caducidad_s
+
+    def enviar(self, clave, funcion, *args, **kwargs):
+        """Lanza `funcion(*args, progreso=..., **kwargs)` o devuelve el trabajo existente con la misma clave."""
+        with self._lock:
+            trabajo = self._trabajos.get(clave)
+            if trabajo is not None and self._vigente(trabajo):
+                trabajo.suscriptores += 1
+                self._trabajos.move_to_end(clave)
+                contar("trabajos.reutilizados")
+                return trabajo
+            contar("trabajos.enviados")
+            trabajo = Trabajo(clave, funcion, args, kwargs)
+            self._trabajos[clave] = trabajo
+            trabajo._future = self._ejecutor().submit(trabajo._ejecutar)
+            self._recortar()
+            return trabajo
+
+    def renovar(self, anterior, clave, funcion, *args, **kwargs):
+        """Como `enviar`, pero para una sesión que ya esperaba `anterior`.
+
+        Si `anterior` es el mismo trabajo y sigue siendo válido se devuelve tal
+        cual (pulsar dos veces el botón no lanza nada nuevo); si no, se retira
+        la suscripción a `anterior` (en marcha o terminado) y se envía el nuevo.
+        """
+        if anterior is not None:
+            if anterior.clave == clave and self._vigente(anterior):
+                return anterior
+            self.cancelar(anterior)
+        return self.enviar(clave, funcion, *args, **kwargs)
+
+    def _recortar(self):
+        # Descarta los resultados caducados o fallidos que ninguna sesión usa y, si siguen sobrando, los más
+        # antiguos, empezando por los que no tienen sesiones (nunca los trabajos en marcha)
+        for clave, trabajo in list(self._trabajos.items()):
+            if trabajo.terminado and trabajo.suscriptores == 0 and not self._vigente(trabajo):
+                del self._trabajos[clave]
+        terminados = sorted((c for c, t in self._trabajos.items() if t.terminado),
+                            key=lambda c: self._trabajos[c].suscriptores > 0)
+        for clave in terminados[:max(0, len(self._trabajos) - self.max_resultados)]:
+            del self._trabajos[clave]
+
+    def cancelar(self, trabajo):
+        """Retira la suscripción de una sesión.
+
+        Un trabajo en marcha se cancela cuando ninguna sesión lo espera ya; uno
+        terminado sin sesiones queda en la caché hasta que caduca o se expulsa
+        (si falló, se descarta en el momento).
+        """
+        with self._lock:
+            trabajo.suscriptores = max(0, trabajo.suscriptores - 1)
+            if trabajo.suscriptores == 0 and not trabajo.terminado:
+                contar("trabajos.cancelados")
+                trabajo._cancelar.set()
+                trabajo._future.cancel()  # si aún no había empezado
+                if self._trabajos.get(trabajo.clave) is trabajo:
+                    del self._trabajos[trabajo.clave]
+            self._recortar()
+
+    def vaciar(self):
+        with self._lock:
+            for trabajo in self._trabajos.values():
+                trabajo._cancelar.set()
+            self._trabajos.clear()
+
+    def estado(self):
+        import pandas as pd
+
+        with self._lock:
+            trabajos = list(self._trabajos.values())
+        filas = [{
+            "clave": str(t.clave),
+            "estado": "cancelado" if t.cancelado else "error" if t.fallido else
+                      "terminado" if t.terminado else "en marcha" if t.inicio else "en cola",
+            "progreso": round(t.progreso, 2),
+            "segundos": round(t.duracion(), 2),
+            "sesiones": t.suscriptores,
+        } for t in trabajos]
+        return pd.DataFrame(filas, columns=["clave", "estado", "progreso", "segundos", "sesiones"])
+
+
+def esperar(st, trabajo, gestor=None, etiqueta="Calculando predicciones...", clave_widget="cancelar_trabajo"):
+    """Muestra el progreso de `trabajo` hasta que termine (sondeo con `st.rerun`).
+
+    Devuelve True cuando el trabajo ha terminado (bien o con error; el
+    resultado se obtiene con `trabajo.resultado()`) y False si se ha
+    cancelado desde esta sesión. Si esta sesión ha esperado al trabajo, sus
+    etapas se añaden a la traza de la ejecución en la que termina.
+    """
+    gestor = gestor or gestor_global
+    pendiente = f"{clave_widget}_pendiente"
+    if trabajo.cancelado:
+        st.session_state.pop(pendiente, None)
+        return False
+    if trabajo.terminado:
+        if st.session_state.pop(pendiente, None) == trabajo.clave:
+            instrumentacion.incorporar_traza(trabajo.traza)
+        return True
+    st.session_state[pendiente] = trabajo.clave
+    barra = st.progress(trabajo.progreso, text=f"{etiqueta} {trabajo.mensaje} ({trabajo.duracion():.0f} s)")
+    if st.button("✖️ Cancelar", key=clave_widget):
+        gestor.cancelar(trabajo)
+        st.session_state.pop(pendiente, None)
+        barra.empty()
+        return False
+    time.sleep(INTERVALO_SONDEO_S)
+    st.rerun()
+
+
+# Gestor único del proceso: lo comparten todas las sesiones de Streamlit
+gestor_global = GestorTrabajos()
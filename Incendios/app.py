@@ -1,31 +1,38 @@
 def main():
     import streamlit as st
     import pandas as pd
-    import numpy as np
-    import folium
-    from folium.plugins import MarkerCluster
     from streamlit_folium import st_folium
-    import joblib
     import plotly.express as px
     from datetime import datetime
+    from Comun import instrumentacion
+    from Comun.instrumentacion import medir
+    from Comun.modelos import registro
+    from Comun.trabajos import esperar, gestor_global
+    from Incendios.mapa import UMBRAL_MARCADORES, construir_mapa
+    from Incendios.features import ErrorEsquema
+    from Comun.exportacion import botones_tabla
+    from Incendios.pipeline import columnas_exportacion, filtrar_resultados, predecir_incendios, riesgo_por_cuadrante
+    from Incendios.temporada import PrediccionTemporada, predecir_temporada
+    from Seismos.datos import cargar_zonas
+
+    instrumentacion.activar_desde_url(st)
+    instrumentacion.iniciar_traza()
 
     # Configuración general
     st.title("🔥 Mapa de Riesgo de Incendios en la Península Ibérica")
 
-    # Carga de modelos
-    modelo = joblib.load("Incendios\\modelo_ocurrencia_incendios.pkl")
-    @st.cache_resource
-    def cargar_modelo_extension():
-        return joblib.load("Incendios\\modelo_prediccion_extension_incendio.pkl")
-
-    modelo_extension = cargar_modelo_extension()
-
-    # Carga de datos
-    df_mun = pd.read_csv("Incendios\\MUNICIPIOS.csv", encoding='ISO-8859-1', sep=';', on_bad_lines='warn', decimal=',')
-
-    # Filtrar solo península
-    provincias_excluir = ['Santa Cruz de Tenerife', 'Las Palmas', 'Illes Balears', 'Ceuta', 'Melilla']
-    df_peninsula = df_mun[~df_mun['PROVINCIA'].isin(provincias_excluir)].copy()
+    def mostrar_calendario(temporada):
+        # Calendario de riesgo: probabilidad media por provincia y mes, y el agregado del mes elegido
+        st.subheader("📅 Calendario de riesgo por provincia")
+        calendario = temporada.calendario().rename(columns=lambda m: meses_nombre[m - 1][:3])
+        fig_calendario = px.imshow(calendario, aspect="auto", color_continuous_scale="Reds",
+                                   labels={"x": "Mes", "y": "Provincia", "color": "Probabilidad media"})
+        fig_calendario.update_layout(height=max(400, 18 * len(calendario)))
+        st.plotly_chart(fig_calendario, use_container_width=True)
+        with st.expander("📋 Agregado por provincia"):
+            por_provincia = temporada.por_provincia()
+            st.dataframe(por_provincia[por_provincia["mes"] == mes].round(3), hide_index=True)
+            botones_tabla(st, por_provincia, "temporada_provincias", "📥 Agregado (12 meses)")
 
     # --- Sidebar ---
     st.sidebar.header("🎯 Filtro de predicción")
@@ -43,96 +50,94 @@ def main():
     # Mostrar solo Catástrofes
     solo_catastrofes = st.sidebar.checkbox("💥 Mostrar solo catástrofes (>500 ha)", value=False)
 
+    # Modo de dibujo del mapa
+    MODOS_MAPA = {
+        f"Automático (capa única con más de {UMBRAL_MARCADORES} municipios)": "auto",
+        "Marcadores (folium)": "marcadores",
+        "Capa única (pydeck)": "capa",
+    }
+    modo_mapa = st.sidebar.selectbox("🗺️ Modo del mapa", list(MODOS_MAPA))
+
+    # Semilla de la simulación climática
+    semilla = int(st.sidebar.number_input("🎰 Semilla de la simulación", 0, 2**31 - 1, 42, step=1))
+
+    # Temporada completa: los 12 meses de una vez; el mes elegido arriba solo selecciona qué mes se muestra
+    modo_temporada = st.sidebar.checkbox("📅 Temporada completa (12 meses)", value=False)
+
+    # Modo ensemble: varios climas simulados por municipio
+    modo_ensemble = not modo_temporada and st.sidebar.checkbox("🎲 Modo ensemble (Monte Carlo)", value=False)
+    if modo_ensemble:
+        n_escenarios = st.sidebar.slider("Escenarios climáticos por municipio", 100, 1000, 100, step=100)
+        memoria_max_mb = st.sidebar.number_input("Memoria máxima por lote (MB)", 64, 4096, 256, step=64)
+        usar_procesos = st.sidebar.checkbox("Repartir lotes entre todos los núcleos", value=True)
 
     # Botón para ejecutar cálculos
     if "df_resultado" not in st.session_state:
         st.session_state.df_resultado = pd.DataFrame()
 
-
-    # Función para simular clima por zona y mes
-    def simular_clima_completo(row):
-        zona = row["zona"]
-        m = mes  # mes seleccionado por usuario
-
-        # Definir parámetros base por zona y mes
-        if zona == "norte":
-            clima = {
-                1:  {"temp": (6, 2),  "prcp": (3.0,), "wspd": (8, 2), "pres": (1015, 3), "hum": (85, 5)},
-                6:  {"temp": (18, 3), "prcp": (2.0,), "wspd": (10, 2), "pres": (1012, 3), "hum": (70, 10)},
-                7:  {"temp": (21, 3), "prcp": (1.5,), "wspd": (9, 2),  "pres": (1010, 3), "hum": (65, 10)},
-                12: {"temp": (7, 2),  "prcp": (3.5,), "wspd": (7, 2),  "pres": (1016, 3), "hum": (80, 5)},
-            }.get(m, {"temp": (15, 3), "prcp": (2.5,), "wspd": (8, 2), "pres": (1013, 3), "hum": (75, 10)})
-        else:  # sur
-            clima = {
-                1:  {"temp": (10, 3), "prcp": (2.0,), "wspd": (10, 2), "pres": (1014, 3), "hum": (75, 10)},
-                6:  {"temp": (24, 3), "prcp": (1.0,), "wspd": (12, 3), "pres": (1010, 3), "hum": (55, 10)},
-                7:  {"temp": (28, 3), "prcp": (0.8,), "wspd": (14, 3), "pres": (1008, 3), "hum": (45, 10)},
-                12: {"temp": (12, 3), "prcp": (2.5,), "wspd": (9, 2),  "pres": (1015, 3), "hum": (70, 10)},
-            }.get(m, {"temp": (20, 3), "prcp": (1.5,), "wspd": (11, 3), "pres": (1012, 3), "hum": (60, 10)})
-
-        temp = np.random.normal(*clima["temp"])
-        return pd.Series({
-            "temp": temp,
-            "tmin": temp - np.random.uniform(3, 6),
-            "tmax": temp + np.random.uniform(3, 6),
-            "prcp": np.random.exponential(*clima["prcp"]),
-            "wspd": np.random.normal(*clima["wspd"]),
-            "pres": np.random.normal(*clima["pres"]),
-            "hum": np.clip(np.random.normal(*clima["hum"]), 20, 100)  # limitar entre 20-100%
-        })
-
+    # La predicción de todos los municipios se lanza en segundo plano (ver Comun/trabajos.py). Los trabajos
+    # se identifican por mes, semilla y parámetros del ensemble, así que otra sesión con los mismos parámetros
+    # reutiliza el cálculo en marcha o su resultado; los filtros de la barra lateral se aplican después.
+    # El número de procesos no cambia el resultado, por eso no forma parte de la clave.
     if st.sidebar.button("🔍 Calcular predicciones"):
-        # Preparar datos
-        df_peninsula = df_peninsula.rename(columns={"LATITUD_ETRS89": "lat", "LONGITUD_ETRS89": "lng"})
-        df_peninsula["temp"] = 22
-        df_peninsula["tmin"] = 16
-        df_peninsula["tmax"] = 28
-        df_peninsula["prcp"] = 0.5
-        df_peninsula["wspd"] = 5
-        df_peninsula["pres"] = 1012
-        df_peninsula["hum"] = 35
-        df_peninsula["mes"] = mes
-        # Año actual (o fijo a 2025 si prefieres)
-        anio_actual = datetime.now().year if datetime.now().year >= 2025 else 2025
-
-        # Crear columna de fecha para el primer día del mes
-        df_peninsula["fecha_simulada"] = pd.to_datetime({
-            "year": anio_actual,
-            "month": df_peninsula["mes"],
-            "day": 1
-        })
-        np.random.seed(42)
-        n = len(df_peninsula)
-
-        # Clasificar por zona: norte (más frío) y sur (más cálido)
-        np.random.seed(42)
-        df_peninsula["zona"] = np.where(df_peninsula["lat"] >= 41.5, "norte", "sur")
-            
-        # Aplicar simulación
-        df_peninsula[["temp", "tmin", "tmax", "prcp", "wspd", "pres", "hum"]] = df_peninsula.apply(simular_clima_completo, axis=1)
-
-        # Predicción de ocurrencia
-        features_ocurrencia = ['lat', 'lng', 'temp', 'tmin', 'tmax', 'prcp', 'wspd', 'pres', 'hum', 'mes']
-        df_peninsula["probabilidad_incendio"] = modelo.predict_proba(df_peninsula[features_ocurrencia])[:, 1]
-        df_peninsula["probabilidad"] = np.clip(df_peninsula["probabilidad_incendio"] * 1.8, 0, 1)
-        df_peninsula["riesgo_alto"] = (df_peninsula["probabilidad"] > 0.5).astype(int)
-
-        # Filtrar por rango
-        df_filtrado = df_peninsula[
-            (df_peninsula["probabilidad"] >= min_prob) &
-            (df_peninsula["probabilidad"] <= max_prob)
-        ].copy()
-
-        # Clasificación catástrofe
-        if not df_filtrado.empty:
-            features_extension = ['temp', 'tmin', 'tmax', 'prcp', 'wspd', 'pres', 'hum']
-            df_filtrado["superficie_predicha"] = modelo_extension.predict(df_filtrado[features_extension])
-            df_filtrado["es_catastrofe"] = (df_filtrado["superficie_predicha"] >= 500).astype(int)
+        if modo_temporada:
+            clave, funcion, argumentos, opciones = ("temporada", semilla), predecir_temporada, (), {}
+        elif modo_ensemble:
+            clave = ("incendios", mes, semilla, n_escenarios, int(memoria_max_mb))
+            funcion, argumentos = predecir_incendios, (mes,)
+            opciones = {"n_escenarios": n_escenarios, "memoria_max_mb": int(memoria_max_mb),
+                        "n_procesos": None if usar_procesos else 1}
         else:
-            st.warning(f"No se encontraron incendios con probabilidad entre {min_prob:.2f} y {max_prob:.2f} en el mes de {mes_nombre}.")
-        
-        # Guardar resultado
-        st.session_state.df_resultado = df_filtrado
+            clave, funcion, argumentos, opciones = ("incendios", mes, semilla), predecir_incendios, (mes,), {}
+        st.session_state.trabajo_prediccion = gestor_global.renovar(
+            st.session_state.get("trabajo_prediccion"), clave, funcion, *argumentos, seed=semilla, **opciones)
+
+    # Mientras el trabajo no termina se muestra su progreso; mover los filtros solo vuelve a filtrar el resultado
+    trabajo = st.session_state.get("trabajo_prediccion")
+    if trabajo is not None:
+        if not esperar(st, trabajo):
+            del st.session_state.trabajo_prediccion
+            st.session_state.df_resultado = pd.DataFrame()
+            st.info("Predicción cancelada.")
+        else:
+            # Clima simulado, probabilidad, superficie y catástrofe de todos los municipios (ver Incendios/pipeline.py)
+            try:
+                with medir("incendios.prediccion"):
+                    resultado = trabajo.resultado()
+            except ErrorEsquema as e:
+                st.error(f"❌ {e} Vuelve a entrenar el modelo con `python -m Incendios.entrenar_extension`.")
+                st.stop()
+            except Exception as e:
+                # Se retira la suscripción al trabajo fallido: el error se muestra una vez y "Calcular" lo relanza
+                gestor_global.cancelar(trabajo)
+                del st.session_state.trabajo_prediccion
+                st.session_state.df_resultado = pd.DataFrame()
+                st.error(f"❌ La predicción ha fallado ({type(e).__name__}: {e}). Vuelve a pulsar «Calcular predicciones».")
+                st.stop()
+
+            # Con la temporada calculada, cambiar de mes solo toma otra fila del cubo
+            if isinstance(resultado, PrediccionTemporada):
+                mes_resultado = mes
+                with medir("incendios.temporada_mes"):
+                    df_mes = resultado.tabla_mes(mes)
+                mostrar_calendario(resultado)
+            else:
+                mes_resultado, df_mes = trabajo.clave[1], resultado
+
+            # Filtrar por rango
+            df_filtrado = filtrar_resultados(df_mes, min_prob, max_prob)
+            if df_filtrado.empty:
+                st.warning(f"No se encontraron incendios con probabilidad entre {min_prob:.2f} y {max_prob:.2f} "
+                           f"en el mes de {meses_nombre[mes_resultado - 1]}.")
+
+            # Guardar resultado
+            st.session_state.df_resultado = df_filtrado
+
+    with st.sidebar.expander("🧠 Modelos en memoria"):
+        st.dataframe(registro.estadisticas(), hide_index=True)
+
+    with st.sidebar.expander("⚙️ Trabajos en segundo plano"):
+        st.dataframe(gestor_global.estado(), hide_index=True)
 
     # --- Mostrar resultados si existen ---
     df_resultado = st.session_state.df_resultado
@@ -156,41 +161,23 @@ def main():
         # --- Mapa ---
         st.subheader("🗺️ Mapa filtrado por riesgo")
 
-        m = folium.Map(location=[40.0, -3.5], zoom_start=6, tiles='CartoDB positron')
-        cluster = MarkerCluster().add_to(m)
-
         if solo_catastrofes:
                 df_resultado = df_resultado[df_resultado["es_catastrofe"] == 1]
-        
-        for _, row in df_resultado.iterrows():
-            color = "red" if row.get("es_catastrofe", 0) else "green"
-            popup = f"""
-            <b>Municipio:</b> {row['NOMBRE_ACTUAL']}<br>
-            <b>Provincia:</b> {row['PROVINCIA']}<br>
-            <b>Fecha simulada:</b> {row['fecha_simulada'].strftime('%Y-%m-%d')}<br>
-            <b>Probabilidad:</b> {row['probabilidad']:.2f}%<br>
-            """
-            if "superficie_predicha" in row and pd.notna(row["superficie_predicha"]):
-                popup += f"<b>Superficie estimada:</b> {row['superficie_predicha']:.0f} ha<br>"
-            if "es_catastrofe" in row:
-                popup += f"<b>¿Catástrofe?</b> {'Sí' if row['es_catastrofe'] == 1 else 'No'}<br>"
-            if "magnitud_incendio" in row and pd.notna(row["magnitud_incendio"]):
-                popup += f"<b>Magnitud:</b> {row['magnitud_incendio']:.2f}"
-
-            folium.CircleMarker(
-                location=[row["lat"], row["lng"]],
-                radius=5,
-                color=color,
-                fill=True,
-                fill_opacity=0.7,
-                popup=popup
-            ).add_to(cluster)
-
-        st_folium(m, width=1000, height=600)
+
+        # Marcadores folium para pocos municipios; por encima del umbral, una única capa pydeck
+        with medir("incendios.mapa"):
+            mapa, metricas_mapa = construir_mapa(df_resultado, modo=MODOS_MAPA[modo_mapa])
+            if metricas_mapa["modo"] == "marcadores":
+                st_folium(mapa, width=1000, height=600)
+            else:
+                st.pydeck_chart(mapa)
+        tamano = "" if metricas_mapa["bytes"] is None else f"{metricas_mapa['bytes'] / 1024:,.0f} KB · "
+        st.caption(f"Mapa: {metricas_mapa['puntos']} municipios · modo {metricas_mapa['modo']} · "
+                   f"{tamano}generado en {metricas_mapa['segundos'] * 1000:,.0f} ms")
         st.markdown("<div style='margin-top:-40px;'></div>", unsafe_allow_html=True)
 
         # --- Tabla ---
-        with st.expander("📋 Ver tabla filtrada"):
+        with st.expander("📋 Ver tabla filtrada"), medir("incendios.tabla"):
             # Crear una copia para mostrar con nombres adecuados y valores redondeados/formateados
             tabla_mostrar = df_resultado.copy()
 
@@ -200,7 +187,10 @@ def main():
                 "NOMBRE_ACTUAL": "municipio",
                 "probabilidad": "probabilidad",
                 "es_catastrofe": "catástrofe",
-                "superficie_predicha": "superficie (ha)"
+                "superficie_predicha": "superficie (ha)",
+                "prob_p10": "P10",
+                "prob_p90": "P90",
+                "superficie_esperada": "superficie esperada (ha)"
             })
 
             # Formatear columnas
@@ -212,6 +202,10 @@ def main():
 
             # Selección y orden final de columnas a mostrar
             columnas = ["provincia", "municipio", "probabilidad"]
+            if "P10" in tabla_mostrar.columns:
+                tabla_mostrar[["P10", "P90"]] = tabla_mostrar[["P10", "P90"]].round(2)
+                tabla_mostrar["superficie esperada (ha)"] = tabla_mostrar["superficie esperada (ha)"].round(0).astype(int)
+                columnas += ["P10", "P90", "superficie esperada (ha)"]
             if "catástrofe" in tabla_mostrar.columns:
                 columnas.append("catástrofe")
             if "superficie (ha)" in tabla_mostrar.columns:
@@ -219,8 +213,16 @@ def main():
 
             st.dataframe(tabla_mostrar[columnas].sort_values(by="probabilidad", ascending=False).reset_index(drop=True))
 
+            # Tabla completa del filtro (la misma que `cli.py incendios`); se escribe al pulsar el botón
+            botones_tabla(st, df_resultado[columnas_exportacion(df_resultado)].sort_values("probabilidad", ascending=False),
+                          "incendios_filtrados", "📥 Descargar")
+
 
 
+        # --- Riesgo agregado por cuadrante sísmico (misma rejilla que la app de terremotos) ---
+        with st.expander("🌍 Riesgo por cuadrante sísmico"):
+            st.dataframe(riesgo_por_cuadrante(df_resultado, cargar_zonas()).round(2), hide_index=True)
+
         # --- Gráficos de resumen ---
         st.subheader("📊 Distribución de Riesgo de Incendio")
 
@@ -252,3 +254,6 @@ def main():
 
     else:
         st.info("Haz clic en el botón de la izquierda para calcular predicciones.")
+
+    # Tiempos por etapa (solo con ?debug=1 o DESASTRES_INSTRUMENTACION=1)
+    instrumentacion.mostrar_panel(st)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Columnas climáticas que genera el simulador (mismo orden que usan los modelos)
+COLUMNAS_CLIMA = ["temp", "tmin", "tmax", "prcp", "wspd", "pres", "hum"]
+
+# Zonas climáticas: norte (más frío) y sur (más cálido)
+ZONAS = ["norte", "sur"]
+LATITUD_NORTE = 41.5
+
+# Parámetros base por zona y mes: (media, desviación) salvo prcp, que es la escala de una exponencial
+_CLIMA_BASE = {
+    "norte": {
+        1:  {"temp": (6, 2),  "prcp": (3.0,), "wspd": (8, 2),  "pres": (1015, 3), "hum": (85, 5)},
+        6:  {"temp": (18, 3), "prcp": (2.0,), "wspd": (10, 2), "pres": (1012, 3), "hum": (70, 10)},
+        7:  {"temp": (21, 3), "prcp": (1.5,), "wspd": (9, 2),  "pres": (1010, 3), "hum": (65, 10)},
+        12: {"temp": (7, 2),  "prcp": (3.5,), "wspd": (7, 2),  "pres": (1016, 3), "hum": (80, 5)},
+        None: {"temp": (15, 3), "prcp": (2.5,), "wspd": (8, 2), "pres": (1013, 3), "hum": (75, 10)},
+    },
+    "sur": {
+        1:  {"temp": (10, 3), "prcp": (2.0,), "wspd": (10, 2), "pres": (1014, 3), "hum": (75, 10)},
+        6:  {"temp": (24, 3), "prcp": (1.0,), "wspd": (12, 3), "pres": (1010, 3), "hum": (55, 10)},
+        7:  {"temp": (28, 3), "prcp": (0.8,), "wspd": (14, 3), "pres": (1008, 3), "hum": (45, 10)},
+        12: {"temp": (12, 3), "prcp": (2.5,), "wspd": (9, 2),  "pres": (1015, 3), "hum": (70, 10)},
+        None: {"temp": (20, 3), "prcp": (1.5,), "wspd": (11, 3), "pres": (1012, 3), "hum": (60, 10)},
+    },
+}
+
+# Orden de las columnas de la tabla de parámetros
+PARAMETROS = ["temp_media", "temp_desv", "prcp_escala", "wspd_media", "wspd_desv",
+              "pres_media", "pres_desv", "hum_media", "hum_desv"]
+
+
+def _construir_tabla():
+    # Tabla zona x mes x parámetro; el índice 0 de mes no se usa para poder indexar con 1..12
+    tabla = np.zeros((len(ZONAS), 13, len(PARAMETROS)))
+    for z, zona in enumerate(ZONAS):
+        for m in range(1, 13):
+            clima = _CLIMA_BASE[zona].get(m, _CLIMA_BASE[zona][None])
+            tabla[z, m] = [*clima["temp"], *clima["prcp"], *clima["wspd"], *clima["pres"], *clima["hum"]]
+    return tabla
+
+
+TABLA_CLIMA = _construir_tabla()
+
+
+def asignar_zona(lat):
+    # Clasificar por zona: norte (más frío) y sur (más cálido)
+    return np.where(np.asarray(lat) >= LATITUD_NORTE, "norte", "sur")
+
+
+def codificar_zonas(zonas):
+    # Convierte nombres de zona en índices de la tabla (los enteros se dejan tal cual)
+    zonas = np.asarray(zonas)
+    if np.issubdtype(zonas.dtype, np.integer):
+        return zonas.astype(np.intp, copy=False)
+    codigos = np.full(zonas.shape, -1, dtype=np.intp)
+    for z, zona in enumerate(ZONAS):
+        codigos[zonas == zona] = z
+    if (codigos < 0).any():
+        desconocidas = sorted(set(zonas[codigos < 0].tolist()))
+        raise ValueError(f"Zonas climáticas desconocidas: {desconocidas}")
+    return codigos
+
+
+def simular_clima_array(codigos, mes, rng):
+    """Genera el clima de todas las filas de una vez y lo devuelve como matriz (n, 7).
+
+    `codigos` son índices de zona (ver `codificar_zonas`) y `mes` puede ser un
+    entero o un array con un mes por fila.
+    """
+    codigos = np.asarray(codigos, dtype=np.intp)
+    meses = np.broadcast_to(np.asarray(mes, dtype=np.intp), codigos.shape)
+    if ((meses < 1) | (meses > 12)).any():
+        raise ValueError("El mes debe estar entre 1 y 12")
+
+    p = TABLA_CLIMA[codigos, meses]
+    n = len(codigos)
+    clima = np.empty((n, len(COLUMNAS_CLIMA)))
+
+    temp = rng.normal(p[:, 0], p[:, 1])
+    clima[:, 0] = temp
+    clima[:, 1] = temp - rng.uniform(3, 6, n)
+    clima[:, 2] = temp + rng.uniform(3, 6, n)
+    clima[:, 3] = rng.exponential(p[:, 2])
+    clima[:, 4] = rng.normal(p[:, 3], p[:, 4])
+    clima[:, 5] = rng.normal(p[:, 5], p[:, 6])
+    clima[:, 6] = np.clip(rng.normal(p[:, 7], p[:, 8]), 20, 100)  # limitar entre 20-100%
+    return clima
+
+
+def simular_clima(zonas, mes, seed=None, index=None):
+    """Simula el clima por zona y mes para un conjunto de municipios.
+
+    Devuelve un DataFrame con las columnas de `COLUMNAS_CLIMA`. `seed` puede ser
+    un entero (resultados reproducibles), un `np.random.Generator` o None.
+    """
+    rng = np.random.default_rng(seed)
+    if index is None and isinstance(zonas, pd.Series):
+        index = zonas.index
+    clima = simular_clima_array(codificar_zonas(zonas), mes, rng)
+    return pd.DataFrame(clima, columns=COLUMNAS_CLIMA, index=index)
@@ -0,0 +1,38 @@
+import os
+
+import pandas as pd
+
+from Comun.datos import cargar_instantanea, hash_fichero
+from Comun.espacial import IndiceEspacial
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+RUTA_MUNICIPIOS = os.path.join(CARPETA, "MUNICIPIOS.csv")
+
+PROVINCIAS_EXCLUIR = ['Santa Cruz de Tenerife', 'Las Palmas', 'Illes Balears', 'Ceuta', 'Melilla']
+
+
+def preparar_municipios(ruta=RUTA_MUNICIPIOS):
+    # Lectura del CSV original, solo península y con las coordenadas renombradas
+    df_mun = pd.read_csv(ruta, encoding='ISO-8859-1', sep=';', on_bad_lines='warn', decimal=',')
+    df_peninsula = df_mun[~df_mun['PROVINCIA'].isin(PROVINCIAS_EXCLUIR)]
+    df_peninsula = df_peninsula.rename(columns={"LATITUD_ETRS89": "lat", "LONGITUD_ETRS89": "lng"})
+    df_peninsula = df_peninsula.astype({"lat": "float64", "lng": "float64"})
+    return df_peninsula.reset_index(drop=True)
+
+
+def cargar_municipios(ruta=RUTA_MUNICIPIOS):
+    return cargar_instantanea("municipios", ruta, preparar_municipios)
+
+
+# Índice espacial de los municipios por versión del CSV (ruta, hash)
+_indices = {}
+
+
+def indice_municipios(ruta=RUTA_MUNICIPIOS):
+    """`(municipios, indice)`: la tabla de `cargar_municipios` y su `IndiceEspacial`."""
+    clave = (ruta, hash_fichero(ruta))
+    if clave not in _indices:
+        municipios = cargar_municipios(ruta)
+        _indices.clear()
+        _indices[clave] = (municipios, IndiceEspacial.desde_tabla(municipios))
+    return _indices[clave]
@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Incendios.clima import codificar_zonas, simular_clima_array
+from Incendios.features import (FEATURES_EXTENSION, FEATURES_OCURRENCIA, construir_matriz, entrada_extension,
+                                entrada_ocurrencia)
+
+# Ajuste aplicado a la probabilidad del clasificador y umbral de catástrofe (ha)
+FACTOR_PROBABILIDAD = 1.8
+UMBRAL_CATASTROFE = 500
+
+# Estimación de memoria por fila de escenario (clima simulado, matriz de entrada común y
+# salidas intermedias de los modelos). Es un límite holgado; no se ajusta porque cambiarlo
+# cambia el reparto de municipios en lotes y, con él, las semillas de cada lote.
+BYTES_POR_FILA = (len(FEATURES_OCURRENCIA) + len(FEATURES_EXTENSION) + 4) * 8
+
+COLUMNAS_ENSEMBLE = ["prob_media", "prob_p10", "prob_p90", "superficie_media",
+                     "superficie_esperada", "prob_catastrofe"]
+
+# Modelos de cada proceso del pool (se cargan una sola vez en el inicializador)
+_modelos_proceso = {}
+
+
+def calibrar_probabilidad(proba):
+    return np.clip(proba * FACTOR_PROBABILIDAD, 0, 1)
+
+
+def filas_por_lote(memoria_max_mb):
+    # Número máximo de filas de escenario que caben en el límite de memoria indicado
+    return max(1, int(memoria_max_mb * 2**20) // BYTES_POR_FILA)
+
+
+def _inicializar_proceso(modelo, modelo_extension):
+    _modelos_proceso["ocurrencia"] = modelo
+    _modelos_proceso["extension"] = modelo_extension
+
+
+def _procesar_bloque(lat, lng, codigos, mes, n_escenarios, semilla, filas_max=None, modelo=None,
+                     modelo_extension=None):
+    # Genera n_escenarios climas por municipio del bloque y evalúa ambos modelos sobre la matriz apilada,
+    # en tramos de como mucho `filas_max` filas (un municipio con más escenarios se parte en varios tramos)
+    modelo = modelo if modelo is not None else _modelos_proceso["ocurrencia"]
+    modelo_extension = modelo_extension if modelo_extension is not None else _modelos_proceso["extension"]
+    rng = np.random.default_rng(semilla)
+
+    n_mun = len(lat)
+    total = n_mun * n_escenarios
+    paso = total if filas_max is None else max(1, filas_max)
+    prob = np.empty(total)
+    superficie = np.empty(total)
+    for inicio in range(0, total, paso):
+        fin = min(inicio + paso, total)
+        municipio = np.arange(inicio, fin) // n_escenarios
+        X = construir_matriz(lat[municipio], lng[municipio], simular_clima_array(codigos[municipio], mes, rng), mes)
+
+        # Ambos modelos leen el mismo bloque (el de extensión, una vista de sus columnas de clima)
+        prob[inicio:fin] = calibrar_probabilidad(modelo.predict_proba(entrada_ocurrencia(X))[:, 1])
+        superficie[inicio:fin] = modelo_extension.predict(entrada_extension(X))
+        del X
+    prob = prob.reshape(n_mun, n_escenarios)
+    superficie = superficie.reshape(n_mun, n_escenarios)
+
+    p10, p90 = np.percentile(prob, [10, 90], axis=1)
+    return np.column_stack([
+        prob.mean(axis=1),
+        p10,
+        p90,
+        superficie.mean(axis=1),
+        (prob * superficie).mean(axis=1),
+        (superficie >= UMBRAL_CATASTROFE).mean(axis=1),
+    ])
+
+
+def predecir_ensemble(df, mes, modelo, modelo_extension, n_escenarios=100, seed=42,
+                      memoria_max_mb=256, n_procesos=1, progreso=None):
+    """Predicción Monte Carlo: `n_escenarios` climas simulados por municipio.
+
+    `df` debe tener las columnas `lat`, `lng` y `zona`. Los escenarios se apilan
+    en una matriz y se evalúan por lotes de como mucho `memoria_max_mb` MB; si
+    los escenarios de un solo municipio no caben, se evalúan en varios tramos
+    (de cada escenario solo se guardan la probabilidad y la superficie). Con
+    `n_procesos` > 1 (o None para usar todos los núcleos) los lotes se reparten
+    en un pool de procesos. Los resultados solo dependen de `seed`, no del
+    número de procesos. `progreso(fraccion, mensaje)`, si se indica, se llama
+    al terminar cada lote (ver `Comun.trabajos`).
+
+    Devuelve un DataFrame con el mismo índice que `df` y las columnas de
+    `COLUMNAS_ENSEMBLE`: probabilidad media, P10 y P90, superficie media si hay
+    incendio, superficie esperada (probabilidad x superficie) y proporción de
+    escenarios catastróficos.
+    """
+    if n_escenarios < 1:
+        raise ValueError("n_escenarios debe ser al menos 1")
+
+    lat = df["lat"].to_numpy(dtype=float)
+    lng = df["lng"].to_numpy(dtype=float)
+    codigos = codificar_zonas(df["zona"])
+
+    filas_max = filas_por_lote(memoria_max_mb)
+    mun_por_lote = max(1, filas_max // n_escenarios)
+    limites = list(range(0, len(df), mun_por_lote))
+    semillas = np.random.SeedSequence(seed).spawn(len(limites))
+    lotes = [
+        (lat[i:i + mun_por_lote], lng[i:i + mun_por_lote], codigos[i:i + mun_por_lote], mes, n_escenarios, s,
+         filas_max)
+        for i, s in zip(limites, semillas)
+    ]
+
+    if n_procesos is None:
+        n_procesos = os.cpu_count() or 1
+    n_procesos = min(n_procesos, len(lotes))
+
+    def avanzar(hechos):
+        if progreso is not None:
+            progreso(hechos / len(lotes), f"Lote {hechos} de {len(lotes)}")
+
+    resultados = []
+    if n_procesos > 1:
+        # "spawn": la predicción puede lanzarse desde un hilo de Streamlit y hacer fork de un proceso con
+        # varios hilos no es seguro en Linux
+        with ProcessPoolExecutor(max_workers=n_procesos, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_inicializar_proceso, initargs=(modelo, modelo_extension)) as pool:
+            futuros = [pool.submit(_procesar_bloque, *lote) for lote in lotes]
+            try:
+                for futuro in futuros:
+                    resultados.append(futuro.result())
+                    avanzar(len(resultados))
+            except BaseException:
+                # Cancelación o error: no se esperan los lotes pendientes
+                for futuro in futuros:
+                    futuro.cancel()
+                raise
+    else:
+        for lote in lotes:
+            resultados.append(_procesar_bloque(*lote, modelo=modelo, modelo_extension=modelo_extension))
+            avanzar(len(resultados))
+
+    estadisticas = np.vstack(resultados) if resultados else np.empty((0, len(COLUMNAS_ENSEMBLE)))
+    return pd.DataFrame(estadisticas, columns=COLUMNAS_ENSEMBLE, index=df.index)
@@ -0,0 +1,187 @@
+"""Entrenamiento del modelo de extensión de incendios (sustituye al notebook).
+
+Lee `incendios_completado.csv` por bloques, entrena un RandomForestRegressor
+con todos los núcleos y guarda una versión con sus metadatos en
+`Incendios/modelos_extension/`. Después la publica con el nombre que carga la
+aplicación (`modelo_prediccion_extension_incendio.pkl`).
+
+Uso (desde la raíz del proyecto):
+    python -m Incendios.entrenar_extension [--fraccion 0.1] [--features app|notebook] [--sin-publicar]
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from Comun.datos import hash_fichero
+from Comun.modelos import MODELOS, RAIZ
+from Incendios.features import FEATURES_EXTENSION, comprobar_esquema
+
+RUTA_DATOS = os.path.join(RAIZ, "Incendios", "incendios_completado.csv")
+CARPETA_VERSIONES = os.path.join(RAIZ, "Incendios", "modelos_extension")
+RUTA_PUBLICADA = os.path.join(RAIZ, MODELOS["extension"])
+
+OBJETIVO = "superficie"
+
+# "app": las variables que la aplicación simula y pasa al modelo.
+# "notebook": las del notebook original, que incluyen datos de la extinción
+# (tiempos, personal, medios) que la aplicación no conoce antes del incendio.
+CONJUNTOS_FEATURES = {
+    "app": FEATURES_EXTENSION,
+    "notebook": ['temp', 'tmin', 'tmax', 'prcp', 'wspd', 'pres', 'hum',
+                 'time_ctrl', 'time_ext', 'personal', 'medios', 'mes'],
+}
+
+FILAS_POR_BLOQUE = 200_000
+
+
+def leer_datos(ruta=RUTA_DATOS, features=FEATURES_EXTENSION, fraccion=None, seed=42,
+               filas_por_bloque=FILAS_POR_BLOQUE):
+    """Lee y limpia el CSV por bloques; devuelve `(X, y)` en float32.
+
+    Solo se leen las columnas necesarias. Se descartan las filas con valores
+    vacíos o no numéricos, y con `fraccion` se conserva al azar (de forma
+    reproducible con `seed`) esa parte de las filas de cada bloque.
+    """
+    columnas = [c for c in features if c != "mes"] + [OBJETIVO]
+    if "mes" in features:
+        columnas.append("fecha")
+    rng = np.random.default_rng(seed)
+
+    bloques = []
+    for bloque in pd.read_csv(ruta, usecols=columnas, chunksize=filas_por_bloque, low_memory=False):
+        if "mes" in features:
+            bloque["mes"] = pd.to_datetime(bloque["fecha"], errors="coerce").dt.month
+        datos = bloque[features + [OBJETIVO]].apply(pd.to_numeric, errors="coerce").dropna()
+        if fraccion is not None and fraccion < 1:
+            datos = datos[rng.random(len(datos)) < fraccion]
+        bloques.append(datos.astype(np.float32))
+
+    df = pd.concat(bloques, ignore_index=True) if bloques else pd.DataFrame(columns=features + [OBJETIVO])
+    return df[features], df[OBJETIVO]
+
+
+def entrenar(X, y, n_estimadores=100, n_jobs=-1, seed=42, test_size=0.2):
+    """Entrena el RandomForestRegressor (mismos parámetros que el notebook) y lo evalúa.
+
+    Devuelve `(modelo, metricas)` con el R² y el error absoluto medio sobre la
+    parte de test.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=seed)
+    modelo = RandomForestRegressor(n_estimators=n_estimadores, random_state=seed, n_jobs=n_jobs)
+    modelo.fit(X_train, y_train)
+    y_pred = modelo.predict(X_test)
+    # La aplicación decide cómo paralelizar la predicción (ver Incendios/ensemble.py)
+    modelo.set_params(n_jobs=None)
+    metricas = {
+        "r2": float(r2_score(y_test, y_pred)),
+        "mae": float(mean_absolute_error(y_test, y_pred)),
+        "filas_entrenamiento": len(X_train),
+        "filas_test": len(X_test),
+    }
+    return modelo, metricas
+
+
+def guardar_version(modelo, metadatos, carpeta=CARPETA_VERSIONES):
+    """Guarda el modelo y su `.json` de metadatos con un nombre por fecha y hash de los datos."""
+    os.makedirs(carpeta, exist_ok=True)
+    version = f"{datetime.now():%Y%m%d-%H%M%S}-{metadatos['hash_datos'][:8]}"
+    ruta = os.path.join(carpeta, f"modelo_extension_{version}.pkl")
+    temporal = ruta + ".tmp"
+    joblib.dump(modelo, temporal)
+    os.replace(temporal, ruta)
+
+    metadatos = dict(metadatos, version=version, tamano_bytes=os.path.getsize(ruta))
+    with open(ruta[:-len(".pkl")] + ".json", "w", encoding="utf-8") as f:
+        json.dump(metadatos, f, ensure_ascii=False, indent=2)
+    return ruta, metadatos
+
+
+def publicar(ruta_version, destino=RUTA_PUBLICADA):
+    # Copia atómica: la aplicación nunca ve un fichero a medio escribir (y lo recarga por mtime)
+    temporal = destino + ".tmp"
+    shutil.copyfile(ruta_version, temporal)
+    os.replace(temporal, destino)
+    return destino
+
+
+def ejecutar(ruta_datos=RUTA_DATOS, features="app", fraccion=None, n_estimadores=100, n_jobs=-1,
+             seed=42, carpeta=CARPETA_VERSIONES, publicar_modelo=True):
+    """Lectura, entrenamiento y guardado completos. Devuelve `(ruta_version, metadatos)`."""
+    import sklearn
+
+    lista_features = CONJUNTOS_FEATURES[features]
+    inicio = time.perf_counter()
+    X, y = leer_datos(ruta_datos, lista_features, fraccion=fraccion, seed=seed)
+    t_lectura = time.perf_counter() - inicio
+    if len(X) == 0:
+        raise ValueError(f"No hay filas válidas en {ruta_datos}")
+
+    inicio = time.perf_counter()
+    modelo, metricas = entrenar(X, y, n_estimadores=n_estimadores, n_jobs=n_jobs, seed=seed)
+    t_entrenamiento = time.perf_counter() - inicio
+
+    metadatos = {
+        "features": list(lista_features),
+        "conjunto_features": features,
+        "objetivo": OBJETIVO,
+        "datos": os.path.relpath(ruta_datos, RAIZ),
+        "hash_datos": hash_fichero(ruta_datos),
+        "filas": len(X),
+        "fraccion": fraccion,
+        "semilla": seed,
+        "n_estimadores": n_estimadores,
+        "n_jobs": n_jobs,
+        "tiempo_lectura_s": round(t_lectura, 3),
+        "tiempo_entrenamiento_s": round(t_entrenamiento, 3),
+        "metricas": metricas,
+        "sklearn": sklearn.__version__,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+    }
+    ruta, metadatos = guardar_version(modelo, metadatos, carpeta)
+    if publicar_modelo:
+        comprobar_esquema(modelo, FEATURES_EXTENSION, "extension")
+        metadatos["publicado_en"] = os.path.relpath(publicar(ruta), RAIZ)
+    return ruta, metadatos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--datos", default=RUTA_DATOS)
+    parser.add_argument("--features", choices=list(CONJUNTOS_FEATURES), default="app")
+    parser.add_argument("--fraccion", type=float, default=None,
+                        help="entrenar solo con esta fracción de las filas (iteraciones rápidas)")
+    parser.add_argument("--estimadores", type=int, default=100)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--carpeta", default=CARPETA_VERSIONES)
+    parser.add_argument("--sin-publicar", action="store_true",
+                        help=f"no sustituir {MODELOS['extension']}")
+    args = parser.parse_args(argv)
+
+    publicar_modelo = not args.sin_publicar
+    if publicar_modelo and args.features != "app":
+        print("⚠️ La aplicación solo usa las variables del conjunto 'app'; el modelo no se publica.")
+        publicar_modelo = False
+
+    ruta, metadatos = ejecutar(args.datos, args.features, args.fraccion, args.estimadores, args.n_jobs,
+                               args.semilla, args.carpeta, publicar_modelo)
+    print(f"✅ Modelo {metadatos['version']} ({metadatos['filas']} filas, "
+          f"{metadatos['tiempo_entrenamiento_s']:.1f} s, {metadatos['tamano_bytes'] / 2**20:.1f} MB) -> {ruta}")
+    print(f"   R² {metadatos['metricas']['r2']:.3f}  |  MAE {metadatos['metricas']['mae']:.1f} ha")
+    if "publicado_en" in metadatos:
+        print(f"   Publicado en {metadatos['publicado_en']}")
+
+
+if __name__ == "__main__":
+    main()
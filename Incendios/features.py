@@ -0,0 +1,86 @@
+"""Esquema de variables de los modelos de incendios y matriz de entrada común.
+
+Las variables del modelo de extensión (el clima) son un tramo contiguo de las
+del modelo de ocurrencia, así que ambos modelos leen el mismo bloque de NumPy:
+el de ocurrencia entero y el de extensión a través de una vista de columnas,
+sin copias. El bloque es float32, el tipo al que sklearn convierte la entrada
+de los árboles, así que tampoco hay conversión al predecir.
+"""
+import numpy as np
+import pandas as pd
+
+from Incendios.clima import COLUMNAS_CLIMA
+
+# Variables que espera cada modelo (en este orden)
+FEATURES_OCURRENCIA = ['lat', 'lng', 'temp', 'tmin', 'tmax', 'prcp', 'wspd', 'pres', 'hum', 'mes']
+FEATURES_EXTENSION = COLUMNAS_CLIMA
+
+ESQUEMAS = {
+    "ocurrencia": FEATURES_OCURRENCIA,
+    "extension": FEATURES_EXTENSION,
+}
+
+# Posición de las variables de extensión dentro de la matriz de ocurrencia
+_INICIO_EXTENSION = FEATURES_OCURRENCIA.index(FEATURES_EXTENSION[0])
+COLUMNAS_EXTENSION = slice(_INICIO_EXTENSION, _INICIO_EXTENSION + len(FEATURES_EXTENSION))
+assert FEATURES_OCURRENCIA[COLUMNAS_EXTENSION] == FEATURES_EXTENSION
+
+TIPO_MATRIZ = np.float32
+
+
+class ErrorEsquema(ValueError):
+    """Las variables que espera un modelo no son las que le pasa la aplicación."""
+
+
+def comprobar_esquema(modelo, features, nombre="modelo"):
+    """Comprueba que `modelo` se entrenó con `features` (mismos nombres y orden).
+
+    Usa `feature_names_in_` si el modelo lo tiene y, si no, el número de
+    variables. Devuelve el propio modelo.
+    """
+    nombres = getattr(modelo, "feature_names_in_", None)
+    if nombres is not None:
+        if list(nombres) != list(features):
+            sobran = [f for f in nombres if f not in features]
+            faltan = [f for f in features if f not in nombres]
+            if sobran:
+                detalle = f" (el modelo usa además {sobran}, que la aplicación no conoce)"
+            elif faltan:
+                detalle = f" (faltan en el modelo {faltan})"
+            else:
+                detalle = " (mismas variables en distinto orden)"
+            raise ErrorEsquema(f"El modelo de {nombre} espera {list(nombres)} y la aplicación le pasa "
+                               f"{list(features)}{detalle}.")
+    elif getattr(modelo, "n_features_in_", len(features)) != len(features):
+        raise ErrorEsquema(f"El modelo de {nombre} espera {modelo.n_features_in_} variables "
+                           f"y la aplicación le pasa {len(features)}: {list(features)}.")
+    return modelo
+
+
+def cargar_modelos(modelos):
+    # Modelos de ocurrencia y extensión del registro, con su esquema comprobado
+    return tuple(comprobar_esquema(modelos.modelo(nombre), ESQUEMAS[nombre], nombre)
+                 for nombre in ("ocurrencia", "extension"))
+
+
+def construir_matriz(lat, lng, clima, mes):
+    """Bloque contiguo (n, 10) con las columnas de `FEATURES_OCURRENCIA`.
+
+    `lat` y `lng` de longitud n, `clima` de forma (n, 7) con `COLUMNAS_CLIMA`
+    y `mes` escalar o de longitud n.
+    """
+    X = np.empty((len(lat), len(FEATURES_OCURRENCIA)), dtype=TIPO_MATRIZ)
+    X[:, FEATURES_OCURRENCIA.index("lat")] = lat
+    X[:, FEATURES_OCURRENCIA.index("lng")] = lng
+    X[:, COLUMNAS_EXTENSION] = clima
+    X[:, FEATURES_OCURRENCIA.index("mes")] = mes
+    return X
+
+
+def entrada_ocurrencia(X):
+    return pd.DataFrame(X, columns=FEATURES_OCURRENCIA, copy=False)
+
+
+def entrada_extension(X):
+    # Vista de las columnas de clima: no copia los datos
+    return pd.DataFrame(X[:, COLUMNAS_EXTENSION], columns=FEATURES_EXTENSION, copy=False)
@@ -0,0 +1,165 @@
+"""Inferencia rápida para los Random Forest de incendios.
+
+Los árboles del modelo de sklearn se aplanan en un array contiguo de NumPy y
+se recorren con un núcleo compilado con numba que reparte las filas entre
+hilos. El resultado es idéntico bit a bit al de `predict_proba` / `predict` de
+sklearn: se usan los mismos umbrales, la entrada se convierte a float32 igual
+que en sklearn y los árboles se suman en el mismo orden.
+
+El backend se elige con la variable de entorno `INCENDIOS_BACKEND_INFERENCIA`
+("sklearn" por defecto, o "rapido") o con el parámetro `backend` de
+`Incendios.pipeline.predecir_incendios`. numba es opcional: sin él, el backend
+"rapido" avisa y usa el modelo de sklearn.
+"""
+import os
+import warnings
+import weakref
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # numba es opcional
+    numba = None
+
+BACKENDS = ["sklearn", "rapido"]
+BACKEND_POR_DEFECTO = os.environ.get("INCENDIOS_BACKEND_INFERENCIA", "sklearn")
+
+# Bosques ya aplanados, por modelo (se liberan junto con el modelo)
+_compilados = weakref.WeakKeyDictionary()
+
+# Filas que recorre cada hilo árbol por árbol: el bloque de X y los nodos del árbol caben en caché
+FILAS_POR_BLOQUE = 4096
+
+# Un nodo por registro (24 bytes): umbral, hijos y variable se leen de la misma línea de caché
+TIPO_NODO = np.dtype([("umbral", np.float64), ("izquierda", np.int32), ("derecha", np.int32),
+                      ("feature", np.int32), ("relleno", np.int32)])
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _recorrer_bosque(X, raices, nodos, valores, salida):
+        # Las hojas apuntan a sí mismas; cada fila suma los árboles en orden, como sklearn
+        n_filas = X.shape[0]
+        n_arboles = raices.shape[0]
+        n_valores = valores.shape[1]
+        n_bloques = (n_filas + FILAS_POR_BLOQUE - 1) // FILAS_POR_BLOQUE
+        for b in numba.prange(n_bloques):
+            inicio = b * FILAS_POR_BLOQUE
+            fin = min(inicio + FILAS_POR_BLOQUE, n_filas)
+            for t in range(n_arboles):
+                raiz = raices[t]
+                for i in range(inicio, fin):
+                    nodo = raiz
+                    while True:
+                        registro = nodos[nodo]
+                        if registro.izquierda == nodo:
+                            break
+                        if X[i, registro.feature] <= registro.umbral:
+                            nodo = registro.izquierda
+                        else:
+                            nodo = registro.derecha
+                    for c in range(n_valores):
+                        salida[i, c] += valores[nodo, c]
+            for i in range(inicio, fin):
+                for c in range(n_valores):
+                    salida[i, c] /= n_arboles
+
+
+class BosqueCompilado:
+    """Random Forest de sklearn aplanado en arrays contiguos.
+
+    Tiene la misma interfaz de predicción que el modelo original
+    (`predict_proba` para clasificadores y `predict` para regresores).
+    """
+
+    def __init__(self, modelo, n_hilos=None):
+        arboles = [e.tree_ for e in modelo.estimators_]
+        self.es_clasificador = hasattr(modelo, "classes_")
+        self.n_features_in_ = modelo.n_features_in_
+        if hasattr(modelo, "feature_names_in_"):
+            self.feature_names_in_ = modelo.feature_names_in_
+        if self.es_clasificador:
+            self.classes_ = modelo.classes_
+        self.n_arboles = len(arboles)
+        self.n_hilos = n_hilos or os.cpu_count() or 1
+
+        tamanos = np.array([a.node_count for a in arboles])
+        self.raices = np.concatenate([[0], np.cumsum(tamanos)[:-1]]).astype(np.int32)
+        izquierda, derecha, feature, umbral, valores = [], [], [], [], []
+        for desplazamiento, arbol in zip(self.raices, arboles):
+            hoja = arbol.children_left == -1
+            nodos = np.arange(arbol.node_count) + desplazamiento
+            # Las hojas apuntan a sí mismas: el recorrido puede seguir sin moverse de ellas
+            izquierda.append(np.where(hoja, nodos, arbol.children_left + desplazamiento))
+            derecha.append(np.where(hoja, nodos, arbol.children_right + desplazamiento))
+            feature.append(np.where(hoja, 0, arbol.feature))
+            umbral.append(np.where(hoja, np.inf, arbol.threshold))
+            valor = arbol.value[:, 0, :]
+            if self.es_clasificador:
+                # Misma normalización que DecisionTreeClassifier.predict_proba
+                valor = valor[:, :len(self.classes_)]
+                normalizador = valor.sum(axis=1, keepdims=True)
+                normalizador[normalizador == 0.0] = 1.0
+                valor = valor / normalizador
+            valores.append(valor)
+
+        self.nodos = np.zeros(int(tamanos.sum()), dtype=TIPO_NODO)
+        self.nodos["izquierda"] = np.concatenate(izquierda)
+        self.nodos["derecha"] = np.concatenate(derecha)
+        self.nodos["feature"] = np.concatenate(feature)
+        self.nodos["umbral"] = np.concatenate(umbral)
+        self.valores = np.ascontiguousarray(np.concatenate(valores), dtype=np.float64)
+
+    def _entrada(self, X):
+        # sklearn valida y convierte la entrada a float32 antes de recorrer los árboles
+        if hasattr(X, "columns") and hasattr(self, "feature_names_in_"):
+            columnas = list(X.columns)
+            if columnas != list(self.feature_names_in_):
+                raise ValueError(f"Las columnas {columnas} no coinciden con las del modelo "
+                                 f"{list(self.feature_names_in_)}")
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Se esperaban {self.n_features_in_} columnas y se recibieron {X.shape}")
+        return X
+
+    def _predecir(self, X):
+        X = self._entrada(X)
+        salida = np.zeros((len(X), self.valores.shape[1]))
+        hilos = numba.get_num_threads()
+        numba.set_num_threads(min(self.n_hilos, numba.config.NUMBA_NUM_THREADS))
+        try:
+            _recorrer_bosque(X, self.raices, self.nodos, self.valores, salida)
+        finally:
+            numba.set_num_threads(hilos)
+        return salida
+
+    def predict_proba(self, X):
+        if not self.es_clasificador:
+            raise AttributeError("predict_proba solo está disponible para clasificadores")
+        return self._predecir(X)
+
+    def predict(self, X):
+        resultado = self._predecir(X)
+        if self.es_clasificador:
+            return self.classes_.take(np.argmax(resultado, axis=1))
+        return resultado[:, 0]
+
+
+def compilar(modelo):
+    # Bosque aplanado del modelo, reutilizado mientras el modelo siga en memoria
+    compilado = _compilados.get(modelo)
+    if compilado is None:
+        compilado = _compilados[modelo] = BosqueCompilado(modelo)
+    return compilado
+
+
+def preparar_modelo(modelo, backend=None):
+    backend = backend or BACKEND_POR_DEFECTO
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de inferencia desconocido: {backend}. Opciones: {BACKENDS}")
+    if backend == "rapido":
+        if numba is None:
+            warnings.warn("El backend de inferencia 'rapido' necesita numba; se usa sklearn.")
+            return modelo
+        return compilar(modelo)
+    return modelo
@@ -0,0 +1,131 @@
+import json
+import time
+
+import folium
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+from folium.plugins import MarkerCluster
+
+from Comun import instrumentacion
+
+# Por encima de este número de municipios el modo automático usa una única capa pydeck
+UMBRAL_MARCADORES = 1000
+
+MODOS = ["auto", "marcadores", "capa"]
+
+CENTRO = (40.0, -3.5)
+
+
+def _formatear(df):
+    # Textos del popup calculados por columnas, sin recorrer las filas (probabilidades en %, igual en los dos modos)
+    catastrofe = df["es_catastrofe"] == 1 if "es_catastrofe" in df.columns else pd.Series(False, index=df.index)
+    textos = pd.DataFrame({
+        "municipio": df["NOMBRE_ACTUAL"].astype(str),
+        "provincia": df["PROVINCIA"].astype(str),
+        "fecha": pd.to_datetime(df["fecha_simulada"]).dt.strftime('%Y-%m-%d'),
+        "probabilidad": df["probabilidad"].map("{:.2%}".format),
+        "catastrofe": np.where(catastrofe, "Sí", "No"),
+    }, index=df.index)
+    if "superficie_predicha" in df.columns:
+        textos["superficie"] = df["superficie_predicha"].round(0).astype("Int64").astype(str).replace("<NA>", "-")
+    else:
+        textos["superficie"] = "-"
+    if "prob_p10" in df.columns:
+        textos["intervalo"] = df["prob_p10"].map("{:.2%}".format) + " - " + df["prob_p90"].map("{:.2%}".format)
+    return textos, catastrofe.to_numpy()
+
+
+def popups_html(df):
+    textos, _ = _formatear(df)
+    html = ("<b>Municipio:</b> " + textos["municipio"] + "<br>"
+            + "<b>Provincia:</b> " + textos["provincia"] + "<br>"
+            + "<b>Fecha simulada:</b> " + textos["fecha"] + "<br>"
+            + "<b>Probabilidad:</b> " + textos["probabilidad"] + "<br>")
+    if "intervalo" in textos.columns:
+        html += "<b>Intervalo P10-P90:</b> " + textos["intervalo"] + "<br>"
+    html += "<b>Superficie estimada:</b> " + textos["superficie"] + " ha<br>"
+    html += "<b>¿Catástrofe?</b> " + textos["catastrofe"] + "<br>"
+    return html
+
+
+def mapa_marcadores(df):
+    # Un CircleMarker por municipio dentro de un MarkerCluster (vista original)
+    m = folium.Map(location=list(CENTRO), zoom_start=6, tiles='CartoDB positron')
+    cluster = MarkerCluster().add_to(m)
+    _, catastrofe = _formatear(df)
+    for lat, lng, popup, es_cat in zip(df["lat"], df["lng"], popups_html(df), catastrofe):
+        folium.CircleMarker(
+            location=[lat, lng],
+            radius=5,
+            color="red" if es_cat else "green",
+            fill=True,
+            fill_opacity=0.7,
+            popup=popup
+        ).add_to(cluster)
+    return m
+
+
+def mapa_capa(df):
+    # Una sola ScatterplotLayer con todos los municipios (igual que el mapa de Seismos)
+    textos, catastrofe = _formatear(df)
+    datos = textos.assign(
+        lat=df["lat"].round(5).to_numpy(),
+        lng=df["lng"].round(5).to_numpy(),
+        color=np.where(catastrofe[:, None], [[255, 0, 0, 180]], [[0, 128, 0, 180]]).tolist(),
+    )
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=datos,
+        get_position='[lng, lat]',
+        get_fill_color="color",
+        get_radius=5,
+        radius_units="pixels",
+        pickable=True
+    )
+    html = ("<b>Municipio:</b> {municipio}<br/>"
+            "<b>Provincia:</b> {provincia}<br/>"
+            "<b>Fecha simulada:</b> {fecha}<br/>"
+            "<b>Probabilidad:</b> {probabilidad}<br/>")
+    if "intervalo" in datos.columns:
+        html += "<b>Intervalo P10-P90:</b> {intervalo}<br/>"
+    html += "<b>Superficie estimada:</b> {superficie} ha<br/><b>¿Catástrofe?</b> {catastrofe}"
+    return pdk.Deck(
+        map_style="mapbox://styles/mapbox/light-v9",
+        initial_view_state=pdk.ViewState(latitude=CENTRO[0], longitude=CENTRO[1], zoom=5, pitch=0),
+        layers=[layer],
+        tooltip={"html": html, "style": {"backgroundColor": "black", "color": "white"}}
+    )
+
+
+def elegir_modo(n_puntos, modo="auto", umbral=UMBRAL_MARCADORES):
+    if modo not in MODOS:
+        raise ValueError(f"Modo de mapa desconocido: {modo}. Opciones: {MODOS}")
+    if modo == "auto":
+        return "marcadores" if n_puntos <= umbral else "capa"
+    return modo
+
+
+def tamano_contenido(mapa):
+    # Bytes que se envían al navegador; serializa el mapa, así que cuesta tanto como dibujarlo otra vez
+    contenido = mapa.get_root().render() if isinstance(mapa, folium.Map) else mapa.to_json()
+    return len(contenido.encode("utf-8")) if isinstance(contenido, str) else len(json.dumps(contenido))
+
+
+def construir_mapa(df, modo="auto", umbral=UMBRAL_MARCADORES, medir_contenido=None):
+    """Construye el mapa de riesgo con el modo indicado ("auto" elige según `umbral`).
+
+    Devuelve `(mapa, metricas)`: un `folium.Map` o un `pydeck.Deck` y un
+    diccionario con el modo usado, el número de puntos y el tiempo de
+    construcción en el servidor (segundos). El tamaño del contenido que se
+    envía al navegador ("bytes") obliga a serializar el mapa una vez más, así
+    que solo se mide con `medir_contenido` (por defecto, si la instrumentación
+    está activa); si no, es None.
+    """
+    modo = elegir_modo(len(df), modo, umbral)
+    inicio = time.perf_counter()
+    mapa = mapa_marcadores(df) if modo == "marcadores" else mapa_capa(df)
+    metricas = {"modo": modo, "puntos": len(df), "bytes": None, "segundos": time.perf_counter() - inicio}
+    if instrumentacion.activa() if medir_contenido is None else medir_contenido:
+        metricas["bytes"] = tamano_contenido(mapa)
+    return mapa, metricas
@@ -0,0 +1,116 @@
+from datetime import datetime
+
+import pandas as pd
+
+from Comun.espacial import clave_celda, cuadrante_de_clave
+from Comun.instrumentacion import medir
+from Comun.modelos import registro
+from Incendios.clima import COLUMNAS_CLIMA, asignar_zona, simular_clima
+from Incendios.datos import cargar_municipios
+from Incendios.ensemble import UMBRAL_CATASTROFE, calibrar_probabilidad, predecir_ensemble
+from Incendios.features import cargar_modelos, construir_matriz, entrada_extension, entrada_ocurrencia
+from Incendios.inferencia_rapida import preparar_modelo
+
+# Columnas de las tablas exportadas (cli.py y descargas de la app); las del ensemble solo si existen
+COLUMNAS_EXPORTACION = ["COD_INE", "PROVINCIA", "NOMBRE_ACTUAL", "lat", "lng", "fecha_simulada",
+                        "probabilidad", "riesgo_alto", "superficie_predicha", "es_catastrofe"]
+COLUMNAS_EXPORTACION_ENSEMBLE = ["prob_p10", "prob_p90", "superficie_esperada", "prob_catastrofe"]
+
+
+def _sin_progreso(fraccion, mensaje=None):
+    pass
+
+
+def preparar_municipios(df, mes, anio=None):
+    # Mes, fecha simulada (primer día del mes) y zona climática de cada municipio
+    if anio is None:
+        anio = datetime.now().year if datetime.now().year >= 2025 else 2025
+    df = df.copy()
+    df["mes"] = mes
+    df["fecha_simulada"] = pd.Timestamp(year=anio, month=mes, day=1)
+    df["zona"] = asignar_zona(df["lat"])
+    return df
+
+
+def predecir_incendios(mes, seed=42, municipios=None, modelos=None, anio=None,
+                       n_escenarios=None, memoria_max_mb=256, n_procesos=1, backend=None, progreso=None):
+    """Predicción de incendios de todos los municipios para un mes.
+
+    Simula el clima, calcula la probabilidad de incendio, la superficie que se
+    quemaría y si sería una catástrofe (>= 500 ha). Con `n_escenarios` se usa el
+    modo ensemble (ver `Incendios.ensemble.predecir_ensemble`) y la probabilidad
+    y la superficie son medias sobre los escenarios.
+
+    `municipios` es la tabla de municipios (por defecto la de la península) y
+    `modelos` el registro del que se sacan los modelos. `backend` elige el motor
+    de inferencia de los Random Forest (ver `Incendios.inferencia_rapida`).
+    `progreso(fraccion, mensaje)` recibe el avance de cada etapa (ver
+    `Comun.trabajos`).
+    """
+    progreso = progreso or _sin_progreso
+    modelos = modelos or registro
+    progreso(0.0, "Cargando modelos")
+    with medir("incendios.modelos"):
+        modelo, modelo_extension = (preparar_modelo(m, backend) for m in cargar_modelos(modelos))
+    progreso(0.05, "Preparando municipios")
+    with medir("incendios.municipios"):
+        df = preparar_municipios(cargar_municipios() if municipios is None else municipios, mes, anio)
+
+    if n_escenarios:
+        with medir("incendios.ensemble"):
+            df_ensemble = predecir_ensemble(df, mes, modelo, modelo_extension, n_escenarios=n_escenarios,
+                                            seed=seed, memoria_max_mb=memoria_max_mb, n_procesos=n_procesos,
+                                            progreso=lambda f, m=None: progreso(0.1 + 0.85 * f, m))
+        df = df.join(df_ensemble)
+        df["probabilidad"] = df["prob_media"]
+        df["superficie_predicha"] = df["superficie_media"]
+    else:
+        progreso(0.1, "Simulando clima")
+        with medir("incendios.clima"):
+            df[COLUMNAS_CLIMA] = simular_clima(df["zona"], mes, seed=seed)
+            X = construir_matriz(df["lat"], df["lng"], df[COLUMNAS_CLIMA], mes)
+        progreso(0.3, "Probabilidad de incendio")
+        with medir("incendios.ocurrencia"):
+            df["probabilidad_incendio"] = modelo.predict_proba(entrada_ocurrencia(X))[:, 1]
+        df["probabilidad"] = calibrar_probabilidad(df["probabilidad_incendio"])
+        progreso(0.65, "Superficie quemada")
+        with medir("incendios.extension"):
+            df["superficie_predicha"] = modelo_extension.predict(entrada_extension(X))
+
+    progreso(0.95, "Clasificando riesgo")
+    df["riesgo_alto"] = (df["probabilidad"] > 0.5).astype(int)
+    df["es_catastrofe"] = (df["superficie_predicha"] >= UMBRAL_CATASTROFE).astype(int)
+    return df
+
+
+def riesgo_por_cuadrante(df, zonas=None):
+    """Riesgo de incendio agregado por cuadrante sísmico (celdas de 1x1 grados).
+
+    Devuelve una fila por cuadrante con el número de municipios, la
+    probabilidad media y máxima, la superficie total prevista y las
+    catástrofes. Con `zonas` (ver `Seismos.datos.cargar_zonas`) se añade el
+    nombre de la zona.
+    """
+    claves = clave_celda(df["lat"].to_numpy(), df["lng"].to_numpy())
+    agregado = df.groupby(claves).agg(
+        municipios=("probabilidad", "size"),
+        probabilidad_media=("probabilidad", "mean"),
+        probabilidad_max=("probabilidad", "max"),
+        superficie_total=("superficie_predicha", "sum"),
+        catastrofes=("es_catastrofe", "sum"),
+    )
+    agregado.insert(0, "cuadrante", [cuadrante_de_clave(c) for c in agregado.index])
+    if zonas is not None:
+        agregado.insert(1, "zona", agregado["cuadrante"].map(zonas).fillna(""))
+    return agregado.sort_values("probabilidad_media", ascending=False).reset_index(drop=True)
+
+
+def columnas_exportacion(df):
+    return COLUMNAS_EXPORTACION + [c for c in COLUMNAS_EXPORTACION_ENSEMBLE if c in df.columns]
+
+
+def filtrar_resultados(df, min_prob=0.0, max_prob=1.0, solo_catastrofes=False):
+    filtro = (df["probabilidad"] >= min_prob) & (df["probabilidad"] <= max_prob)
+    if solo_catastrofes:
+        filtro &= df["es_catastrofe"] == 1
+    return df[filtro]
@@ -0,0 +1,167 @@
+"""Predicción de una temporada completa: riesgo de incendio por mes y municipio.
+
+`predecir_temporada` construye de una vez la matriz de entrada de todos los
+meses (meses x municipios filas) y evalúa los dos modelos sobre ella por
+lotes, en lugar de repetir la predicción mensual mes a mes. El clima de cada
+mes se simula con la misma semilla que `predecir_incendios`, así que cada mes
+de la temporada coincide con la predicción mensual correspondiente.
+
+El resultado (`PrediccionTemporada`) guarda la probabilidad y la superficie
+como cubos float32 (mes, municipio), con los municipios ordenados por
+provincia: un mes es una fila del cubo y una provincia un tramo contiguo de
+columnas, así que ambas consultas son vistas sin copia.
+"""
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from Comun.instrumentacion import medir
+from Comun.modelos import registro
+from Incendios.clima import COLUMNAS_CLIMA, codificar_zonas, simular_clima_array
+from Incendios.datos import cargar_municipios
+from Incendios.ensemble import UMBRAL_CATASTROFE, calibrar_probabilidad, filas_por_lote
+from Incendios.features import TIPO_MATRIZ, cargar_modelos, construir_matriz, entrada_extension, entrada_ocurrencia
+from Incendios.inferencia_rapida import preparar_modelo
+from Incendios.pipeline import preparar_municipios
+
+MESES = list(range(1, 13))
+
+COLUMNAS_PROVINCIA = ["provincia", "mes", "municipios", "probabilidad_media", "probabilidad_max",
+                      "riesgo_alto", "superficie_total", "catastrofes"]
+
+
+class PrediccionTemporada:
+    """Cubos (mes, municipio) de probabilidad y superficie con su índice de municipios."""
+
+    def __init__(self, municipios, meses, probabilidad, superficie, anio=None):
+        # Municipios ordenados por provincia; cada provincia es un tramo [inicio, fin) de columnas
+        orden = np.argsort(municipios["PROVINCIA"].to_numpy().astype(str), kind="stable")
+        self.municipios = municipios.iloc[orden]
+        self.meses = np.asarray(meses, dtype=np.int64)
+        self.probabilidad = np.ascontiguousarray(np.asarray(probabilidad, dtype=np.float32)[:, orden])
+        self.superficie = np.ascontiguousarray(np.asarray(superficie, dtype=np.float32)[:, orden])
+        self.anio = anio
+
+        provincias = self.municipios["PROVINCIA"].to_numpy().astype(str)
+        nombres, inicios = np.unique(provincias, return_index=True)
+        self._inicios = inicios
+        self._tramos = {p: (int(i), int(f)) for p, i, f in zip(nombres, inicios, np.append(inicios[1:], len(provincias)))}
+
+    @property
+    def provincias(self):
+        return list(self._tramos)
+
+    def _fila(self, mes):
+        posicion = np.flatnonzero(self.meses == mes)
+        if not len(posicion):
+            raise KeyError(f"El mes {mes} no está en la temporada ({self.meses.tolist()})")
+        return posicion[0]
+
+    def tramo(self, provincia):
+        """`slice` de las columnas de los municipios de la provincia."""
+        return slice(*self._tramos[provincia])
+
+    def provincia(self, provincia):
+        """`(municipios, probabilidad, superficie)` de una provincia; los cubos son vistas (mes, municipio)."""
+        tramo = self.tramo(provincia)
+        return self.municipios.iloc[tramo], self.probabilidad[:, tramo], self.superficie[:, tramo]
+
+    def tabla_mes(self, mes):
+        """Tabla de un mes con las mismas columnas que `predecir_incendios` (sin reordenar municipios)."""
+        fila = self._fila(mes)
+        df = preparar_municipios(self.municipios, int(mes), self.anio)
+        df["probabilidad"] = self.probabilidad[fila].astype(float)
+        df["superficie_predicha"] = self.superficie[fila].astype(float)
+        df["riesgo_alto"] = (df["probabilidad"] > 0.5).astype(int)
+        df["es_catastrofe"] = (df["superficie_predicha"] >= UMBRAL_CATASTROFE).astype(int)
+        return df.sort_index()
+
+    def por_provincia(self):
+        """Agregado por provincia y mes (columnas `COLUMNAS_PROVINCIA`)."""
+        # Sumas y máximos por tramo de columnas con reduceat, sin agrupar tablas
+        n = np.diff(np.append(self._inicios, self.probabilidad.shape[1]))
+        suma = np.add.reduceat(self.probabilidad.astype(np.float64), self._inicios, axis=1)
+        maximo = np.maximum.reduceat(self.probabilidad, self._inicios, axis=1)
+        riesgo = np.add.reduceat((self.probabilidad > 0.5).astype(np.int64), self._inicios, axis=1)
+        superficie = np.add.reduceat(self.superficie.astype(np.float64), self._inicios, axis=1)
+        catastrofes = np.add.reduceat((self.superficie >= UMBRAL_CATASTROFE).astype(np.int64), self._inicios, axis=1)
+
+        n_meses, n_provincias = suma.shape
+        return pd.DataFrame({
+            "provincia": np.tile(self.provincias, n_meses),
+            "mes": np.repeat(self.meses, n_provincias),
+            "municipios": np.tile(n, n_meses),
+            "probabilidad_media": (suma / n).ravel(),
+            "probabilidad_max": maximo.ravel().astype(float),
+            "riesgo_alto": riesgo.ravel(),
+            "superficie_total": superficie.ravel(),
+            "catastrofes": catastrofes.ravel(),
+        }, columns=COLUMNAS_PROVINCIA)
+
+    def calendario(self, valor="probabilidad_media"):
+        """Tabla provincia x mes con una columna de `por_provincia` (calendario de riesgo)."""
+        return self.por_provincia().pivot(index="provincia", columns="mes", values=valor)
+
+    def guardar(self, ruta):
+        # Cubos y municipios en un .npz comprimido (los municipios como CSV dentro del archivo)
+        np.savez_compressed(ruta, meses=self.meses, probabilidad=self.probabilidad, superficie=self.superficie,
+                            anio=np.array(-1 if self.anio is None else self.anio),
+                            municipios=np.frombuffer(self.municipios.to_csv().encode("utf-8"), dtype=np.uint8))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta) as datos:
+            municipios = pd.read_csv(StringIO(datos["municipios"].tobytes().decode("utf-8")), index_col=0)
+            anio = int(datos["anio"])
+            return cls(municipios, datos["meses"], datos["probabilidad"], datos["superficie"],
+                       None if anio < 0 else anio)
+
+
+def predecir_temporada(meses=MESES, seed=42, municipios=None, modelos=None, anio=None,
+                       memoria_max_mb=256, backend=None, progreso=None):
+    """Predicción de incendios de todos los municipios para varios meses (por defecto, el año entero).
+
+    Los parámetros son los de `Incendios.pipeline.predecir_incendios`. La
+    matriz de entrada de todos los meses se construye de una vez y se evalúa
+    por lotes de como mucho `memoria_max_mb` MB. `progreso(fraccion, mensaje)`
+    recibe el avance (ver `Comun.trabajos`).
+    """
+    progreso = progreso or (lambda fraccion, mensaje=None: None)
+    meses = np.asarray(list(meses), dtype=np.int64)
+    modelos = modelos or registro
+
+    progreso(0.0, "Cargando modelos")
+    with medir("temporada.modelos"):
+        modelo, modelo_extension = (preparar_modelo(m, backend) for m in cargar_modelos(modelos))
+    with medir("temporada.municipios"):
+        municipios = cargar_municipios() if municipios is None else municipios
+        lat = municipios["lat"].to_numpy(dtype=float)
+        lng = municipios["lng"].to_numpy(dtype=float)
+        codigos = codificar_zonas(preparar_municipios(municipios, 1, anio)["zona"])
+    n_mun, n_meses = len(municipios), len(meses)
+
+    # Matriz (mes, municipio) aplanada: las filas de cada mes son un bloque contiguo
+    progreso(0.05, "Simulando clima")
+    with medir("temporada.clima"):
+        clima = np.empty((n_meses * n_mun, len(COLUMNAS_CLIMA)), dtype=TIPO_MATRIZ)
+        for i, mes in enumerate(meses):
+            # Misma semilla por mes que la predicción mensual
+            clima[i * n_mun:(i + 1) * n_mun] = simular_clima_array(codigos, mes, np.random.default_rng(seed))
+        X = construir_matriz(np.tile(lat, n_meses), np.tile(lng, n_meses), clima, np.repeat(meses, n_mun))
+        del clima
+
+    probabilidad = np.empty(n_meses * n_mun, dtype=np.float32)
+    superficie = np.empty(n_meses * n_mun, dtype=np.float32)
+    lote = filas_por_lote(memoria_max_mb)
+    with medir("temporada.inferencia"):
+        for inicio in range(0, len(X), lote):
+            bloque = X[inicio:inicio + lote]
+            fin = inicio + len(bloque)
+            progreso(0.1 + 0.85 * inicio / len(X), f"Filas {inicio:,} a {fin:,} de {len(X):,}")
+            probabilidad[inicio:fin] = calibrar_probabilidad(modelo.predict_proba(entrada_ocurrencia(bloque))[:, 1])
+            superficie[inicio:fin] = modelo_extension.predict(entrada_extension(bloque))
+
+    progreso(0.95, "Agregando por provincia")
+    return PrediccionTemporada(municipios, meses, probabilidad.reshape(n_meses, n_mun),
+                               superficie.reshape(n_meses, n_mun), anio)
@@ -1,21 +1,29 @@
 def main():
     import streamlit as st
-    import pandas as pd
     import numpy as np
     import matplotlib.pyplot as plt
-    from datetime import datetime
     import pydeck as pdk
-    from pandas.tseries.offsets import MonthEnd
-    import joblib
-    import json
-    from io import BytesIO
-    from statsmodels.formula.api import glm
-    import statsmodels.api as sm
+    from datetime import datetime
+    from Comun import instrumentacion
+    from Comun.exportacion import boton_descarga, botones_tabla, grafico_png, huella
+    from Comun.instrumentacion import medir
+    from Comun.modelos import registro
+    from Comun.trabajos import esperar, gestor_global
+    from Incendios.datos import indice_municipios
+    from Seismos.datos import cargar_zonas, cuadrantes_por_nombre
+    from Seismos.ingesta import leer_eventos
+    from Seismos.pipeline import predecir_cuadrante
+    from Seismos.series import obtener_indice
+    from Seismos.simulacion import N_SIMULACIONES
+
+    instrumentacion.activar_desde_url(st)
+    instrumentacion.iniciar_traza()
 
     if "mostrar_resultados" not in st.session_state:
         st.session_state["mostrar_resultados"] = False
         st.session_state["zona_anterior"] = None
         st.session_state["meses_anteriores"] = None
+        st.session_state["simulaciones_anteriores"] = None
 
 
     # -----------------------------
@@ -25,214 +33,159 @@ def main():
     st.title("🌍 Predicción de Desastres Naturales")
     st.markdown("Este sistema permite estimar la frecuencia, magnitud y posibilidad de tsunamis en zonas sísmicas específicas.")
 
-    with open('Seismos\\cuadrante_nombres.json', 'r', encoding="utf-8") as archivo:
-        zonas_sismicas = json.load(archivo)
+    with medir("seismos.zonas"):
+        zonas_sismicas = cargar_zonas()
+        cuadrante_de_zona = cuadrantes_por_nombre(zonas_sismicas)
 
-    df = pd.read_csv("Seismos\\df_terremotos.csv")
-    df["Fecha"] = pd.to_datetime(df["Fecha"])
-    df["lat_grid"] = df["Latitud"].apply(lambda x: int(np.floor(x)))
-    df["lon_grid"] = df["Longitud"].apply(lambda x: int(np.floor(x)))
-    df["cuadrante"] = df["lat_grid"].astype(str) + "," + df["lon_grid"].astype(str)
+    # Series mensuales de frecuencia por cuadrante, calculadas una vez por versión del catálogo
+    with medir("seismos.indice"):
+        indice_series = obtener_indice()
 
     # Selección de cuadrante
     st.sidebar.header("📍 Selección de Zona Sísmica")
     zonas = list(zonas_sismicas.values())
     zona_elegida = st.sidebar.selectbox("Elige una zona sísmica", zonas)
-    coordenadas = [k for k, v in zonas_sismicas.items() if v == zona_elegida][0]
+    coordenadas = cuadrante_de_zona[zona_elegida]
 
     # Parámetros de predicción
     st.sidebar.header("🔮 Parámetros de Predicción")
     n_meses = st.sidebar.slider("¿Cuántos meses deseas predecir?", 1, 24, 6)
+    # Por defecto las mismas simulaciones que antes; más simulaciones afinan la media y las bandas
+    n_simulaciones = st.sidebar.select_slider("Simulaciones de Poisson", [N_SIMULACIONES, 100, 1_000, 10_000, 100_000],
+                                              N_SIMULACIONES)
 
     # Parámetros actuales
     zona_actual = coordenadas
     meses_actuales = n_meses
 
-    # Botón para iniciar el modelo
+    # Botón para iniciar el modelo. La predicción se lanza en segundo plano (ver Comun/trabajos.py) y se
+    # identifica por cuadrante, meses y mes actual (del que dependen las fechas): otra sesión con la misma
+    # zona reutiliza el cálculo en marcha o su resultado.
     if st.sidebar.button("🔄 Generar predicciones"):
         st.session_state["mostrar_resultados"] = True
         st.session_state["zona_anterior"] = zona_actual
         st.session_state["meses_anteriores"] = meses_actuales
-        if (
-            st.session_state["mostrar_resultados"]
-            and st.session_state["zona_anterior"] == zona_actual
-            and st.session_state["meses_anteriores"] == meses_actuales
-        ):
-            cuadrante_objetivo = zona_actual
-            df_cuad = df[df["cuadrante"] == cuadrante_objetivo]
-            
-            # Si no hay datos:
-            if df_cuad.empty:
-                st.warning(f"No hay registros de terremotos en el cuadrante {zona_actual}.")
-                st.stop()
-
-            # Preparar serie temporal
-            df_cuad.set_index("Fecha", inplace=True)
-            serie = df_cuad.resample("M").size().rename("Frecuencia").reset_index()
-            serie["t"] = range(len(serie))
-
+        st.session_state["simulaciones_anteriores"] = n_simulaciones
+        clave = ("seismos", zona_actual, meses_actuales, n_simulaciones, datetime.now().strftime("%Y-%m"))
+        st.session_state["trabajo_prediccion"] = gestor_global.renovar(
+            st.session_state.get("trabajo_prediccion"), clave, predecir_cuadrante, zona_actual, meses_actuales,
+            seed=42, indice=indice_series, n_simulaciones=n_simulaciones)
+
+    # Los resultados se muestran mientras no cambien la zona, los meses ni las simulaciones elegidas
+    if (
+        st.session_state["mostrar_resultados"]
+        and st.session_state["zona_anterior"] == zona_actual
+        and st.session_state["meses_anteriores"] == meses_actuales
+        and st.session_state["simulaciones_anteriores"] == n_simulaciones
+    ):
+        if not esperar(st, st.session_state["trabajo_prediccion"]):
+            st.session_state["mostrar_resultados"] = False
+            del st.session_state["trabajo_prediccion"]
+            st.info("Predicción cancelada.")
+        else:
             # -----------------------------
-            # 2. Simulación de eventos con promedio de múltiples repeticiones
+            # 2-5. Frecuencia, simulación de eventos, magnitudes y tsunamis (ver Seismos/pipeline.py)
             # -----------------------------
-
-            lat, lon = zona_actual.split(",")
-            modelo_path = f"Seismos\\modelos_frecuencia\\modelo_frecuencia_{lat}_{lon}.pkl"
-
             try:
-                modelo_frecuencia = joblib.load(modelo_path)
-            except FileNotFoundError:
-                st.error(f"❌ No se encontró el modelo para el cuadrante {zona_actual}. Asegúrate de que exista: {modelo_path}")
+                with medir("seismos.prediccion"):
+                    pred_df, X_mag = st.session_state["trabajo_prediccion"].resultado()
+            except FileNotFoundError as e:
+                st.error(f"❌ No se encontró el modelo para el cuadrante {zona_actual}. Asegúrate de que exista: {e.filename}")
+                st.stop()
+            except ValueError as e:
+                st.warning(str(e))
+                st.stop()
+            except Exception as e:
+                # Se retira la suscripción al trabajo fallido: el error se muestra una vez y el botón lo relanza
+                gestor_global.cancelar(st.session_state["trabajo_prediccion"])
+                del st.session_state["trabajo_prediccion"]
+                st.session_state["mostrar_resultados"] = False
+                st.error(f"❌ La predicción ha fallado ({type(e).__name__}: {e}). Vuelve a pulsar «Generar predicciones».")
                 st.stop()
 
-            # Preparar predicción mensual
-            hoy = datetime.now()
-            anio_pred = hoy.year if hoy.year >= 2025 else 2025
-            mes_pred = hoy.month + 1 if hoy.month < 12 else 1
-            anio_pred = anio_pred if hoy.month < 12 else anio_pred + 1
-            inicio_pred = pd.Timestamp(year=anio_pred, month=mes_pred, day=1) + MonthEnd(0)
-
-            fechas_pred = pd.date_range(start=inicio_pred + pd.DateOffset(months=1), periods=meses_actuales, freq="M")
-            t_inicio = serie["t"].iloc[-1] + 1
-            t_futuro = list(range(t_inicio, t_inicio + meses_actuales))
-            meses_futuros = [d.month for d in fechas_pred]
-
-            df_future = pd.DataFrame({"t": t_futuro, "Mes": meses_futuros})
-            pred_df = pd.DataFrame({
-                "Fecha": fechas_pred,
-                "Frecuencia estimada": modelo_frecuencia.predict(df_future)
-            })
-
-            future_t = list(range(serie["t"].iloc[-1] + 1, serie["t"].iloc[-1] + 1 + n_meses))
-            future_months = [(serie["Fecha"].iloc[-1] + pd.DateOffset(months=i)).month for i in range(1, n_meses + 1)]
-
-            df_future = pd.DataFrame({"t": future_t, "Mes": future_months})
-            frecuencia_pred = modelo_frecuencia.predict(df_future)
-
-            np.random.seed(42)
-            n_simulaciones = 10
-
-            lam = pred_df["Frecuencia estimada"].values  # aseguramos array numérico
-
-            # Realizar múltiples simulaciones y calcular el promedio
-            simulaciones = np.array([np.random.poisson(lam) for _ in range(n_simulaciones)])
-            eventos_promedio = np.round(simulaciones.mean(axis=0)).astype(int)
-
-            # Asignar al DataFrame
-            pred_df["Eventos_simulados"] = eventos_promedio
-
-            # Asegurar al menos un evento si hay historial en el cuadrante
-            if pred_df["Eventos_simulados"].sum() == 0 and not df_cuad.empty:
-                pred_df.loc[pred_df.index[0], "Eventos_simulados"] = 1
-
-
-
-            # -----------------------------
-            # 4. Predecir magnitudes
-            # -----------------------------
-            modelo_magnitud = joblib.load("Seismos\\modelo_magnitud.pkl")
-            np.random.seed(42)
-            entradas_mag = []
-            for idx, row in pred_df.iterrows():
-                for _ in range(int(row["Eventos_simulados"])):
-                    entradas_mag.append({
-                        "Latitud": float(zona_actual.split(",")[0]) + np.random.uniform(0, 1),
-                        "Longitud": float(zona_actual.split(",")[1]) + np.random.uniform(0, 1),
-                        "Profundidad_km": np.random.uniform(1, 40),
-                        "Anio": row["Fecha"].year,
-                        "Mes": row["Fecha"].month,
-                        "Dia": row["Fecha"].day,
-                        "Hora": np.random.randint(0, 24),
-                        "Alerta": 1,
-                        "Fecha": row["Fecha"]
-                    })
-
-            X_mag = pd.DataFrame(entradas_mag)
             if X_mag.empty:
                 st.warning("⚠️ No se han simulado eventos sísmicos para este cuadrante. No hay predicciones disponibles.")
                 st.stop()
 
-            X_mag_features = X_mag[['Latitud', 'Longitud', 'Profundidad_km', 'Anio', 'Mes', 'Dia', 'Hora', 'Alerta']]
-            X_mag["Magnitud"] = modelo_magnitud.predict(X_mag_features)
-
-            magnitudes_por_mes = X_mag.groupby("Fecha")["Magnitud"].mean()
-            pred_df["Magnitud_promedio_estimada"] = pred_df["Fecha"].map(magnitudes_por_mes)
-            pred_df["Magnitud_promedio_estimada"] = pred_df["Magnitud_promedio_estimada"].round(1)
-
             # -----------------------------
-            # 5. Predecir tsunamis
+            # 6. Mostrar resultados
             # -----------------------------
-            modelo_tsunami = joblib.load("Seismos\\modelo_tsunami.pkl")
-            X_tsunami = X_mag[["Latitud", "Longitud", "Profundidad_km", "Anio", "Mes", "Dia", "Hora", "Alerta"]].fillna(0)
-            X_mag["Tsunami_Previsto"] = modelo_tsunami.predict(X_tsunami)
-            tsunamis_por_mes = X_mag.groupby("Fecha")["Tsunami_Previsto"].sum()
-            pred_df["Tsunamis_estimados"] = pred_df["Fecha"].map(tsunamis_por_mes).fillna(0).astype(int)
+            st.subheader(f"📈 Predicción para: {zona_elegida}")
+            st.dataframe(pred_df[["Fecha", "Eventos_simulados", "Magnitud_promedio_estimada", "Tsunamis_estimados"]], use_container_width=True)
+
+            # Distribución de las simulaciones: media y bandas del 5 % al 95 % (ver Seismos/simulacion.py)
+            with st.expander(f"🎲 Bandas de confianza ({n_simulaciones:,} simulaciones)"):
+                st.dataframe(pred_df[["Fecha", "Eventos_media", "Eventos_p05", "Eventos_p95", "Tsunamis_media",
+                                      "Tsunamis_p95", "Prob_tsunami", "Magnitud_maxima_media",
+                                      "Magnitud_maxima_p95"]], hide_index=True)
+
+            # Historial real del cuadrante (solo se leen sus particiones del catálogo, ver Seismos/ingesta.py)
+            with st.expander("📜 Terremotos registrados en el cuadrante"):
+                with medir("seismos.historial"):
+                    historial = leer_eventos([zona_actual], columnas=["Fecha", "Lugar", "Magnitud", "Profundidad_km"])
+                st.caption(f"{len(historial)} eventos registrados")
+                st.dataframe(historial.sort_values("Fecha", ascending=False), hide_index=True)
 
             # -----------------------------
-            # 6. Mostrar resultados
+            # 7. Mapa de ubicación 
             # -----------------------------
-            if st.session_state["mostrar_resultados"]:
-                st.subheader(f"📈 Predicción para: {zona_elegida}")
-                st.dataframe(pred_df[["Fecha", "Eventos_simulados", "Magnitud_promedio_estimada", "Tsunamis_estimados"]], use_container_width=True)
-
-                # -----------------------------
-                # 7. Mapa de ubicación 
-                # -----------------------------
-                st.subheader("🗺️ Mapa de eventos simulados")
-
-                # Preparar datos
-                coords_simuladas = X_mag[["Latitud", "Longitud", "Magnitud", "Fecha"]].copy()
-                coords_simuladas["Fecha"] = coords_simuladas["Fecha"].astype(str)  # Convertir Fecha a string para tooltip
-                coords_simuladas = coords_simuladas.rename(columns={
-                    "Latitud": "lat",
-                    "Longitud": "lon",
-                    "Magnitud": "magnitud",
-                    "Fecha": "fecha"
-                })
-
-                # Redondear datos
-                coords_simuladas["magnitud"] = coords_simuladas["magnitud"].round(1)
-                coords_simuladas["lat"] = coords_simuladas["lat"].round(2)
-                coords_simuladas["lon"] = coords_simuladas["lon"].round(2)
-                coords_simuladas["fecha"] = coords_simuladas["fecha"].astype(str)
-
-                # Función para asignar color por magnitud
-                def color_por_magnitud(mag):
-                    if mag < 3.5:
-                        return [0, 255, 0, 160]     # Verde
-                    elif mag < 5.0:
-                        return [255, 165, 0, 160]   # Naranja
-                    else:
-                        return [255, 0, 0, 160]     # Rojo
-
-                coords_simuladas["color"] = coords_simuladas["magnitud"].apply(color_por_magnitud)
-                coords_simuladas["radio"] = coords_simuladas["magnitud"] * 3000  # Escala ajustable
-
-                # Centro del mapa
-                midpoint = (np.average(coords_simuladas["lat"]), np.average(coords_simuladas["lon"]))
-
-                # Crear capa visual
-                layer = pdk.Layer(
-                    "ScatterplotLayer",
-                    data=coords_simuladas,
-                    get_position='[lon, lat]',
-                    get_fill_color="color",
-                    get_radius="radio",
-                    pickable=True
-                )
-
-                # Tooltip interactivo
-                tooltip = {
-                    "html": "<b>Fecha:</b> {fecha}<br/>"
-                            "<b>Magnitud:</b> {magnitud}<br/>"
-                            "<b>Latitud:</b> {lat}<br/>"
-                            "<b>Longitud:</b> {lon}",
-                    "style": {
-                        "backgroundColor": "black",
-                        "color": "white"
-                    }
+            st.subheader("🗺️ Mapa de eventos simulados")
+
+            # Preparar datos
+            coords_simuladas = X_mag[["Latitud", "Longitud", "Magnitud", "Fecha"]].copy()
+            coords_simuladas["Fecha"] = coords_simuladas["Fecha"].astype(str)  # Convertir Fecha a string para tooltip
+            coords_simuladas = coords_simuladas.rename(columns={
+                "Latitud": "lat",
+                "Longitud": "lon",
+                "Magnitud": "magnitud",
+                "Fecha": "fecha"
+            })
+
+            # Redondear datos
+            coords_simuladas["magnitud"] = coords_simuladas["magnitud"].round(1)
+            coords_simuladas["lat"] = coords_simuladas["lat"].round(2)
+            coords_simuladas["lon"] = coords_simuladas["lon"].round(2)
+            coords_simuladas["fecha"] = coords_simuladas["fecha"].astype(str)
+
+            # Función para asignar color por magnitud
+            def color_por_magnitud(mag):
+                if mag < 3.5:
+                    return [0, 255, 0, 160]     # Verde
+                elif mag < 5.0:
+                    return [255, 165, 0, 160]   # Naranja
+                else:
+                    return [255, 0, 0, 160]     # Rojo
+
+            coords_simuladas["color"] = coords_simuladas["magnitud"].apply(color_por_magnitud)
+            coords_simuladas["radio"] = coords_simuladas["magnitud"] * 3000  # Escala ajustable
+
+            # Centro del mapa
+            midpoint = (np.average(coords_simuladas["lat"]), np.average(coords_simuladas["lon"]))
+
+            # Crear capa visual
+            layer = pdk.Layer(
+                "ScatterplotLayer",
+                data=coords_simuladas,
+                get_position='[lon, lat]',
+                get_fill_color="color",
+                get_radius="radio",
+                pickable=True
+            )
+
+            # Tooltip interactivo
+            tooltip = {
+                "html": "<b>Fecha:</b> {fecha}<br/>"
+                        "<b>Magnitud:</b> {magnitud}<br/>"
+                        "<b>Latitud:</b> {lat}<br/>"
+                        "<b>Longitud:</b> {lon}",
+                "style": {
+                    "backgroundColor": "black",
+                    "color": "white"
                 }
+            }
 
-                # Mostrar mapa
+            # Mostrar mapa
+            with medir("seismos.mapa"):
                 st.pydeck_chart(pdk.Deck(
                     map_style="mapbox://styles/mapbox/light-v9",
                     initial_view_state=pdk.ViewState(
@@ -246,45 +199,69 @@ def main():
                 ))
 
 
-                # -----------------------------
-                # 8. Graficar
-                # -----------------------------
-                def fig_to_bytes(fig):
-                    buf = BytesIO()
-                    fig.savefig(buf, format="png", bbox_inches='tight')
-                    buf.seek(0)
-                    return buf
+            # Municipios cerca del evento simulado de mayor magnitud (índice espacial, sin recorrer la tabla)
+            with st.expander("🏘️ Municipios cercanos al evento más fuerte"):
+                radio_km = st.slider("Radio (km)", 10, 200, 50, step=10)
+                with medir("seismos.municipios_cercanos"):
+                    municipios, indice_mun = indice_municipios()
+                    epicentro = X_mag.loc[X_mag["Magnitud"].idxmax()]
+                    cercanos = indice_mun.en_radio(epicentro["Latitud"], epicentro["Longitud"], radio_km)
+                    tabla_cercanos = municipios.iloc[cercanos][["NOMBRE_ACTUAL", "PROVINCIA"]].assign(
+                        distancia_km=indice_mun.distancia(epicentro["Latitud"], epicentro["Longitud"], cercanos).round(1)
+                    )
+                st.caption(f"Magnitud {epicentro['Magnitud']:.1f} en ({epicentro['Latitud']:.2f}, "
+                           f"{epicentro['Longitud']:.2f}) · {len(cercanos)} municipios a menos de {radio_km} km")
+                st.dataframe(tabla_cercanos, hide_index=True)
 
-                st.subheader("📊 Visualización de Resultados")
 
+            # -----------------------------
+            # 8. Graficar
+            # -----------------------------
+            # Los gráficos se dibujan una vez por resultado (caché por huella) y se muestran como PNG;
+            # las descargas de tablas solo se generan al pulsar el botón (ver Comun/exportacion.py)
+            resultado = huella(zona_elegida, pred_df)
+
+            def dibujar_frecuencia():
                 fig, ax1 = plt.subplots(figsize=(10, 5))
                 ax1.plot(pred_df["Fecha"], pred_df["Eventos_simulados"], marker='o', color='blue', label="Frecuencia estimada")
+                ax1.fill_between(pred_df["Fecha"], pred_df["Eventos_p05"], pred_df["Eventos_p95"], color='blue',
+                                 alpha=0.15, label="Banda 5-95 %")
                 ax1.set_ylabel("Cantidad de terremotos")
                 ax1.set_title(f"Frecuencia de Terremotos - {zona_elegida}")
                 ax2 = ax1.twinx()
                 ax2.plot(pred_df["Fecha"], pred_df["Magnitud_promedio_estimada"], marker='s', color='red', linestyle='--', label="Magnitud estimada")
                 ax2.set_ylabel("Magnitud promedio")
                 fig.legend(loc="upper left")
-                st.pyplot(fig)
-
-                st.download_button(
-                    label="📥 Descargar gráfico de frecuencia",
-                    data=fig_to_bytes(fig),
-                    file_name="frecuencia_terremotos.png",
-                    mime="image/png"
-                )
+                return fig
 
+            def dibujar_tsunamis():
                 fig, ax = plt.subplots(figsize=(10, 5))
                 ax.plot(pred_df["Fecha"], pred_df["Tsunamis_estimados"], marker='o', color='purple')
                 ax.set_title("Tsunamis estimados por mes")
                 ax.set_ylabel("Cantidad")
-                st.pyplot(fig)
+                return fig
+
+            st.subheader("📊 Visualización de Resultados")
+
+            png_frecuencia = lambda: grafico_png(("frecuencia", resultado), dibujar_frecuencia)
+            st.image(png_frecuencia())
+            boton_descarga(st, "📥 Descargar gráfico de frecuencia", png_frecuencia,
+                           "frecuencia_terremotos.png", "image/png")
+
+            png_tsunamis = lambda: grafico_png(("tsunamis", resultado), dibujar_tsunamis)
+            st.image(png_tsunamis())
+            boton_descarga(st, "📥 Descargar gráfico de tsunamis", png_tsunamis,
+                           "tsunamis_estimados.png", "image/png")
+
+            st.subheader("📥 Descargar resultados")
+            botones_tabla(st, pred_df, f"prediccion_{zona_actual}", "Predicción mensual", clave="prediccion")
+            botones_tabla(st, X_mag, f"eventos_{zona_actual}", "Eventos simulados", clave="eventos")
 
-                st.download_button(
-                    label="📥 Descargar gráfico de tsunamis",
-                    data=fig_to_bytes(fig),
-                    file_name="tsunamis_estimados.png",
-                    mime="image/png"
-                )
+    with st.sidebar.expander("🧠 Modelos en memoria"):
+        st.dataframe(registro.estadisticas(), hide_index=True)
 
+    with st.sidebar.expander("⚙️ Trabajos en segundo plano"):
+        st.dataframe(gestor_global.estado(), hide_index=True)
 
+    # Tiempos por etapa (solo con ?debug=1 o DESASTRES_INSTRUMENTACION=1)
+    instrumentacion.mostrar_panel(st)
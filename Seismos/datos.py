@@ -0,0 +1,39 @@
+import json
+import os
+
+import pandas as pd
+
+from Comun.datos import cargar_instantanea
+from Comun.espacial import celda
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+RUTA_TERREMOTOS = os.path.join(CARPETA, "df_terremotos.csv")
+RUTA_CUADRANTES = os.path.join(CARPETA, "cuadrante_nombres.json")
+
+
+def preparar_terremotos(ruta=RUTA_TERREMOTOS):
+    df = pd.read_csv(ruta, dtype={"cuadrante": str})
+    df["Fecha"] = pd.to_datetime(df["Fecha"])
+    # El CSV ya trae la rejilla; solo se calcula si falta
+    if "lat_grid" not in df.columns or "lon_grid" not in df.columns:
+        df["lat_grid"], df["lon_grid"] = celda(df["Latitud"].to_numpy(), df["Longitud"].to_numpy())
+    if "cuadrante" not in df.columns:
+        df["cuadrante"] = df["lat_grid"].astype(str) + "," + df["lon_grid"].astype(str)
+    return df
+
+
+def cargar_terremotos(ruta=RUTA_TERREMOTOS):
+    return cargar_instantanea("terremotos", ruta, preparar_terremotos)
+
+
+def cargar_zonas(ruta=RUTA_CUADRANTES):
+    with open(ruta, 'r', encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def cuadrantes_por_nombre(zonas):
+    # Nombre de zona -> cuadrante ("36,-5"); si un nombre se repite se queda el primero, como en la app
+    inverso = {}
+    for cuadrante, nombre in zonas.items():
+        inverso.setdefault(nombre, cuadrante)
+    return inverso
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Variables que esperan los modelos de magnitud y tsunami (en este orden)
+FEATURES_EVENTO = ['Latitud', 'Longitud', 'Profundidad_km', 'Anio', 'Mes', 'Dia', 'Hora', 'Alerta']
+
+
+def coordenadas_cuadrante(cuadrante):
+    # "36,-5" -> (36, -5): esquina suroeste de la celda de 1x1 grados
+    lat, lon = str(cuadrante).split(",")
+    return int(lat), int(lon)
+
+
+def generar_eventos(fechas, eventos_por_mes, cuadrante, seed=None):
+    """Genera todos los eventos sintéticos de la predicción de una vez.
+
+    Cada mes de `fechas` se repite tantas veces como indique `eventos_por_mes`
+    y las coordenadas, profundidades y horas se sortean en una sola llamada por
+    columna. `seed` puede ser un entero, un `np.random.Generator` o None.
+    Devuelve un DataFrame con `FEATURES_EVENTO` más la columna `Fecha`.
+    """
+    rng = np.random.default_rng(seed)
+    lat0, lon0 = coordenadas_cuadrante(cuadrante)
+    fechas = pd.DatetimeIndex(fechas)
+    conteos = np.asarray(eventos_por_mes, dtype=np.int64)
+    if conteos.shape != (len(fechas),):
+        raise ValueError("eventos_por_mes debe tener un valor por cada fecha")
+    if (conteos < 0).any():
+        raise ValueError("eventos_por_mes no puede tener valores negativos")
+
+    fechas_eventos = fechas.repeat(conteos)
+    n = len(fechas_eventos)
+    return pd.DataFrame({
+        "Latitud": lat0 + rng.uniform(0, 1, n),
+        "Longitud": lon0 + rng.uniform(0, 1, n),
+        "Profundidad_km": rng.uniform(1, 40, n),
+        "Anio": fechas_eventos.year.astype(np.int64),
+        "Mes": fechas_eventos.month.astype(np.int64),
+        "Dia": fechas_eventos.day.astype(np.int64),
+        "Hora": rng.integers(0, 24, n),
+        "Alerta": np.ones(n, dtype=np.int64),
+        "Fecha": fechas_eventos,
+    })
+
+
+def predecir_eventos(eventos, modelo_magnitud, modelo_tsunami):
+    # Los dos modelos leen la misma matriz de variables, construida una sola vez
+    X = eventos[FEATURES_EVENTO].fillna(0)
+    eventos = eventos.copy()
+    eventos["Magnitud"] = modelo_magnitud.predict(X)
+    eventos["Tsunami_Previsto"] = modelo_tsunami.predict(X)
+    return eventos
+
+
+def resumir_por_mes(pred_df, eventos):
+    # Magnitud media (redondeada a 1 decimal) y número de tsunamis de cada mes de la predicción
+    agrupado = eventos.groupby("Fecha")
+    pred_df = pred_df.copy()
+    pred_df["Magnitud_promedio_estimada"] = pred_df["Fecha"].map(agrupado["Magnitud"].mean()).round(1)
+    pred_df["Tsunamis_estimados"] = pred_df["Fecha"].map(agrupado["Tsunami_Previsto"].sum()).fillna(0).astype(int)
+    return pred_df
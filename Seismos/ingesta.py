@@ -0,0 +1,376 @@
+"""Ingesta incremental del catálogo de terremotos en almacenamiento particionado.
+
+Los ficheros exportados del catálogo (mismo esquema que `df_terremotos.csv`)
+se añaden a `Seismos/catalogo/` sin reescribir nada de lo anterior:
+
+    catalogo/
+    ├── manifiesto.json                      # lotes ingeridos, ficheros de cada uno y conteos vigentes
+    ├── conteos-000001.feather               # eventos por (cuadrante, mes): lo que usa el índice de series
+    └── eventos/anio=2024/cuadrante=36,1/lote-000001.feather
+
+Cada evento tiene un identificador (hash de fecha, hora, posición y
+magnitud); un evento ya ingerido no se vuelve a añadir. Como el
+identificador incluye la fecha y la posición, un duplicado solo puede estar
+en la misma partición (año, cuadrante), así que para comprobarlo se leen
+únicamente las particiones que toca el lote nuevo.
+
+Los lectores solo ven los ficheros que aparecen en el manifiesto, que se
+escribe de forma atómica después de los datos: un lote a medias no existe.
+Por eso los conteos tampoco se sobrescriben: cada lote escribe los suyos con
+su versión en el nombre y el manifiesto apunta a ellos (se conservan los del
+lote anterior para quien aún lea ese manifiesto). Se supone un único proceso
+escribiendo a la vez.
+
+El catálogo de las apps empieza con `df_terremotos.csv`: la primera ingesta
+lo añade antes que el fichero pedido, porque en cuanto existe el catálogo las
+apps dejan de leer el CSV y sin él se perdería el histórico (y el origen de
+las series mensuales).
+
+Uso (desde la raíz del proyecto):
+    python -m Seismos.ingesta exportacion_junio.csv      # la primera vez también ingiere df_terremotos.csv
+    python -m Seismos.ingesta --entrada descargas/ --vigilar 300   # ingiere lo nuevo cada 5 minutos
+    python -m Seismos.ingesta --estado
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Comun.datos import hash_fichero
+from Comun.instrumentacion import contar, medir
+from Seismos.datos import CARPETA, RUTA_TERREMOTOS, cargar_terremotos, preparar_terremotos
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # sin pyarrow se usa pickle
+    pa = feather = None
+
+CARPETA_CATALOGO = os.path.join(CARPETA, "catalogo")
+
+COLUMNAS_OBLIGATORIAS = ["Magnitud", "Latitud", "Longitud", "Fecha"]
+
+# Campos que identifican un evento (los que trae la exportación, sin el texto de `Lugar`)
+COLUMNAS_ID = ["Fecha", "Hora", "Latitud", "Longitud", "Magnitud"]
+
+
+def identificar_eventos(df):
+    """Identificador entero (uint64) de cada evento, estable entre exportaciones."""
+    clave = pd.DataFrame({
+        "Fecha": pd.to_datetime(df["Fecha"]).dt.strftime("%Y-%m-%d"),
+        "Hora": df["Hora"].fillna(-1).astype(int) if "Hora" in df.columns else -1,
+        "Latitud": df["Latitud"].astype(float).round(4),
+        "Longitud": df["Longitud"].astype(float).round(4),
+        "Magnitud": df["Magnitud"].astype(float).round(1),
+    }, index=df.index)[COLUMNAS_ID]
+    return pd.util.hash_pandas_object(clave, index=False).to_numpy()
+
+
+def _conteos_mensuales(df):
+    # (cuadrante, ordinal del mes, eventos), el formato de los ficheros de conteos
+    meses = pd.PeriodIndex(df["Fecha"], freq="M").asi8
+    conteos = df.groupby([df["cuadrante"].to_numpy(), meses]).size()
+    return pd.DataFrame({
+        "cuadrante": conteos.index.get_level_values(0).astype(str),
+        "mes": conteos.index.get_level_values(1).astype(np.int64),
+        "eventos": conteos.to_numpy().astype(np.int64),
+    })
+
+
+class CatalogoParticionado:
+    """Catálogo de terremotos particionado por año y cuadrante (ver el docstring del módulo)."""
+
+    def __init__(self, carpeta=CARPETA_CATALOGO, historico=None):
+        self.carpeta = carpeta
+        self.historico = historico
+        self.extension = "feather" if feather is not None else "pkl"
+        self._manifiesto = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    # --- Ficheros ---
+
+    @property
+    def ruta_manifiesto(self):
+        return os.path.join(self.carpeta, "manifiesto.json")
+
+    def fichero_conteos(self, version):
+        return f"conteos-{version:06d}.{self.extension}"
+
+    def _leer(self, ruta, columnas=None):
+        if ruta.endswith(".feather"):
+            df = feather.read_table(ruta, columns=columnas, memory_map=True).to_pandas()
+        else:
+            df = pd.read_pickle(ruta)
+        return df[columnas] if columnas is not None else df
+
+    def _escribir(self, datos, ruta):
+        # `datos` es un DataFrame o, con pyarrow, también una tabla de Arrow
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        if ruta.endswith(".feather"):
+            if isinstance(datos, pd.DataFrame):
+                datos = datos.reset_index(drop=True)
+            feather.write_feather(datos, temporal, compression="uncompressed")
+        else:
+            datos.reset_index(drop=True).to_pickle(temporal)
+        os.replace(temporal, ruta)
+
+    def existe(self):
+        return os.path.exists(self.ruta_manifiesto)
+
+    def manifiesto(self):
+        """Contenido de `manifiesto.json` (se relee solo si el fichero ha cambiado)."""
+        if not self.existe():
+            return {"version": 0, "lotes": []}
+        mtime = os.stat(self.ruta_manifiesto).st_mtime_ns
+        with self._lock:
+            if mtime != self._mtime:
+                with open(self.ruta_manifiesto, encoding="utf-8") as f:
+                    self._manifiesto = json.load(f)
+                self._mtime = mtime
+            return self._manifiesto
+
+    @property
+    def version(self):
+        return self.manifiesto()["version"]
+
+    def _guardar_manifiesto(self, manifiesto):
+        os.makedirs(self.carpeta, exist_ok=True)
+        temporal = f"{self.ruta_manifiesto}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(manifiesto, f, ensure_ascii=False, indent=1)
+        os.replace(temporal, self.ruta_manifiesto)
+
+    # --- Lectura ---
+
+    def particiones(self, cuadrantes=None, anios=None, desde_version=0, hasta_version=None):
+        """Ficheros (relativos a la carpeta) de las particiones pedidas, sin abrir ninguno."""
+        cuadrantes = None if cuadrantes is None else {str(c) for c in cuadrantes}
+        anios = None if anios is None else {int(a) for a in anios}
+        return [
+            parte["fichero"]
+            for lote in self.manifiesto()["lotes"]
+            if lote["version"] > desde_version and (hasta_version is None or lote["version"] <= hasta_version)
+            for parte in lote["particiones"]
+            if (cuadrantes is None or parte["cuadrante"] in cuadrantes) and (anios is None or parte["anio"] in anios)
+        ]
+
+    def leer(self, cuadrantes=None, anios=None, columnas=None, desde_version=0, hasta_version=None):
+        """Eventos de las particiones pedidas (todas por defecto), ordenados por fecha.
+
+        `desde_version` y `hasta_version` limitan la lectura a los lotes
+        ingeridos entre esas versiones del manifiesto (la primera excluida), que
+        es lo que usa la actualización incremental del índice de series.
+        """
+        ficheros = self.particiones(cuadrantes, anios, desde_version, hasta_version)
+        contar("ingesta.particiones_leidas", len(ficheros))
+        if not ficheros:
+            return pd.DataFrame(columns=columnas or COLUMNAS_OBLIGATORIAS + ["cuadrante"])
+        with medir("ingesta.leer"):
+            df = pd.concat([self._leer(os.path.join(self.carpeta, f), columnas) for f in ficheros], ignore_index=True)
+        if "Fecha" in df.columns:
+            df = df.sort_values("Fecha", kind="stable", ignore_index=True)
+        return df
+
+    def _conteos_de(self, manifiesto):
+        # Catálogos anteriores a los conteos versionados: `conteos.<ext>` sin referencia en el manifiesto
+        antiguo = f"conteos.{self.extension}"
+        if "conteos" not in manifiesto and os.path.exists(os.path.join(self.carpeta, antiguo)):
+            return antiguo
+        return manifiesto.get("conteos")
+
+    def conteos_mensuales(self, manifiesto=None):
+        """Eventos por cuadrante y mes de todo el catálogo (columnas `cuadrante`, `mes`, `eventos`).
+
+        Son los del manifiesto dado (el actual por defecto), así que cuadran
+        con su versión aunque mientras tanto se ingiera otro lote.
+        """
+        fichero = self._conteos_de(manifiesto or self.manifiesto())
+        if fichero is None:
+            return pd.DataFrame({"cuadrante": pd.Series(dtype=str), "mes": pd.Series(dtype=np.int64),
+                                 "eventos": pd.Series(dtype=np.int64)})
+        return self._leer(os.path.join(self.carpeta, fichero))
+
+    # --- Ingesta ---
+
+    def _sembrar(self, ruta=None):
+        # Un catálogo vacío empieza con el histórico (salvo que sea eso lo que se ingiere)
+        if not self.historico or self.existe() or not os.path.exists(self.historico):
+            return
+        if ruta is None or not os.path.samefile(ruta, self.historico):
+            self._ingerir_fichero(self.historico)
+
+    def ingerir(self, ruta):
+        """Añade al catálogo los eventos nuevos de un fichero exportado.
+
+        Devuelve un resumen del lote (filas leídas, nuevas y duplicadas y
+        particiones escritas). Un fichero ya ingerido (mismo hash) no se vuelve
+        a leer. Si el catálogo está vacío y tiene `historico`, antes se ingiere
+        ese fichero.
+        """
+        self._sembrar(ruta)
+        return self._ingerir_fichero(ruta)
+
+    def _ingerir_fichero(self, ruta):
+        origen = hash_fichero(ruta)
+        manifiesto = self.manifiesto()
+        if any(lote["hash"] == origen for lote in manifiesto["lotes"]):
+            contar("ingesta.ficheros_repetidos")
+            return {"fichero": os.path.basename(ruta), "hash": origen, "leidas": 0, "nuevas": 0,
+                    "duplicadas": 0, "particiones": [], "omitido": True}
+
+        with medir("ingesta.preparar"):
+            df = preparar_terremotos(ruta)
+        faltan = [c for c in COLUMNAS_OBLIGATORIAS if c not in df.columns]
+        if faltan:
+            raise ValueError(f"{ruta}: faltan las columnas {', '.join(faltan)}")
+        return self._ingerir_tabla(df, os.path.basename(ruta), origen)
+
+    def ingerir_tabla(self, df, nombre="tabla", origen=None):
+        """Como `ingerir`, con los eventos ya en un DataFrame (con `cuadrante` y `Fecha` como fecha)."""
+        self._sembrar()
+        return self._ingerir_tabla(df, nombre, origen)
+
+    def _ingerir_tabla(self, df, nombre, origen):
+        with medir("ingesta.deduplicar"):
+            df = df.copy()
+            df["id_evento"] = identificar_eventos(df)
+            leidas = len(df)
+            df = df.drop_duplicates("id_evento")
+            df["anio"] = df["Fecha"].dt.year.astype(int)
+
+            # Solo hace falta mirar las particiones (año, cuadrante) que toca el lote
+            existentes = self.leer(df["cuadrante"].unique(), df["anio"].unique(), columnas=["id_evento"])
+            df = df[~df["id_evento"].isin(existentes["id_evento"].to_numpy())]
+
+        manifiesto = self.manifiesto()
+        version = manifiesto["version"] + 1
+        particiones = []
+        with medir("ingesta.escribir"):
+            # Filas ordenadas por partición; con pyarrow la conversión a Arrow se hace una sola vez y cada
+            # partición es un trozo (sin copia) de la tabla
+            df = df.sort_values(["anio", "cuadrante"], kind="stable", ignore_index=True)
+            anios, cuadrantes = df["anio"].to_numpy(), df["cuadrante"].to_numpy()
+            df = df.drop(columns="anio")
+            datos = pa.Table.from_pandas(df, preserve_index=False) if feather is not None else df
+            # Sin eventos nuevos (todo duplicado) el lote queda registrado sin particiones
+            cambios = (anios[1:] != anios[:-1]) | (cuadrantes[1:] != cuadrantes[:-1])
+            inicios = np.flatnonzero(np.r_[True, cambios]) if len(df) else np.array([], dtype=np.int64)
+            for inicio, fin in zip(inicios, np.r_[inicios[1:], len(df)]):
+                anio, cuadrante = int(anios[inicio]), str(cuadrantes[inicio])
+                fichero = f"eventos/anio={anio}/cuadrante={cuadrante}/lote-{version:06d}.{self.extension}"
+                trozo = datos.slice(inicio, fin - inicio) if feather is not None else datos.iloc[inicio:fin]
+                self._escribir(trozo, os.path.join(self.carpeta, fichero))
+                particiones.append({"anio": anio, "cuadrante": cuadrante, "fichero": fichero,
+                                    "filas": int(fin - inicio)})
+
+            # Agregados mensuales: los de antes más los del lote (sin volver a leer los eventos), en un
+            # fichero nuevo que solo se ve cuando el manifiesto apunta a él
+            fichero_conteos = self._conteos_de(manifiesto)
+            if len(df):
+                conteos = pd.concat([self.conteos_mensuales(manifiesto), _conteos_mensuales(df)], ignore_index=True)
+                conteos = conteos.groupby(["cuadrante", "mes"], as_index=False)["eventos"].sum()
+                fichero_conteos = self.fichero_conteos(version)
+                self._escribir(conteos, os.path.join(self.carpeta, fichero_conteos))
+
+        lote = {
+            "version": version,
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "fichero": nombre,
+            "hash": origen,
+            "leidas": leidas,
+            "nuevas": len(df),
+            "duplicadas": leidas - len(df),
+            "particiones": particiones,
+        }
+        # El manifiesto es el único punto de confirmación: hasta aquí nadie ve ni el lote ni sus conteos
+        self._guardar_manifiesto({"version": version, "conteos": fichero_conteos,
+                                  "lotes": manifiesto["lotes"] + [lote]})
+        self._borrar_conteos_antiguos(self._conteos_de(manifiesto), fichero_conteos)
+        contar("ingesta.eventos_nuevos", len(df))
+        contar("ingesta.eventos_duplicados", leidas - len(df))
+        return lote
+
+    def _borrar_conteos_antiguos(self, *vigentes):
+        # Los conteos de los lotes anteriores al último ya no los apunta ningún manifiesto reciente
+        for ruta in glob.glob(os.path.join(self.carpeta, f"conteos-*.{self.extension}")):
+            if os.path.basename(ruta) not in vigentes:
+                os.remove(ruta)
+
+    def ingerir_carpeta(self, carpeta, patron="*.csv"):
+        """Ingiere los ficheros de `carpeta` que aún no estén en el catálogo, por orden de nombre."""
+        return [self.ingerir(ruta) for ruta in sorted(glob.glob(os.path.join(carpeta, patron)))]
+
+    def estado(self):
+        lotes = self.manifiesto()["lotes"]
+        return pd.DataFrame(
+            [[l["version"], l["fecha"], l["fichero"], l["leidas"], l["nuevas"], l["duplicadas"], len(l["particiones"])]
+             for l in lotes],
+            columns=["version", "fecha", "fichero", "leidas", "nuevas", "duplicadas", "particiones"],
+        )
+
+
+# Catálogo por defecto de las aplicaciones
+catalogo = CatalogoParticionado(historico=RUTA_TERREMOTOS)
+
+
+def leer_eventos(cuadrantes=None, anios=None, columnas=None):
+    """Eventos registrados de los cuadrantes y años pedidos.
+
+    Con el catálogo particionado solo se abren esas particiones; si aún no se
+    ha ingerido nada se filtra `df_terremotos.csv` (instantánea en caché).
+    """
+    if catalogo.existe():
+        return catalogo.leer(cuadrantes, anios, columnas)
+    df = cargar_terremotos()
+    filtro = np.ones(len(df), dtype=bool)
+    if cuadrantes is not None:
+        filtro &= df["cuadrante"].isin([str(c) for c in cuadrantes]).to_numpy()
+    if anios is not None:
+        filtro &= df["Fecha"].dt.year.isin(list(anios)).to_numpy()
+    df = df[filtro].sort_values("Fecha", kind="stable", ignore_index=True)
+    return df[columnas] if columnas is not None else df
+
+
+def _resumen(lote):
+    if lote.get("omitido"):
+        return f"⏭️  {lote['fichero']}: ya ingerido"
+    return (f"✅ {lote['fichero']}: {lote['nuevas']} eventos nuevos, {lote['duplicadas']} duplicados, "
+            f"{len(lote['particiones'])} particiones")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ficheros", nargs="*", help="CSV exportados del catálogo")
+    parser.add_argument("--entrada", default=None, help="carpeta de la que ingerir todos los CSV nuevos")
+    parser.add_argument("--vigilar", type=float, default=None, metavar="SEGUNDOS",
+                        help="con --entrada, vuelve a mirar la carpeta cada SEGUNDOS")
+    parser.add_argument("--carpeta", default=CARPETA_CATALOGO, help="carpeta del catálogo particionado")
+    parser.add_argument("--historico", default=RUTA_TERREMOTOS,
+                        help="CSV que se ingiere primero si el catálogo está vacío ('' para ninguno)")
+    parser.add_argument("--estado", action="store_true", help="muestra los lotes ingeridos")
+    args = parser.parse_args(argv)
+
+    almacen = CatalogoParticionado(args.carpeta, historico=args.historico or None)
+    for ruta in args.ficheros:
+        print(_resumen(almacen.ingerir(ruta)))
+    while args.entrada:
+        for lote in almacen.ingerir_carpeta(args.entrada):
+            if not lote.get("omitido"):
+                print(_resumen(lote), flush=True)
+        if args.vigilar is None:
+            break
+        time.sleep(args.vigilar)
+    if args.estado:
+        print(almacen.estado().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Predicción de toda la rejilla sísmica en una sola ejecución.
+
+Uso (desde la raíz del proyecto):
+    python -m Seismos.lote --meses 24 --salida prediccion_rejilla.csv [--procesos 8] [--simulaciones 10000]
+"""
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from Comun.exportacion import guardar_tabla
+from Comun.modelos import PLANTILLA_FRECUENCIA, RAIZ, registro
+from Seismos.datos import cargar_zonas
+from Seismos.pipeline import COLUMNAS_PREDICCION, predecir_cuadrante
+from Seismos.series import obtener_indice
+from Seismos.simulacion import N_SIMULACIONES
+
+COLUMNAS_LOTE = ["cuadrante", "zona"] + COLUMNAS_PREDICCION
+
+
+def cuadrantes_con_modelo():
+    # Cuadrantes que tienen un modelo de frecuencia en Seismos/modelos_frecuencia/
+    patron = os.path.join(RAIZ, PLANTILLA_FRECUENCIA.format(lat="*", lon="*"))
+    cuadrantes = []
+    for ruta in glob.glob(patron):
+        coincidencia = re.search(r"modelo_frecuencia_(-?\d+)_(-?\d+)\.pkl$", ruta)
+        if coincidencia:
+            cuadrantes.append(f"{coincidencia.group(1)},{coincidencia.group(2)}")
+    return sorted(cuadrantes, key=lambda c: tuple(int(x) for x in c.split(",")))
+
+
+def _inicializar_proceso():
+    # Cada proceso carga una vez los modelos comunes y el índice de series y los reutiliza
+    registro.modelo("magnitud")
+    registro.modelo("tsunami")
+    obtener_indice()
+
+
+def _predecir(cuadrante, n_meses, seed, hoy, n_simulaciones):
+    try:
+        pred_df, _ = predecir_cuadrante(cuadrante, n_meses, seed=seed, hoy=hoy, n_simulaciones=n_simulaciones)
+    except (ValueError, FileNotFoundError) as e:
+        return cuadrante, None, str(e)
+    return cuadrante, pred_df, None
+
+
+def predecir_rejilla(n_meses=24, cuadrantes=None, seed=42, hoy=None, n_procesos=None,
+                     n_simulaciones=N_SIMULACIONES):
+    """Ejecuta `predecir_cuadrante` en todos los cuadrantes y junta los resultados.
+
+    Con `n_procesos` > 1 (o None para usar todos los núcleos) los cuadrantes se
+    reparten en un pool de procesos. Cada cuadrante usa la misma `seed` que la
+    aplicación, así que su resultado coincide con el de una ejecución individual.
+
+    Devuelve `(resultados, omitidos)`: una tabla con `COLUMNAS_LOTE` y un
+    diccionario cuadrante -> motivo para los cuadrantes sin predicción.
+    """
+    cuadrantes = cuadrantes_con_modelo() if cuadrantes is None else list(cuadrantes)
+    if n_procesos is None:
+        n_procesos = os.cpu_count() or 1
+    n_procesos = max(1, min(n_procesos, len(cuadrantes)))
+
+    argumentos = ([n_meses] * len(cuadrantes), [seed] * len(cuadrantes), [hoy] * len(cuadrantes),
+                  [n_simulaciones] * len(cuadrantes))
+    if n_procesos > 1:
+        with ProcessPoolExecutor(max_workers=n_procesos, initializer=_inicializar_proceso) as pool:
+            salidas = list(pool.map(_predecir, cuadrantes, *argumentos,
+                                    chunksize=max(1, len(cuadrantes) // (4 * n_procesos))))
+    else:
+        salidas = list(map(_predecir, cuadrantes, *argumentos))
+
+    zonas = cargar_zonas()
+    tablas, omitidos = [], {}
+    for cuadrante, pred_df, error in salidas:
+        if pred_df is None:
+            omitidos[cuadrante] = error
+            continue
+        pred_df = pred_df.copy()
+        pred_df.insert(0, "zona", zonas.get(cuadrante, ""))
+        pred_df.insert(0, "cuadrante", cuadrante)
+        tablas.append(pred_df[COLUMNAS_LOTE])
+
+    resultados = pd.concat(tablas, ignore_index=True) if tablas else pd.DataFrame(columns=COLUMNAS_LOTE)
+    return resultados, omitidos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meses", type=int, default=24)
+    parser.add_argument("--salida", default="prediccion_rejilla.csv", help="fichero .csv o .parquet")
+    parser.add_argument("--procesos", type=int, default=None, help="por defecto, todos los núcleos")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--simulaciones", type=int, default=N_SIMULACIONES)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultados, omitidos = predecir_rejilla(args.meses, seed=args.semilla, n_procesos=args.procesos,
+                                            n_simulaciones=args.simulaciones)
+    guardar_tabla(resultados, args.salida)
+
+    n_cuadrantes = resultados["cuadrante"].nunique()
+    print(f"✅ {n_cuadrantes} cuadrantes x {args.meses} meses en {time.perf_counter() - inicio:.1f} s -> {args.salida}")
+    for cuadrante, motivo in omitidos.items():
+        print(f"   ⚠️ {cuadrante}: {motivo}")
+
+
+if __name__ == "__main__":
+    main()
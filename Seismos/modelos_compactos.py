@@ -0,0 +1,249 @@
+"""Formato compacto de los modelos de frecuencia por cuadrante.
+
+Los `.pkl` de `Seismos/modelos_frecuencia/` son resultados GLM de statsmodels
+completos (incluyen los datos de entrenamiento). Para predecir solo hacen falta
+los coeficientes, el orden de las columnas del diseño y la función de enlace,
+así que se exportan todos a un único `.npz`.
+
+Uso (desde la raíz del proyecto):
+    python -m Seismos.modelos_compactos exportar
+    python -m Seismos.modelos_compactos verificar
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from Comun.datos import hash_fichero
+from Comun.memoria import memoria_residente
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+CARPETA_MODELOS = os.path.join(CARPETA, "modelos_frecuencia")
+RUTA_COMPACTA = os.path.join(CARPETA, "modelos_frecuencia.npz")
+
+_PATRON_FICHERO = re.compile(r"modelo_frecuencia_(-?\d+)_(-?\d+)\.pkl$")
+_PATRON_CATEGORIA = re.compile(r"^C\((\w+)\)\[T\.(.+)\]$")
+
+# Inversa de cada función de enlace soportada
+_ENLACES = {
+    "Log": np.exp,
+    "Identity": lambda eta: eta,
+    "Sqrt": np.square,
+}
+
+
+class ModeloFrecuenciaCompacto:
+    """Predictor de un GLM a partir de sus coeficientes.
+
+    `predict(df)` acepta el mismo DataFrame que `GLMResults.predict` (columnas
+    `t` y `Mes`) y devuelve la media prevista como array de NumPy.
+    """
+
+    def __init__(self, cuadrante, columnas, coeficientes, categorias, enlace, formula=""):
+        if enlace not in _ENLACES:
+            raise ValueError(f"Función de enlace no soportada: {enlace}")
+        self.cuadrante = cuadrante
+        self.columnas = list(columnas)
+        self.coeficientes = np.asarray(coeficientes, dtype=float)
+        self.categorias = {var: list(niveles) for var, niveles in categorias.items()}
+        self.enlace = enlace
+        self.formula = formula
+        self._inversa = _ENLACES[enlace]
+
+    def matriz_diseno(self, df):
+        n = len(df)
+        for variable, niveles in self.categorias.items():
+            valores = np.asarray(df[variable])
+            desconocidos = ~np.isin(valores, niveles)
+            if desconocidos.any():
+                raise ValueError(f"Valores de {variable} no vistos en el entrenamiento: "
+                                 f"{sorted(set(valores[desconocidos].tolist()))}")
+        X = np.empty((n, len(self.columnas)))
+        for j, columna in enumerate(self.columnas):
+            categoria = _PATRON_CATEGORIA.match(columna)
+            if columna == "Intercept":
+                X[:, j] = 1.0
+            elif categoria:
+                variable, nivel = categoria.groups()
+                X[:, j] = np.asarray(df[variable]).astype(str) == nivel
+            else:
+                X[:, j] = np.asarray(df[columna], dtype=float)
+        return X
+
+    def predict(self, df):
+        return self._inversa(self.matriz_diseno(df) @ self.coeficientes)
+
+
+class ModelosFrecuenciaCompactos:
+    def __init__(self, modelos, origen=None):
+        self._modelos = modelos
+        # cuadrante -> [ruta del .pkl, mtime al cargar, hash exportado]
+        self._origen = origen or {}
+
+    def __contains__(self, cuadrante):
+        return cuadrante in self._modelos
+
+    def __len__(self):
+        return len(self._modelos)
+
+    def cuadrantes(self):
+        return list(self._modelos)
+
+    def modelo(self, cuadrante):
+        return self._modelos[cuadrante]
+
+    def vigente(self, cuadrante):
+        """True si el cuadrante está y su `.pkl` no ha cambiado desde que se cargó el `.npz`.
+
+        Se compara la fecha de modificación del `.pkl`; si ha cambiado, su hash.
+        Un cuadrante desactualizado se descarta para que se use el `.pkl`.
+        """
+        if cuadrante not in self._modelos:
+            return False
+        origen = self._origen.get(cuadrante)
+        if origen is None:
+            return True
+        ruta, mtime, hash_origen = origen
+        try:
+            mtime_actual = os.stat(ruta).st_mtime
+        except FileNotFoundError:
+            return True
+        if mtime_actual == mtime:
+            return True
+        if hash_fichero(ruta) == hash_origen:
+            origen[1] = mtime_actual
+            return True
+        self._modelos.pop(cuadrante, None)
+        return False
+
+
+def _ficheros_pickle(carpeta=CARPETA_MODELOS):
+    ficheros = {}
+    for ruta in glob.glob(os.path.join(carpeta, "modelo_frecuencia_*.pkl")):
+        coincidencia = _PATRON_FICHERO.search(ruta)
+        if coincidencia:
+            ficheros[f"{coincidencia.group(1)},{coincidencia.group(2)}"] = ruta
+    return dict(sorted(ficheros.items()))
+
+
+def exportar(carpeta=CARPETA_MODELOS, salida=RUTA_COMPACTA):
+    """Escribe en `salida` los coeficientes y la estructura de todos los `.pkl` de `carpeta`."""
+    import joblib
+
+    ficheros = _ficheros_pickle(carpeta)
+    metadatos, coeficientes = {}, []
+    for cuadrante, ruta in ficheros.items():
+        resultado = joblib.load(ruta)
+        diseno = resultado.model.data.design_info
+        categorias = {}
+        for factor, info in diseno.factor_infos.items():
+            if info.type == "categorical":
+                variable = re.sub(r"^C\((\w+)\)$", r"\1", factor.name())
+                categorias[variable] = [int(c) if isinstance(c, (int, np.integer)) else c for c in info.categories]
+        metadatos[cuadrante] = {
+            "fila": len(coeficientes),
+            "columnas": list(diseno.column_names),
+            "categorias": categorias,
+            "familia": type(resultado.model.family).__name__,
+            "enlace": type(resultado.model.family.link).__name__,
+            "formula": resultado.model.formula,
+            "hash_origen": hash_fichero(ruta),
+        }
+        coeficientes.append(np.asarray(resultado.params, dtype=float))
+
+    ancho = max((len(c) for c in coeficientes), default=0)
+    matriz = np.full((len(coeficientes), ancho), np.nan)
+    for i, c in enumerate(coeficientes):
+        matriz[i, :len(c)] = c
+    np.savez(salida, coeficientes=matriz, metadatos=np.array(json.dumps(metadatos, ensure_ascii=False)))
+    return salida
+
+
+def cargar_compactos(ruta=RUTA_COMPACTA, carpeta_origen=CARPETA_MODELOS):
+    """Carga el `.npz` exportado.
+
+    Si existe `carpeta_origen`, los cuadrantes cuyo `.pkl` ha cambiado desde la
+    exportación se descartan, para que se sigan usando los modelos originales;
+    los que cambien después los detecta `ModelosFrecuenciaCompactos.vigente`.
+    """
+    with np.load(ruta) as datos:
+        matriz = datos["coeficientes"]
+        metadatos = json.loads(str(datos["metadatos"]))
+    ficheros = _ficheros_pickle(carpeta_origen) if carpeta_origen and os.path.isdir(carpeta_origen) else {}
+    modelos, origen = {}, {}
+    for cuadrante, info in metadatos.items():
+        if cuadrante in ficheros:
+            mtime = os.stat(ficheros[cuadrante]).st_mtime
+            if hash_fichero(ficheros[cuadrante]) != info["hash_origen"]:
+                continue  # exportación desactualizada para este cuadrante
+            origen[cuadrante] = [ficheros[cuadrante], mtime, info["hash_origen"]]
+        fila = matriz[info["fila"], :len(info["columnas"])]
+        modelos[cuadrante] = ModeloFrecuenciaCompacto(cuadrante, info["columnas"], fila, info["categorias"],
+                                                     info["enlace"], info["formula"])
+    return ModelosFrecuenciaCompactos(modelos, origen)
+
+
+def verificar(ruta=RUTA_COMPACTA, carpeta=CARPETA_MODELOS, meses=24):
+    """Compara tiempo de carga, memoria y predicciones del `.npz` con los `.pkl` originales."""
+    import joblib
+
+    ficheros = _ficheros_pickle(carpeta)
+    df_future = pd.DataFrame({"t": np.arange(100, 100 + meses), "Mes": np.arange(meses) % 12 + 1})
+
+    memoria = memoria_residente()
+    inicio = time.perf_counter()
+    originales = {c: joblib.load(r) for c, r in ficheros.items()}
+    t_pkl = time.perf_counter() - inicio
+    m_pkl = memoria_residente() - memoria if memoria is not None else None
+
+    memoria = memoria_residente()
+    inicio = time.perf_counter()
+    compactos = cargar_compactos(ruta, carpeta)
+    t_npz = time.perf_counter() - inicio
+    m_npz = memoria_residente() - memoria if memoria is not None else None
+
+    inicio = time.perf_counter()
+    pred_pkl = {c: np.asarray(m.predict(df_future)) for c, m in originales.items()}
+    t_pred_pkl = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    pred_npz = {c: compactos.modelo(c).predict(df_future) for c in compactos.cuadrantes()}
+    t_pred_npz = time.perf_counter() - inicio
+
+    diferencias = [np.max(np.abs(pred_npz[c] - pred_pkl[c]) / np.maximum(np.abs(pred_pkl[c]), 1e-300))
+                   for c in pred_npz]
+    return {
+        "modelos_pkl": len(originales),
+        "modelos_npz": len(compactos),
+        "tamano_pkl_mb": sum(os.path.getsize(r) for r in ficheros.values()) / 2**20,
+        "tamano_npz_mb": os.path.getsize(ruta) / 2**20,
+        "carga_pkl_s": t_pkl,
+        "carga_npz_s": t_npz,
+        "memoria_pkl_mb": None if m_pkl is None else m_pkl / 2**20,
+        "memoria_npz_mb": None if m_npz is None else m_npz / 2**20,
+        "prediccion_pkl_s": t_pred_pkl,
+        "prediccion_npz_s": t_pred_npz,
+        "max_error_relativo": max(diferencias, default=0.0),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("accion", choices=["exportar", "verificar"])
+    parser.add_argument("--salida", default=RUTA_COMPACTA)
+    args = parser.parse_args(argv)
+
+    if args.accion == "exportar":
+        ruta = exportar(salida=args.salida)
+        print(f"✅ {len(cargar_compactos(ruta))} modelos exportados a {ruta} ({os.path.getsize(ruta) / 1024:.1f} KB)")
+    else:
+        for clave, valor in verificar(args.salida).items():
+            print(f"{clave:22s} {valor:.6g}" if isinstance(valor, float) else f"{clave:22s} {valor}")
+
+
+if __name__ == "__main__":
+    main()
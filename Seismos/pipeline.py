@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.offsets import MonthEnd
+
+from Comun.instrumentacion import medir
+from Comun.modelos import registro
+from Seismos.eventos import generar_eventos, predecir_eventos, resumir_por_mes
+from Seismos.series import obtener_indice
+from Seismos.simulacion import (COLUMNAS_BANDAS, N_SIMULACIONES, bandas, eventos_representativos, muestra_mensual,
+                                propagar, simular_conteos, tamano_muestra)
+
+COLUMNAS_PREDICCION = ["Fecha", "Frecuencia estimada", "Eventos_simulados",
+                       "Magnitud_promedio_estimada", "Tsunamis_estimados"] + COLUMNAS_BANDAS
+
+
+def fechas_prediccion(n_meses, hoy=None):
+    # Fin de cada mes a predecir; la predicción empieza dos meses después del actual
+    hoy = hoy or datetime.now()
+    anio_pred = hoy.year if hoy.year >= 2025 else 2025
+    mes_pred = hoy.month + 1 if hoy.month < 12 else 1
+    anio_pred = anio_pred if hoy.month < 12 else anio_pred + 1
+    inicio_pred = pd.Timestamp(year=anio_pred, month=mes_pred, day=1) + MonthEnd(0)
+    return pd.date_range(start=inicio_pred + pd.DateOffset(months=1), periods=n_meses, freq=MonthEnd())
+
+
+def predecir_frecuencia(modelo_frecuencia, ultimo_t, fechas):
+    # Media de Poisson del GLM para cada mes futuro (t sigue la numeración de la serie histórica)
+    df_future = pd.DataFrame({
+        "t": np.arange(ultimo_t + 1, ultimo_t + 1 + len(fechas)),
+        "Mes": pd.DatetimeIndex(fechas).month,
+    })
+    return np.asarray(modelo_frecuencia.predict(df_future), dtype=float)
+
+
+def _sin_progreso(fraccion, mensaje=None):
+    pass
+
+
+def predecir_cuadrante(cuadrante, n_meses, seed=42, hoy=None, indice=None, modelos=None, progreso=None,
+                       n_simulaciones=N_SIMULACIONES):
+    """Predicción completa de un cuadrante: frecuencia, eventos, magnitud y tsunamis.
+
+    Devuelve `(pred_df, eventos)`: la tabla mensual con `COLUMNAS_PREDICCION`
+    y los eventos sintéticos con su magnitud y tsunami previstos. Los eventos
+    son los de la media redondeada de `n_simulaciones` simulaciones de Poisson;
+    las columnas de `Seismos.simulacion.COLUMNAS_BANDAS` resumen todas las
+    simulaciones (media y cuantiles de eventos, tsunamis y magnitud máxima). Lanza
+    `ValueError` si el cuadrante no tiene historial y `FileNotFoundError` si
+    falta alguno de sus modelos. `progreso(fraccion, mensaje)` recibe el avance
+    de cada etapa (ver `Comun.trabajos`).
+    """
+    progreso = progreso or _sin_progreso
+    indice = indice or obtener_indice()
+    modelos = modelos or registro
+    rng = np.random.default_rng(seed)
+
+    serie = indice.serie(cuadrante)
+    if serie is None:
+        raise ValueError(f"No hay registros de terremotos en el cuadrante {cuadrante}.")
+
+    progreso(0.1, "Frecuencia mensual")
+    with medir("seismos.frecuencia"):
+        modelo_frecuencia = modelos.modelo_frecuencia(cuadrante)
+        fechas = fechas_prediccion(n_meses, hoy)
+        pred_df = pd.DataFrame({
+            "Fecha": fechas,
+            "Frecuencia estimada": predecir_frecuencia(modelo_frecuencia, int(serie["t"].iloc[-1]), fechas),
+        })
+    progreso(0.4, "Simulando eventos")
+    with medir("seismos.simulacion"):
+        conteos = simular_conteos(pred_df["Frecuencia estimada"].to_numpy(), n_simulaciones, seed=rng)
+        pred_df["Eventos_simulados"] = eventos_representativos(conteos)
+        eventos = generar_eventos(pred_df["Fecha"], pred_df["Eventos_simulados"], cuadrante, seed=rng)
+    progreso(0.6, "Magnitud y tsunamis")
+    with medir("seismos.magnitud_tsunami"):
+        modelo_magnitud, modelo_tsunami = modelos.modelo("magnitud"), modelos.modelo("tsunami")
+        eventos = predecir_eventos(eventos, modelo_magnitud, modelo_tsunami)
+        magnitudes, prob_tsunami = muestra_mensual(pred_df["Fecha"], cuadrante, modelo_magnitud, modelo_tsunami,
+                                                   n=tamano_muestra(n_simulaciones), seed=rng)
+    progreso(0.8, f"Bandas de confianza ({n_simulaciones:,} simulaciones)")
+    with medir("seismos.bandas"):
+        tsunamis, magnitud_maxima = propagar(conteos, magnitudes, prob_tsunami, seed=rng)
+        pred_df = resumir_por_mes(pred_df, eventos)
+        pred_df = pd.concat([pred_df, bandas(conteos, tsunamis, magnitud_maxima, prob_tsunami)], axis=1)
+    return pred_df[COLUMNAS_PREDICCION], eventos
@@ -0,0 +1,161 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from Comun.datos import hash_fichero
+from Seismos.datos import RUTA_TERREMOTOS, cargar_terremotos
+
+
+def _conteos_mensuales(df):
+    # Número de eventos por (cuadrante, mes) de un trozo del catálogo
+    meses = pd.PeriodIndex(df["Fecha"], freq="M")
+    return df.groupby([df["cuadrante"].to_numpy(), meses]).size()
+
+
+class IndiceSeries:
+    """Series mensuales de frecuencia por cuadrante, precalculadas.
+
+    Para cada cuadrante guarda el primer mes con eventos y el número de
+    eventos de cada mes hasta el último (con ceros en los meses vacíos), que es
+    lo que daba `df_cuad.resample("M").size()`. Consultar un cuadrante no
+    vuelve a recorrer el catálogo, y añadir filas nuevas solo toca los
+    cuadrantes afectados. `version` es la del catálogo particionado que ya
+    incluye (0 si se construyó de otra forma).
+    """
+
+    def __init__(self, version=0):
+        self.version = version
+        self._inicio = {}
+        self._conteos = {}
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def desde_catalogo(cls, df):
+        indice = cls()
+        indice.actualizar(df)
+        return indice
+
+    @classmethod
+    def desde_conteos(cls, conteos, version=0):
+        """Índice a partir de conteos ya agregados (columnas `cuadrante`, `mes` y `eventos`).
+
+        `mes` es el ordinal del periodo mensual, como en los agregados del
+        catálogo particionado (ver `Seismos.ingesta`).
+        """
+        indice = cls(version)
+        indice.sumar(conteos["cuadrante"].to_numpy(), conteos["mes"].to_numpy(), conteos["eventos"].to_numpy())
+        return indice
+
+    def actualizar(self, df_nuevos):
+        """Suma al índice las filas nuevas del catálogo (columnas `cuadrante` y `Fecha`)."""
+        if len(df_nuevos) == 0:
+            return []
+        conteos = _conteos_mensuales(df_nuevos)
+        ordinales = conteos.index.get_level_values(1).asi8
+        return self.sumar(conteos.index.get_level_values(0).to_numpy(), ordinales, conteos.to_numpy())
+
+    def sumar(self, cuadrantes, meses, eventos):
+        """Suma `eventos` a los meses (ordinales) de cada cuadrante; devuelve los cuadrantes tocados."""
+        cuadrantes, meses, eventos = np.asarray(cuadrantes), np.asarray(meses, dtype=np.int64), np.asarray(eventos)
+        tocados = list(pd.unique(cuadrantes))
+        with self._lock:
+            for cuadrante in tocados:
+                filas = cuadrantes == cuadrante
+                ordinales, nuevos = meses[filas], eventos[filas]
+                inicio, fin = ordinales.min(), ordinales.max()
+                if cuadrante in self._conteos:
+                    inicio = min(inicio, self._inicio[cuadrante])
+                    fin = max(fin, self._inicio[cuadrante] + len(self._conteos[cuadrante]) - 1)
+
+                serie = np.zeros(fin - inicio + 1, dtype=np.int64)
+                if cuadrante in self._conteos:
+                    desplazamiento = self._inicio[cuadrante] - inicio
+                    serie[desplazamiento:desplazamiento + len(self._conteos[cuadrante])] = self._conteos[cuadrante]
+                np.add.at(serie, ordinales - inicio, nuevos)
+
+                self._inicio[cuadrante] = inicio
+                self._conteos[cuadrante] = serie
+                self._series.pop(cuadrante, None)
+        return tocados
+
+    def __contains__(self, cuadrante):
+        return cuadrante in self._conteos
+
+    def cuadrantes(self):
+        return list(self._conteos)
+
+    def serie(self, cuadrante):
+        """Serie mensual (`Fecha`, `Frecuencia`, `t`) del cuadrante, o None si no tiene eventos."""
+        # Con el lock: una ingesta en curso cambia a la vez el inicio y los conteos del cuadrante
+        with self._lock:
+            serie = self._series.get(cuadrante)
+            if serie is None and cuadrante in self._conteos:
+                conteos = self._conteos[cuadrante]
+                meses = pd.period_range(pd.Period(ordinal=self._inicio[cuadrante], freq="M"), periods=len(conteos),
+                                        freq="M")
+                serie = pd.DataFrame({
+                    "Fecha": meses.end_time.normalize(),  # fin de mes, como resample("M")
+                    "Frecuencia": conteos,
+                    "t": np.arange(len(conteos)),
+                })
+                self._series[cuadrante] = serie
+            return serie
+
+    def ultimo_t(self, cuadrante):
+        with self._lock:
+            return len(self._conteos[cuadrante]) - 1
+
+    def ultima_fecha(self, cuadrante):
+        with self._lock:
+            ordinal = self._inicio[cuadrante] + len(self._conteos[cuadrante]) - 1
+        return pd.Period(ordinal=ordinal, freq="M").end_time.normalize()
+
+
+# Índice del catálogo por defecto, reconstruido solo si cambia el fichero
+_indices = {}
+_lock_indices = threading.Lock()
+
+
+def obtener_indice(ruta=None, catalogo=None):
+    """Índice de series del catálogo.
+
+    Si existe el catálogo particionado (ver `Seismos.ingesta`) y no se pide
+    un CSV concreto, el índice se construye con sus conteos mensuales, sin
+    leer ningún evento, y después solo se le suman los lotes ingeridos desde
+    entonces. Si no, se usa `df_terremotos.csv`.
+    """
+    from Seismos.ingesta import catalogo as catalogo_por_defecto
+
+    catalogo = catalogo or catalogo_por_defecto
+    if ruta is None and catalogo.existe():
+        return _indice_particionado(catalogo)
+
+    ruta = ruta or RUTA_TERREMOTOS
+    clave = (ruta, hash_fichero(ruta))
+    with _lock_indices:
+        if clave not in _indices:
+            _indices.clear()
+            _indices[clave] = IndiceSeries.desde_catalogo(cargar_terremotos(ruta))
+        return _indices[clave]
+
+
+_indices_particionados = {}
+
+
+def _indice_particionado(catalogo):
+    with _lock_indices:
+        # Versión y conteos del mismo manifiesto, aunque mientras tanto se ingiera otro lote
+        manifiesto = catalogo.manifiesto()
+        version = manifiesto["version"]
+        indice = _indices_particionados.get(catalogo.carpeta)
+        if indice is None:
+            indice = IndiceSeries.desde_conteos(catalogo.conteos_mensuales(manifiesto), version)
+            _indices_particionados[catalogo.carpeta] = indice
+        elif indice.version < version:
+            # Solo los eventos de los lotes nuevos
+            indice.actualizar(catalogo.leer(columnas=["cuadrante", "Fecha"], desde_version=indice.version,
+                                            hasta_version=version))
+            indice.version = version
+        return indice
@@ -0,0 +1,131 @@
+"""Simulación de Poisson del número de terremotos y su propagación a magnitud y tsunamis.
+
+`simular_conteos` sortea en una sola llamada la matriz (simulaciones, meses)
+de conteos, así que el número de simulaciones puede ser de decenas de miles.
+Para no generar los eventos de todas las simulaciones, la magnitud y la
+probabilidad de tsunami se estiman sobre una muestra de eventos por mes (como
+mucho `MUESTRA_POR_MES`, y no más que simulaciones) y se propagan a cada
+simulación sin crear eventos:
+
+* tsunamis: binomial(conteo, probabilidad media de tsunami del mes);
+* magnitud máxima: el máximo de `conteo` magnitudes de la muestra, sorteado
+  con la inversa de su distribución (U ** (1 / conteo)).
+
+El coste depende de simulaciones x meses, no del número de eventos.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from Seismos.eventos import FEATURES_EVENTO, generar_eventos
+
+N_SIMULACIONES = 10
+MUESTRA_POR_MES = 64
+CUANTILES = (0.05, 0.5, 0.95)
+
+VARIABLES_BANDAS = ["Eventos", "Tsunamis", "Magnitud_maxima"]
+
+
+def nombre_cuantil(q):
+    # 0.05 -> "p05", 0.5 -> "p50"
+    return "p" + format(q * 100, "g").zfill(2)
+
+
+def columnas_bandas(cuantiles=CUANTILES):
+    columnas = []
+    for variable in VARIABLES_BANDAS:
+        columnas += [f"{variable}_media"] + [f"{variable}_{nombre_cuantil(q)}" for q in cuantiles]
+    return columnas + ["Prob_tsunami"]
+
+
+COLUMNAS_BANDAS = columnas_bandas()
+
+
+def simular_conteos(lam, n_simulaciones=N_SIMULACIONES, seed=None):
+    """Matriz (n_simulaciones, meses) de conteos de Poisson con media `lam` por mes.
+
+    Ocupa 8 bytes por celda (100.000 simulaciones de 24 meses, unos 19 MB).
+    """
+    if n_simulaciones < 1:
+        raise ValueError("n_simulaciones debe ser al menos 1")
+    rng = np.random.default_rng(seed)
+    lam = np.asarray(lam, dtype=float)
+    return rng.poisson(lam, size=(n_simulaciones, len(lam)))
+
+
+def eventos_representativos(conteos):
+    # Media redondeada de las simulaciones; al menos un evento en total
+    eventos = np.round(conteos.mean(axis=0)).astype(int)
+    if len(eventos) and eventos.sum() == 0:
+        eventos[0] = 1
+    return eventos
+
+
+def probabilidad_tsunami(modelo_tsunami, X):
+    # Probabilidad de la clase positiva si el modelo la da; si no, su predicción 0/1
+    if not hasattr(modelo_tsunami, "predict_proba"):
+        return np.asarray(modelo_tsunami.predict(X), dtype=float)
+    clases = list(modelo_tsunami.classes_)
+    if len(clases) == 1:
+        return np.full(len(X), float(clases[0]))
+    return modelo_tsunami.predict_proba(X)[:, clases.index(True)]
+
+
+def tamano_muestra(n_simulaciones):
+    # Con pocas simulaciones una muestra mayor no cambia las bandas y solo añade predicciones
+    return max(1, min(MUESTRA_POR_MES, n_simulaciones))
+
+
+def muestra_mensual(fechas, cuadrante, modelo_magnitud, modelo_tsunami, n=MUESTRA_POR_MES, seed=None):
+    """Magnitudes (ordenadas) y probabilidades de tsunami de `n` eventos sintéticos por mes.
+
+    Devuelve dos matrices (meses, n).
+    """
+    n_meses = len(fechas)
+    eventos = generar_eventos(fechas, np.full(n_meses, n), cuadrante, seed=seed)
+    X = eventos[FEATURES_EVENTO].fillna(0)
+    magnitudes = np.asarray(modelo_magnitud.predict(X), dtype=float).reshape(n_meses, n)
+    return np.sort(magnitudes, axis=1), probabilidad_tsunami(modelo_tsunami, X).reshape(n_meses, n)
+
+
+def propagar(conteos, magnitudes, prob_tsunami, seed=None):
+    """Tsunamis y magnitud máxima de cada simulación, matrices con la forma de `conteos`.
+
+    `magnitudes` y `prob_tsunami` son las de `muestra_mensual`. La magnitud
+    máxima es NaN en las simulaciones sin eventos.
+    """
+    rng = np.random.default_rng(seed)
+    tsunamis = rng.binomial(conteos, prob_tsunami.mean(axis=1))
+
+    # Índice del máximo de `conteo` elementos uniformes entre los k de la muestra: ceil(k * U ** (1 / conteo))
+    k = magnitudes.shape[1]
+    with np.errstate(divide="ignore"):
+        posicion = np.ceil(k * rng.random(conteos.shape) ** (1.0 / conteos)).astype(np.int64) - 1
+    magnitud_maxima = magnitudes[np.arange(magnitudes.shape[0]), np.clip(posicion, 0, k - 1)]
+    magnitud_maxima[conteos == 0] = np.nan
+    return tsunamis, magnitud_maxima
+
+
+def bandas(conteos, tsunamis, magnitud_maxima, prob_tsunami, cuantiles=CUANTILES):
+    """Media y cuantiles por mes de eventos, tsunamis y magnitud máxima (columnas `columnas_bandas`).
+
+    `Prob_tsunami` es la probabilidad de al menos un tsunami en el mes,
+    1 - E[(1 - p) ** conteo], calculada sobre las simulaciones.
+    """
+    columnas = {}
+    with warnings.catch_warnings():
+        # Meses en los que ninguna simulación tiene eventos: magnitud máxima NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for variable, matriz in zip(VARIABLES_BANDAS, (conteos, tsunamis, magnitud_maxima)):
+            columnas[f"{variable}_media"] = np.nanmean(matriz, axis=0)
+            if variable == "Magnitud_maxima":
+                valores_cuantiles = np.nanquantile(matriz, cuantiles, axis=0)
+            else:
+                # Conteos: cuantiles que son valores simulados (enteros)
+                valores_cuantiles = np.quantile(matriz, cuantiles, axis=0, method="inverted_cdf")
+            for q, valores in zip(cuantiles, valores_cuantiles):
+                columnas[f"{variable}_{nombre_cuantil(q)}"] = valores
+    p = prob_tsunami.mean(axis=1)
+    columnas["Prob_tsunami"] = 1 - np.mean((1 - p) ** conteos, axis=0)
+    return pd.DataFrame(columnas, columns=columnas_bandas(cuantiles))
@@ -0,0 +1,92 @@
+"""Compara la simulación de clima vectorizada con el antiguo `apply` fila a fila.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_clima [--repeticiones 3]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from Incendios.clima import COLUMNAS_CLIMA, asignar_zona, simular_clima
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROVINCIAS_EXCLUIR = ['Santa Cruz de Tenerife', 'Las Palmas', 'Illes Balears', 'Ceuta', 'Melilla']
+
+
+def cargar_peninsula():
+    df_mun = pd.read_csv(os.path.join(RAIZ, "Incendios", "MUNICIPIOS.csv"),
+                         encoding='ISO-8859-1', sep=';', on_bad_lines='warn', decimal=',')
+    df = df_mun[~df_mun['PROVINCIA'].isin(PROVINCIAS_EXCLUIR)].copy()
+    df = df.rename(columns={"LATITUD_ETRS89": "lat", "LONGITUD_ETRS89": "lng"})
+    df["zona"] = asignar_zona(df["lat"])
+    return df
+
+
+# Implementación anterior (una llamada por fila), conservada como referencia
+def simular_clima_completo(row, m):
+    zona = row["zona"]
+    if zona == "norte":
+        clima = {
+            1:  {"temp": (6, 2),  "prcp": (3.0,), "wspd": (8, 2), "pres": (1015, 3), "hum": (85, 5)},
+            6:  {"temp": (18, 3), "prcp": (2.0,), "wspd": (10, 2), "pres": (1012, 3), "hum": (70, 10)},
+            7:  {"temp": (21, 3), "prcp": (1.5,), "wspd": (9, 2),  "pres": (1010, 3), "hum": (65, 10)},
+            12: {"temp": (7, 2),  "prcp": (3.5,), "wspd": (7, 2),  "pres": (1016, 3), "hum": (80, 5)},
+        }.get(m, {"temp": (15, 3), "prcp": (2.5,), "wspd": (8, 2), "pres": (1013, 3), "hum": (75, 10)})
+    else:  # sur
+        clima = {
+            1:  {"temp": (10, 3), "prcp": (2.0,), "wspd": (10, 2), "pres": (1014, 3), "hum": (75, 10)},
+            6:  {"temp": (24, 3), "prcp": (1.0,), "wspd": (12, 3), "pres": (1010, 3), "hum": (55, 10)},
+            7:  {"temp": (28, 3), "prcp": (0.8,), "wspd": (14, 3), "pres": (1008, 3), "hum": (45, 10)},
+            12: {"temp": (12, 3), "prcp": (2.5,), "wspd": (9, 2),  "pres": (1015, 3), "hum": (70, 10)},
+        }.get(m, {"temp": (20, 3), "prcp": (1.5,), "wspd": (11, 3), "pres": (1012, 3), "hum": (60, 10)})
+
+    temp = np.random.normal(*clima["temp"])
+    return pd.Series({
+        "temp": temp,
+        "tmin": temp - np.random.uniform(3, 6),
+        "tmax": temp + np.random.uniform(3, 6),
+        "prcp": np.random.exponential(*clima["prcp"]),
+        "wspd": np.random.normal(*clima["wspd"]),
+        "pres": np.random.normal(*clima["pres"]),
+        "hum": np.clip(np.random.normal(*clima["hum"]), 20, 100)
+    })
+
+
+def cronometrar(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--mes", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    df = cargar_peninsula()
+    n = len(df)
+
+    np.random.seed(42)
+    t_apply, antiguo = cronometrar(lambda: df.apply(simular_clima_completo, axis=1, m=args.mes), args.repeticiones)
+    t_vec, nuevo = cronometrar(lambda: simular_clima(df["zona"], args.mes, seed=42), args.repeticiones)
+
+    print(f"Municipios: {n}  |  mes: {args.mes}  |  mejor de {args.repeticiones}")
+    print(f"  apply fila a fila : {t_apply * 1000:9.1f} ms  ({n / t_apply:12,.0f} filas/s)")
+    print(f"  vectorizado       : {t_vec * 1000:9.1f} ms  ({n / t_vec:12,.0f} filas/s)")
+    print(f"  aceleración       : {t_apply / t_vec:9.1f}x")
+
+    # Comprobación rápida de que ambas versiones generan distribuciones equivalentes
+    print("\nMedias por columna (apply / vectorizado):")
+    for col in COLUMNAS_CLIMA:
+        print(f"  {col:5s} {antiguo[col].mean():9.2f} {nuevo[col].mean():9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Mide la carga de MUNICIPIOS.csv y df_terremotos.csv: CSV original frente a instantánea.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_datos [--repeticiones 5]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Comun.datos import cargar_instantanea
+from Incendios.datos import PROVINCIAS_EXCLUIR, RUTA_MUNICIPIOS, preparar_municipios
+from Seismos.datos import RUTA_TERREMOTOS, preparar_terremotos
+
+
+# Carga tal y como se hacía en cada rerun antes de las instantáneas
+def municipios_csv():
+    df_mun = pd.read_csv(RUTA_MUNICIPIOS, encoding='ISO-8859-1', sep=';', on_bad_lines='warn', decimal=',')
+    df_peninsula = df_mun[~df_mun['PROVINCIA'].isin(PROVINCIAS_EXCLUIR)].copy()
+    return df_peninsula.rename(columns={"LATITUD_ETRS89": "lat", "LONGITUD_ETRS89": "lng"})
+
+
+def terremotos_csv():
+    df = pd.read_csv(RUTA_TERREMOTOS)
+    df["Fecha"] = pd.to_datetime(df["Fecha"])
+    df["lat_grid"] = df["Latitud"].apply(lambda x: int(np.floor(x)))
+    df["lon_grid"] = df["Longitud"].apply(lambda x: int(np.floor(x)))
+    df["cuadrante"] = df["lat_grid"].astype(str) + "," + df["lon_grid"].astype(str)
+    return df
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    casos = [
+        ("municipios", RUTA_MUNICIPIOS, municipios_csv, preparar_municipios),
+        ("terremotos", RUTA_TERREMOTOS, terremotos_csv, preparar_terremotos),
+    ]
+    carpeta = tempfile.mkdtemp(prefix="bench_datos_")
+    try:
+        print(f"{'datos':12s} {'CSV (antes)':>12s} {'arranque frío':>14s} {'instantánea':>12s} {'mejora':>8s}")
+        for nombre, ruta, antes, preparar in casos:
+            t_csv = mejor_tiempo(antes, args.repeticiones)
+            # Arranque en frío: sin instantánea, se lee el CSV y se escribe la caché
+            inicio = time.perf_counter()
+            cargar_instantanea(nombre, ruta, preparar, carpeta=carpeta)
+            t_frio = time.perf_counter() - inicio
+            t_cache = mejor_tiempo(lambda: cargar_instantanea(nombre, ruta, preparar, carpeta=carpeta), args.repeticiones)
+            print(f"{nombre:12s} {t_csv * 1000:9.1f} ms {t_frio * 1000:11.1f} ms {t_cache * 1000:9.1f} ms {t_csv / t_cache:7.1f}x")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compara la generación de eventos sintéticos vectorizada con el bucle anterior.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_eventos [--meses 24] [--eventos 50] [--repeticiones 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from Seismos.eventos import generar_eventos
+
+
+# Implementación anterior (iterrows + un sorteo por evento), conservada como referencia
+def generar_eventos_bucle(pred_df, zona_actual):
+    np.random.seed(42)
+    entradas_mag = []
+    for idx, row in pred_df.iterrows():
+        for _ in range(int(row["Eventos_simulados"])):
+            entradas_mag.append({
+                "Latitud": float(zona_actual.split(",")[0]) + np.random.uniform(0, 1),
+                "Longitud": float(zona_actual.split(",")[1]) + np.random.uniform(0, 1),
+                "Profundidad_km": np.random.uniform(1, 40),
+                "Anio": row["Fecha"].year,
+                "Mes": row["Fecha"].month,
+                "Dia": row["Fecha"].day,
+                "Hora": np.random.randint(0, 24),
+                "Alerta": 1,
+                "Fecha": row["Fecha"]
+            })
+    return pd.DataFrame(entradas_mag)
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meses", type=int, default=24)
+    parser.add_argument("--eventos", type=int, default=50, help="eventos simulados por mes")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pred_df = pd.DataFrame({
+        "Fecha": pd.date_range("2026-01-31", periods=args.meses, freq=pd.offsets.MonthEnd()),
+        "Eventos_simulados": np.full(args.meses, args.eventos),
+    })
+    total = args.meses * args.eventos
+
+    t_bucle = mejor_tiempo(lambda: generar_eventos_bucle(pred_df, "36,-5"), args.repeticiones)
+    t_vec = mejor_tiempo(lambda: generar_eventos(pred_df["Fecha"], pred_df["Eventos_simulados"], "36,-5", seed=42),
+                         args.repeticiones)
+
+    print(f"Eventos: {total} ({args.meses} meses x {args.eventos})  |  mejor de {args.repeticiones}")
+    print(f"  bucle iterrows : {t_bucle * 1000:9.2f} ms  ({total / t_bucle:12,.0f} eventos/s)")
+    print(f"  vectorizado    : {t_vec * 1000:9.2f} ms  ({total / t_vec:12,.0f} eventos/s)")
+    print(f"  aceleración    : {t_bucle / t_vec:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Rendimiento (filas/s) de los backends de inferencia de los Random Forest de incendios.
+
+Evalúa ambos modelos sobre la matriz completa municipios x escenarios climáticos,
+igual que el modo ensemble, y comprueba que el backend rápido da exactamente el
+mismo resultado que sklearn.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_inferencia [--mes 7] [--escenarios 10] [--hilos 4] [--repeticiones 3]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from Comun.modelos import registro
+from Incendios.clima import codificar_zonas, simular_clima_array
+from Incendios.datos import cargar_municipios
+from Incendios.features import construir_matriz, entrada_extension, entrada_ocurrencia
+from Incendios.inferencia_rapida import BosqueCompilado, numba
+from Incendios.pipeline import preparar_municipios
+
+
+def matriz_escenarios(mes, n_escenarios, seed=42):
+    df = preparar_municipios(cargar_municipios(), mes)
+    rng = np.random.default_rng(seed)
+    X = construir_matriz(np.repeat(df["lat"].to_numpy(), n_escenarios),
+                         np.repeat(df["lng"].to_numpy(), n_escenarios),
+                         simular_clima_array(np.repeat(codificar_zonas(df["zona"]), n_escenarios), mes, rng), mes)
+    return len(df), X
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mes", type=int, default=7)
+    parser.add_argument("--escenarios", type=int, default=10, help="escenarios climáticos por municipio")
+    parser.add_argument("--hilos", type=int, default=None, help="hilos del backend rápido (por defecto, todos)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if numba is None:
+        raise SystemExit("El backend rápido necesita numba (pip install numba)")
+
+    n_mun, X = matriz_escenarios(args.mes, args.escenarios)
+    X_ocurrencia = entrada_ocurrencia(X)
+    X_extension = entrada_extension(X)
+    print(f"Matriz: {len(X):,} filas ({n_mun} municipios x {args.escenarios} escenarios)  |  "
+          f"mejor de {args.repeticiones}  |  hilos: {args.hilos or 'todos'}")
+
+    casos = [
+        ("ocurrencia", "predict_proba", X_ocurrencia),
+        ("extension", "predict", X_extension),
+    ]
+    for nombre, metodo, entrada in casos:
+        modelo = registro.modelo(nombre)
+        inicio = time.perf_counter()
+        compilado = BosqueCompilado(modelo, n_hilos=args.hilos)
+        t_compilar = time.perf_counter() - inicio
+        getattr(compilado, metodo)(entrada.iloc[:10])  # compilación JIT fuera de la medida
+
+        t_sk, r_sk = mejor_tiempo(lambda: getattr(modelo, metodo)(entrada), args.repeticiones)
+        t_rap, r_rap = mejor_tiempo(lambda: getattr(compilado, metodo)(entrada), args.repeticiones)
+
+        print(f"{nombre} ({metodo}, {compilado.n_arboles} árboles, {len(compilado.nodos):,} nodos, "
+              f"aplanado en {t_compilar * 1000:.0f} ms)")
+        print(f"  sklearn : {t_sk * 1000:9.2f} ms  ({len(X) / t_sk:12,.0f} filas/s)")
+        print(f"  rapido  : {t_rap * 1000:9.2f} ms  ({len(X) / t_rap:12,.0f} filas/s)")
+        print(f"  aceleración {t_sk / t_rap:.2f}x  |  idéntico a sklearn: {np.array_equal(r_sk, r_rap)}")
+
+
+if __name__ == "__main__":
+    main()
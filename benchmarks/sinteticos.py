@@ -0,0 +1,86 @@
+"""Datos sintéticos a escala para los benchmarks.
+
+Multiplican `MUNICIPIOS.csv` y `df_terremotos.csv` conservando su formato
+(separadores, codificación y columnas), de modo que se leen con las mismas
+funciones que los originales. Las copias desplazan un poco las coordenadas
+(sin salir de la celda de 1x1 grados en el caso de los terremotos, para que
+cada cuadrante siga teniendo modelo) y las fechas.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.sinteticos municipios --factor 10 --salida /tmp/MUNICIPIOS_x10.csv
+    python -m benchmarks.sinteticos terremotos --factor 100 --salida /tmp/df_terremotos_x100.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from Incendios.clima import asignar_zona, codificar_zonas, simular_clima_array
+from Incendios.datos import RUTA_MUNICIPIOS
+from Incendios.features import construir_matriz
+from Seismos.datos import RUTA_TERREMOTOS
+
+_LECTURA_MUNICIPIOS = dict(encoding='ISO-8859-1', sep=';', decimal=',', dtype=str)
+
+
+def municipios_sinteticos(factor, salida, seed=0, ruta=RUTA_MUNICIPIOS):
+    """Escribe en `salida` `factor` copias de MUNICIPIOS.csv con coordenadas desplazadas."""
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(ruta, **_LECTURA_MUNICIPIOS)
+    copias = pd.concat([df] * factor, ignore_index=True)
+    copia = np.repeat(np.arange(factor), len(df))
+    for columna in ("LATITUD_ETRS89", "LONGITUD_ETRS89"):
+        valores = copias[columna].str.replace(",", ".").astype(float)
+        valores += np.where(copia > 0, rng.uniform(-0.05, 0.05, len(copias)), 0.0)
+        copias[columna] = valores.map("{:.8f}".format).str.replace(".", ",")
+    copias["COD_INE"] = copias["COD_INE"] + np.char.mod("%03d", copia).astype(object)
+    copias.to_csv(salida, sep=';', index=False, encoding='ISO-8859-1')
+    return salida
+
+
+def terremotos_sinteticos(factor, salida, seed=0, ruta=RUTA_TERREMOTOS):
+    """Escribe en `salida` `factor` copias del catálogo con posiciones, fechas y magnitudes alteradas."""
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(ruta, dtype={"cuadrante": str})
+    copias = pd.concat([df] * factor, ignore_index=True)
+    original = np.repeat(np.arange(factor), len(df)) == 0
+    n = len(copias)
+
+    for columna, rejilla in (("Latitud", "lat_grid"), ("Longitud", "lon_grid")):
+        base = copias[rejilla].to_numpy()
+        dentro = np.clip(copias[columna].to_numpy() - base + rng.normal(0, 0.05, n), 0, 0.999)
+        copias[columna] = np.where(original, copias[columna], base + dentro)
+    copias["Magnitud"] = np.where(original, copias["Magnitud"],
+                                  np.round(copias["Magnitud"] + rng.normal(0, 0.2, n), 1))
+    fechas = pd.to_datetime(copias["Fecha"]) + pd.to_timedelta(np.where(original, 0, rng.integers(-15, 16, n)),
+                                                                unit="D")
+    copias["Fecha"] = fechas.dt.strftime("%Y-%m-%d")
+    copias["Anio"], copias["Mes"], copias["Dia"] = fechas.dt.year, fechas.dt.month, fechas.dt.day
+    copias.to_csv(salida, index=False)
+    return salida
+
+
+def matriz_incendios(n_filas, municipios, mes=7, seed=0):
+    """Matriz de entrada de los modelos de incendios con `n_filas` escenarios sobre `municipios`."""
+    rng = np.random.default_rng(seed)
+    filas = rng.integers(0, len(municipios), n_filas)
+    lat = municipios["lat"].to_numpy()[filas]
+    lng = municipios["lng"].to_numpy()[filas]
+    return construir_matriz(lat, lng, simular_clima_array(codificar_zonas(asignar_zona(lat)), mes, rng), mes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("datos", choices=["municipios", "terremotos"])
+    parser.add_argument("--factor", type=int, default=10)
+    parser.add_argument("--salida", required=True)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    generador = municipios_sinteticos if args.datos == "municipios" else terremotos_sinteticos
+    generador(args.factor, args.salida, seed=args.semilla)
+    print(f"✅ {args.datos} x{args.factor} -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Suite de benchmarks de ambos predictores con datos sintéticos a escala.
+
+Cada caso se mide con varios tamaños: mejor tiempo de `--repeticiones`
+ejecuciones, rendimiento (elementos/s) y pico de memoria reservada durante una
+ejecución adicional (tracemalloc, que incluye los arrays de NumPy). Todo se
+ejecuta sin conexión con los datos y modelos locales.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.suite                              # todos los casos
+    python -m benchmarks.suite --casos inferencia --rapido  # solo el tamaño menor
+    python -m benchmarks.suite --salida base.json
+    python -m benchmarks.suite --comparar base.json         # código de salida 1 si hay regresiones
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import sinteticos
+
+CASOS = {}
+
+
+def caso(nombre, tamanos, unidad="filas"):
+    """Registra un caso. La función recibe `(tamano, contexto)` y devuelve `(funcion, n_elementos)`."""
+    def decorador(preparar):
+        CASOS[nombre] = {"preparar": preparar, "tamanos": tamanos, "unidad": unidad}
+        return preparar
+    return decorador
+
+
+class Contexto:
+    # Ficheros sintéticos y modelos compartidos por los casos de una ejecución de la suite
+    def __init__(self, carpeta, backend=None):
+        self.carpeta = carpeta
+        self.backend = backend
+        self._cache = {}
+
+    def fichero(self, datos, factor):
+        clave = (datos, factor)
+        if clave not in self._cache:
+            ruta = os.path.join(self.carpeta, f"{datos}_x{factor}.csv")
+            generador = sinteticos.municipios_sinteticos if datos == "municipios" else sinteticos.terremotos_sinteticos
+            self._cache[clave] = generador(factor, ruta)
+        return self._cache[clave]
+
+    def municipios(self):
+        from Incendios.datos import cargar_municipios
+        return cargar_municipios()
+
+    def terremotos(self, factor):
+        from Seismos.datos import preparar_terremotos
+        clave = ("catalogo", factor)
+        if clave not in self._cache:
+            self._cache[clave] = preparar_terremotos(self.fichero("terremotos", factor))
+        return self._cache[clave]
+
+
+@caso("carga_municipios", [1, 10, 100])
+def _carga_municipios(factor, ctx):
+    from Incendios.datos import preparar_municipios
+    ruta = ctx.fichero("municipios", factor)
+    return (lambda: preparar_municipios(ruta)), len(preparar_municipios(ruta))
+
+
+@caso("carga_terremotos", [1, 10, 100])
+def _carga_terremotos(factor, ctx):
+    from Seismos.datos import preparar_terremotos
+    ruta = ctx.fichero("terremotos", factor)
+    return (lambda: preparar_terremotos(ruta)), len(ctx.terremotos(factor))
+
+
+@caso("clima", [8_000, 80_000, 800_000])
+def _clima(n, ctx):
+    from Incendios.clima import simular_clima_array
+    codigos = np.random.default_rng(0).integers(0, 2, n)
+    return (lambda: simular_clima_array(codigos, 7, np.random.default_rng(42))), n
+
+
+@caso("inferencia_incendios", [8_000, 80_000, 800_000])
+def _inferencia_incendios(n, ctx):
+    from Comun.modelos import registro
+    from Incendios.ensemble import calibrar_probabilidad
+    from Incendios.features import cargar_modelos, entrada_extension, entrada_ocurrencia
+    from Incendios.inferencia_rapida import preparar_modelo
+
+    modelo, modelo_extension = (preparar_modelo(m, ctx.backend) for m in cargar_modelos(registro))
+    X = sinteticos.matriz_incendios(n, ctx.municipios())
+
+    def inferir():
+        calibrar_probabilidad(modelo.predict_proba(entrada_ocurrencia(X))[:, 1])
+        modelo_extension.predict(entrada_extension(X))
+    return inferir, n
+
+
+@caso("temporada_incendios", [1, 3, 12], unidad="meses")
+def _temporada_incendios(n_meses, ctx):
+    from Incendios.temporada import predecir_temporada
+    municipios = ctx.municipios()
+    return (lambda: predecir_temporada(range(1, n_meses + 1), municipios=municipios, backend=ctx.backend)), n_meses
+
+
+def _caso_exportacion(formato):
+    def preparar(n, ctx):
+        from Comun.exportacion import exportar
+        from Incendios.features import entrada_ocurrencia
+        df = entrada_ocurrencia(sinteticos.matriz_incendios(n, ctx.municipios()))
+        return (lambda: exportar(df, formato)), n
+    return preparar
+
+
+caso("exportacion_csv", [8_000, 80_000])(_caso_exportacion("csv"))
+caso("exportacion_parquet", [8_000, 80_000, 800_000])(_caso_exportacion("parquet"))
+
+
+@caso("resample_cuadrantes", [1, 10, 100])
+def _resample_cuadrantes(factor, ctx):
+    from Seismos.series import IndiceSeries
+    catalogo = ctx.terremotos(factor)
+
+    def indexar():
+        indice = IndiceSeries.desde_catalogo(catalogo)
+        for cuadrante in indice.cuadrantes():
+            indice.serie(cuadrante)
+    return indexar, len(catalogo)
+
+
+@caso("ingesta_catalogo", [1, 10, 100])
+def _ingesta_catalogo(factor, ctx):
+    from Seismos.ingesta import CatalogoParticionado
+    ruta = ctx.fichero("terremotos", factor)
+    carpeta = os.path.join(ctx.carpeta, f"catalogo_x{factor}")
+
+    def ingerir():
+        shutil.rmtree(carpeta, ignore_errors=True)
+        CatalogoParticionado(carpeta).ingerir(ruta)
+    return ingerir, len(ctx.terremotos(factor))
+
+
+@caso("eventos", [1_000, 10_000, 100_000], unidad="eventos")
+def _eventos(n, ctx):
+    from Seismos.eventos import generar_eventos
+    fechas = pd.date_range("2026-01-31", periods=24, freq=pd.offsets.MonthEnd())
+    conteos = np.full(24, n // 24)
+    conteos[: n % 24] += 1
+    return (lambda: generar_eventos(fechas, conteos, "36,-5", seed=42)), n
+
+
+@caso("magnitud_tsunami", [1_000, 10_000, 100_000], unidad="eventos")
+def _magnitud_tsunami(n, ctx):
+    from Comun.modelos import registro
+    from Seismos.eventos import generar_eventos, predecir_eventos
+    fechas = pd.date_range("2026-01-31", periods=24, freq=pd.offsets.MonthEnd())
+    conteos = np.full(24, n // 24)
+    conteos[: n % 24] += 1
+    eventos = generar_eventos(fechas, conteos, "36,-5", seed=42)
+    magnitud, tsunami = registro.modelo("magnitud"), registro.modelo("tsunami")
+    return (lambda: predecir_eventos(eventos, magnitud, tsunami)), n
+
+
+@caso("simulacion_poisson", [1_000, 10_000, 100_000], unidad="simulaciones")
+def _simulacion_poisson(n, ctx):
+    from Seismos.simulacion import bandas, propagar, simular_conteos
+    rng = np.random.default_rng(42)
+    lam = rng.uniform(0.1, 20, 24)
+    magnitudes, prob_tsunami = np.sort(rng.normal(5, 0.5, (24, 64)), axis=1), rng.uniform(0, 0.2, (24, 64))
+
+    def simular():
+        conteos = simular_conteos(lam, n, seed=42)
+        bandas(conteos, *propagar(conteos, magnitudes, prob_tsunami, seed=42), prob_tsunami)
+    return simular, n
+
+
+def medir(funcion, repeticiones):
+    funcion()  # calentamiento: cachés, compilación JIT, carga perezosa de módulos
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(tiempos), pico
+
+
+def ejecutar(nombres=None, rapido=False, repeticiones=3, backend=None, salida_progreso=sys.stdout):
+    """Ejecuta los casos indicados (todos por defecto) y devuelve una fila por caso y tamaño."""
+    carpeta = tempfile.mkdtemp(prefix="bench_suite_")
+    ctx = Contexto(carpeta, backend)
+    resultados = []
+    try:
+        for nombre, definicion in CASOS.items():
+            if nombres and not any(n in nombre for n in nombres):
+                continue
+            for tamano in definicion["tamanos"][:1] if rapido else definicion["tamanos"]:
+                fila = {"caso": nombre, "tamano": tamano, "unidad": definicion["unidad"]}
+                try:
+                    funcion, n_elementos = definicion["preparar"](tamano, ctx)
+                    segundos, pico = medir(funcion, repeticiones)
+                except FileNotFoundError as e:  # p. ej. el modelo de extensión sin entrenar
+                    fila["error"] = f"falta {e.filename}"
+                else:
+                    fila.update(elementos=n_elementos, segundos=segundos,
+                                por_segundo=n_elementos / segundos if segundos else float("inf"),
+                                pico_mb=pico / 2**20)
+                resultados.append(fila)
+                if salida_progreso is not None:
+                    print(formatear(fila), file=salida_progreso, flush=True)
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+    return resultados
+
+
+def formatear(fila):
+    cabecera = f"{fila['caso']:22s} {fila['tamano']:>9,}"
+    if "error" in fila:
+        return f"{cabecera}  ⚠️ {fila['error']}"
+    return (f"{cabecera}  {fila['segundos'] * 1000:10.1f} ms  {fila['por_segundo']:14,.0f} {fila['unidad']}/s"
+            f"  pico {fila['pico_mb']:8.1f} MB")
+
+
+def comparar(resultados, base, tolerancia):
+    """Compara con una ejecución anterior; devuelve las filas más lentas que `tolerancia` veces la base."""
+    anteriores = {(f["caso"], f["tamano"]): f for f in base["resultados"] if "error" not in f}
+    regresiones = []
+    for fila in resultados:
+        anterior = anteriores.get((fila["caso"], fila["tamano"]))
+        if anterior is None or "error" in fila:
+            continue
+        razon = fila["segundos"] / anterior["segundos"]
+        memoria = fila["pico_mb"] / anterior["pico_mb"] if anterior["pico_mb"] else 1.0
+        marca = "❌" if razon > tolerancia else ("✅" if razon < 1 / tolerancia else "  ")
+        print(f"{marca} {fila['caso']:22s} {fila['tamano']:>9,}  tiempo x{razon:5.2f}  memoria x{memoria:5.2f}")
+        if razon > tolerancia:
+            regresiones.append(fila)
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", nargs="*", help=f"subcadenas de los casos a ejecutar: {', '.join(CASOS)}")
+    parser.add_argument("--rapido", action="store_true", help="solo el tamaño menor de cada caso")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--backend", default=None, help="backend de inferencia de incendios (sklearn o rapido)")
+    parser.add_argument("--salida", default=None, help="guarda los resultados en JSON")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior")
+    parser.add_argument("--tolerancia", type=float, default=1.25,
+                        help="razón de tiempos a partir de la que se considera regresión")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.casos, args.rapido, args.repeticiones, args.backend)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "maquina": platform.machine(),
+                "nucleos": os.cpu_count(),
+                "versiones": {"numpy": np.__version__, "pandas": pd.__version__},
+                "resultados": resultados,
+            }, f, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regresiones = comparar(resultados, json.load(f), args.tolerancia)
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
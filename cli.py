@@ -0,0 +1,116 @@
+"""Predicciones de incendios y terremotos desde la línea de comandos (sin Streamlit).
+
+Ejemplos (desde la raíz del proyecto):
+    python cli.py incendios --mes 7 --min-prob 0.5 --salida incendios_julio.csv
+    python cli.py incendios --mes 8 --ensemble 500 --salida incendios_agosto.parquet
+    python cli.py temporada --salida temporada_provincias.csv --cubo temporada.npz
+    python cli.py seismos --cuadrante 36,-5 --meses 12 --salida estrecho.csv
+    python cli.py seismos --todos --meses 24 --salida rejilla.parquet
+"""
+import argparse
+import sys
+import time
+
+from Comun import instrumentacion
+from Comun.exportacion import guardar_tabla
+from Incendios.inferencia_rapida import BACKENDS
+from Seismos.simulacion import N_SIMULACIONES
+
+
+def ejecutar_incendios(args):
+    from Incendios.pipeline import columnas_exportacion, filtrar_resultados, predecir_incendios
+
+    df = predecir_incendios(args.mes, seed=args.semilla, anio=args.anio, n_escenarios=args.ensemble,
+                            memoria_max_mb=args.memoria_max_mb, n_procesos=args.procesos,
+                            backend=args.backend)
+    df = filtrar_resultados(df, args.min_prob, args.max_prob, args.solo_catastrofes)
+    return df[columnas_exportacion(df)].sort_values("probabilidad", ascending=False)
+
+
+def ejecutar_temporada(args):
+    from Incendios.temporada import predecir_temporada
+
+    temporada = predecir_temporada(args.meses, seed=args.semilla, anio=args.anio,
+                                   memoria_max_mb=args.memoria_max_mb, backend=args.backend)
+    if args.cubo:
+        temporada.guardar(args.cubo)
+    return temporada.por_provincia()
+
+
+def ejecutar_seismos(args):
+    from Seismos.lote import predecir_rejilla
+
+    if args.todos:
+        cuadrantes = None
+    elif args.cuadrante:
+        cuadrantes = args.cuadrante
+    else:
+        raise SystemExit("Indica --cuadrante LAT,LON (se puede repetir) o --todos")
+    resultados, omitidos = predecir_rejilla(args.meses, cuadrantes=cuadrantes, seed=args.semilla,
+                                            n_procesos=args.procesos, n_simulaciones=args.simulaciones)
+    for cuadrante, motivo in omitidos.items():
+        print(f"⚠️ {cuadrante}: {motivo}", file=sys.stderr)
+    return resultados
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    p_inc = subparsers.add_parser("incendios", help="riesgo de incendio por municipio para un mes")
+    p_inc.add_argument("--mes", type=int, required=True, choices=range(1, 13), metavar="1-12")
+    p_inc.add_argument("--anio", type=int, default=None)
+    p_inc.add_argument("--min-prob", type=float, default=0.0)
+    p_inc.add_argument("--max-prob", type=float, default=1.0)
+    p_inc.add_argument("--solo-catastrofes", action="store_true")
+    p_inc.add_argument("--ensemble", type=int, default=None, metavar="N",
+                       help="número de escenarios climáticos por municipio (modo Monte Carlo)")
+    p_inc.add_argument("--memoria-max-mb", type=int, default=256)
+    p_inc.add_argument("--procesos", type=int, default=1, help="procesos para el modo ensemble")
+    p_inc.add_argument("--backend", choices=BACKENDS, default=None,
+                       help="motor de inferencia de los Random Forest (por defecto, INCENDIOS_BACKEND_INFERENCIA o sklearn)")
+    p_inc.set_defaults(ejecutar=ejecutar_incendios)
+
+    p_tem = subparsers.add_parser("temporada", help="riesgo de incendio por provincia y mes (temporada completa)")
+    p_tem.add_argument("--meses", type=int, nargs="+", default=list(range(1, 13)), metavar="1-12")
+    p_tem.add_argument("--anio", type=int, default=None)
+    p_tem.add_argument("--memoria-max-mb", type=int, default=256)
+    p_tem.add_argument("--backend", choices=BACKENDS, default=None)
+    p_tem.add_argument("--cubo", default=None, help="guarda además el cubo mes x municipio (.npz)")
+    p_tem.set_defaults(ejecutar=ejecutar_temporada)
+
+    p_sis = subparsers.add_parser("seismos", help="frecuencia, magnitud y tsunamis por cuadrante")
+    p_sis.add_argument("--cuadrante", action="append", metavar="LAT,LON")
+    p_sis.add_argument("--todos", action="store_true", help="todos los cuadrantes con modelo")
+    p_sis.add_argument("--meses", type=int, default=6)
+    p_sis.add_argument("--procesos", type=int, default=1)
+    p_sis.add_argument("--simulaciones", type=int, default=N_SIMULACIONES,
+                       help="simulaciones de Poisson por cuadrante (medias y bandas 5-95 %%)")
+    p_sis.set_defaults(ejecutar=ejecutar_seismos)
+
+    for p in (p_inc, p_tem, p_sis):
+        p.add_argument("--semilla", type=int, default=42)
+        p.add_argument("--salida", required=True, help="fichero .csv o .parquet")
+        p.add_argument("--metricas", default=None,
+                       help="guarda los tiempos por etapa en un fichero .json o .prom (Prometheus)")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.metricas:
+        instrumentacion.activar()
+    inicio = time.perf_counter()
+    resultado = args.ejecutar(args)
+    with instrumentacion.medir("cli.guardar"):
+        guardar_tabla(resultado, args.salida)
+    print(f"✅ {len(resultado)} filas en {time.perf_counter() - inicio:.1f} s -> {args.salida}")
+
+    if args.metricas:
+        prometheus = args.metricas.endswith(".prom")
+        with open(args.metricas, "w", encoding="utf-8") as f:
+            f.write(instrumentacion.exportar_prometheus() if prometheus else instrumentacion.exportar_json())
+
+
+if __name__ == "__main__":
+    main()
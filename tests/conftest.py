@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los paquetes del proyecto (Comun, Incendios, Seismos) se importan desde la raíz
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,56 @@
+import io
+
+import pandas as pd
+import pytest
+
+from Comun.exportacion import exportar, formatos_disponibles, guardar_tabla
+
+
+@pytest.fixture
+def tabla():
+    return pd.DataFrame({"municipio": ["A", "B", "C"], "probabilidad": [0.1, 0.5, 0.9], "mes": [7, 7, 7]})
+
+
+@pytest.mark.parametrize("formato", formatos_disponibles())
+def test_exportar_devuelve_bytes(tabla, formato):
+    assert isinstance(exportar(tabla, formato, filas_por_trozo=2), bytes)
+
+
+def test_exportar_csv_por_trozos_igual_que_to_csv(tabla):
+    assert exportar(tabla, "csv", filas_por_trozo=2) == tabla.to_csv(index=False).encode("utf-8")
+
+
+def test_exportar_parquet_conserva_la_tabla(tabla):
+    pytest.importorskip("pyarrow")
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(exportar(tabla, "parquet", filas_por_trozo=2))), tabla)
+
+
+def test_exportar_formato_desconocido(tabla):
+    with pytest.raises(ValueError):
+        exportar(tabla, "xlsx")
+
+
+def test_guardar_tabla_igual_que_exportar(tabla, tmp_path):
+    ruta = tmp_path / "tabla.csv"
+    guardar_tabla(tabla, str(ruta))
+    assert ruta.read_bytes() == exportar(tabla, "csv")
+
+
+def _app_descargas():
+    import pandas as pd
+    import streamlit as st
+
+    from Comun.exportacion import FORMATOS, exportar, formatos_disponibles
+
+    tabla = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    for formato in formatos_disponibles():
+        st.download_button(formato, data=exportar(tabla, formato), file_name=f"t.{formato}", mime=FORMATOS[formato])
+
+
+def test_download_button_acepta_exportar():
+    # st.download_button convierte `data` al crear el botón: un tipo no admitido lanza ValueError
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(_app_descargas).run()
+    assert not app.exception
+    assert len(app.get("download_button")) == len(formatos_disponibles())
@@ -0,0 +1,109 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Seismos.datos import preparar_terremotos
+from Seismos.ingesta import CatalogoParticionado
+from Seismos.series import IndiceSeries, obtener_indice
+
+
+@pytest.fixture(scope="module")
+def terremotos():
+    return preparar_terremotos()
+
+
+@pytest.fixture
+def catalogo(tmp_path):
+    return CatalogoParticionado(str(tmp_path / "catalogo"))
+
+
+def test_reingerir_duplicados_no_cambia_el_catalogo(catalogo, terremotos):
+    catalogo.ingerir_tabla(terremotos.iloc[:200])
+    antes = catalogo.leer()
+
+    lote = catalogo.ingerir_tabla(terremotos.iloc[:200])
+
+    assert (lote["nuevas"], lote["duplicadas"], lote["particiones"]) == (0, 200, [])
+    assert catalogo.version == 2
+    assert len(catalogo.leer()) == len(antes) == 200
+
+
+def test_solapamiento_parcial_solo_anade_lo_nuevo(catalogo, terremotos):
+    catalogo.ingerir_tabla(terremotos.iloc[:200])
+
+    lote = catalogo.ingerir_tabla(terremotos.iloc[150:300])
+
+    assert (lote["nuevas"], lote["duplicadas"]) == (100, 50)
+    assert len(catalogo.leer()) == 300
+    assert len(catalogo.leer(desde_version=1)) == 100
+
+
+def test_conteos_del_catalogo_igual_que_sus_eventos(catalogo, terremotos):
+    catalogo.ingerir_tabla(terremotos.iloc[:700])
+    catalogo.ingerir_tabla(terremotos.iloc[500:])
+    catalogo.ingerir_tabla(terremotos.iloc[:100])
+
+    desde_conteos = IndiceSeries.desde_conteos(catalogo.conteos_mensuales(), catalogo.version)
+    desde_eventos = IndiceSeries.desde_catalogo(catalogo.leer(columnas=["cuadrante", "Fecha"]))
+
+    assert sorted(desde_conteos.cuadrantes()) == sorted(desde_eventos.cuadrantes())
+    for cuadrante in desde_eventos.cuadrantes():
+        pd.testing.assert_frame_equal(desde_conteos.serie(cuadrante), desde_eventos.serie(cuadrante))
+
+
+def test_conteos_versionados_en_el_manifiesto(catalogo, terremotos):
+    catalogo.ingerir_tabla(terremotos.iloc[:100])
+    anterior = catalogo.manifiesto()
+    catalogo.ingerir_tabla(terremotos.iloc[100:200])
+    catalogo.ingerir_tabla(terremotos.iloc[200:300])
+
+    assert catalogo.manifiesto()["conteos"] == catalogo.fichero_conteos(3)
+    assert catalogo.conteos_mensuales()["eventos"].sum() == 300
+    # Los conteos de un manifiesto de hace dos lotes ya no se conservan; los del anterior, sí
+    assert not os.path.exists(os.path.join(catalogo.carpeta, anterior["conteos"]))
+    assert os.path.exists(os.path.join(catalogo.carpeta, catalogo.fichero_conteos(2)))
+
+
+def test_leer_entre_versiones(catalogo, terremotos):
+    for inicio in (0, 100, 200):
+        catalogo.ingerir_tabla(terremotos.iloc[inicio:inicio + 100])
+
+    assert len(catalogo.leer(desde_version=1, hasta_version=2)) == 100
+    assert len(catalogo.leer(hasta_version=2)) == 200
+
+
+def test_indice_incremental_igual_que_el_completo(catalogo, terremotos):
+    catalogo.ingerir_tabla(terremotos.iloc[:600])
+    indice = obtener_indice(catalogo=catalogo)
+    catalogo.ingerir_tabla(terremotos.iloc[400:])
+
+    assert obtener_indice(catalogo=catalogo) is indice
+    assert indice.version == catalogo.version == 2
+    completo = IndiceSeries.desde_catalogo(terremotos)
+    assert sorted(indice.cuadrantes()) == sorted(completo.cuadrantes())
+    for cuadrante in completo.cuadrantes():
+        pd.testing.assert_frame_equal(indice.serie(cuadrante), completo.serie(cuadrante))
+
+
+def test_primera_ingesta_incluye_el_historico(tmp_path, terremotos):
+    ruta = tmp_path / "historico.csv"
+    terremotos.iloc[:300].to_csv(ruta, index=False)
+    catalogo = CatalogoParticionado(str(tmp_path / "catalogo"), historico=str(ruta))
+
+    lote = catalogo.ingerir_tabla(terremotos.iloc[250:400])
+
+    assert [l["fichero"] for l in catalogo.manifiesto()["lotes"]] == ["historico.csv", "tabla"]
+    assert (lote["nuevas"], lote["duplicadas"]) == (100, 50)
+    assert len(catalogo.leer()) == 400
+    assert catalogo.ingerir(str(ruta))["omitido"]
+
+
+def test_ingerir_el_historico_no_lo_repite(tmp_path, terremotos):
+    ruta = tmp_path / "historico.csv"
+    terremotos.iloc[:300].to_csv(ruta, index=False)
+    catalogo = CatalogoParticionado(str(tmp_path / "catalogo"), historico=str(ruta))
+
+    lote = catalogo.ingerir(str(ruta))
+
+    assert (lote["nuevas"], catalogo.version) == (300, 1)